@@ -0,0 +1,127 @@
+import json
+import logging
+from backend.agents.prompts import get_prompt
+from backend.config.settings import settings
+from backend.services.neon_db import get_db_connection
+from backend.services.context_builder import truncate_to_tokens
+from backend.services.metrics import metrics
+from backend.agents.intent_analyzer import extract_json, trim_reply
+
+logger = logging.getLogger(__name__)
+
+class ConversationSummarizer:
+    """
+    Keeps a rolling summary per decision maker in conversation_summaries.
+    Each refresh folds only the messages newer than summarized_through into
+    the previous summary, several conversations per LLM request.
+    """
+
+    def __init__(self, llm=None):
+        self.llm = llm or get_prompt("conversation_summary.update").chat_model("ConversationSummarizer", temperature=0)
+        self.prompt = get_prompt("conversation_summary.update").template()
+
+    async def refresh_pending(self, limit: int = None) -> int:
+        """Updates summaries for up to `limit` conversations with unsummarized messages; returns how many."""
+        # No connection is held while the LLM call runs
+        conversations = await self._pending_conversations(limit or settings.CONVERSATION_SUMMARY_BATCH_SIZE)
+        if not conversations:
+            return 0
+        summaries = await self.summarize(conversations)
+        if not summaries or not await self._store_summaries(conversations, summaries):
+            return 0
+        metrics.incr("conversation_summary", "updated", len(summaries))
+        metrics.incr("conversation_summary", "messages_folded", sum(len(conversations[d]["messages"]) for d in summaries))
+        return len(summaries)
+
+    async def _pending_conversations(self, limit: int) -> dict:
+        """Unsummarized messages of the `limit` most recently active conversations, keyed by decision maker."""
+        conn = await get_db_connection()
+        try:
+            async with conn:
+                async with conn.cursor() as cur:
+                    # The conversation is everything received plus outbound mail once actually sent
+                    await cur.execute("""
+                        SELECT e.decision_maker_id, e.direction, e.subject, e.body,
+                               COALESCE(e.sent_at, e.created_at) AS at,
+                               cs.summary
+                        FROM emails e
+                        LEFT JOIN conversation_summaries cs ON cs.decision_maker_id = e.decision_maker_id
+                        WHERE (e.direction = 'inbound' OR (e.direction = 'outbound' AND e.status = 'SENT'))
+                          AND COALESCE(e.sent_at, e.created_at) > COALESCE(cs.summarized_through, '-infinity'::timestamptz)
+                          AND e.decision_maker_id IN (
+                              SELECT e2.decision_maker_id FROM emails e2
+                              LEFT JOIN conversation_summaries cs2 ON cs2.decision_maker_id = e2.decision_maker_id
+                              WHERE (e2.direction = 'inbound' OR (e2.direction = 'outbound' AND e2.status = 'SENT'))
+                                AND COALESCE(e2.sent_at, e2.created_at) > COALESCE(cs2.summarized_through, '-infinity'::timestamptz)
+                              GROUP BY e2.decision_maker_id
+                              ORDER BY MAX(COALESCE(e2.sent_at, e2.created_at)) DESC
+                              LIMIT %s
+                          )
+                        ORDER BY at ASC
+                    """, (limit,))
+                    rows = await cur.fetchall()
+        except Exception as e:
+            logger.error(f"Error reading conversations to summarize: {e}")
+            return {}
+        finally:
+            await conn.close()
+
+        conversations = {}
+        for row in rows:
+            dm_id = str(row['decision_maker_id'])
+            convo = conversations.setdefault(dm_id, {"summary": row['summary'] or "", "messages": [], "through": row['at']})
+            body = trim_reply(row['body']) if row['direction'] == 'inbound' else (row['body'] or "")
+            convo["messages"].append({
+                "from": "prospect" if row['direction'] == 'inbound' else "us",
+                "subject": row['subject'] or "",
+                "body": truncate_to_tokens(body.strip(), settings.CONVERSATION_SUMMARY_MESSAGE_TOKENS)
+            })
+            convo["through"] = max(convo["through"], row['at'])
+        return conversations
+
+    async def _store_summaries(self, conversations: dict, summaries: dict) -> bool:
+        """Upserts the new summaries in one short transaction."""
+        conn = await get_db_connection()
+        try:
+            async with conn:
+                async with conn.cursor() as cur:
+                    for dm_id, summary in summaries.items():
+                        convo = conversations[dm_id]
+                        await cur.execute("""
+                            INSERT INTO conversation_summaries (decision_maker_id, summary, summarized_through, message_count, updated_at)
+                            VALUES (%s, %s, %s, %s, NOW())
+                            ON CONFLICT (decision_maker_id) DO UPDATE SET
+                                summary = EXCLUDED.summary,
+                                summarized_through = EXCLUDED.summarized_through,
+                                message_count = conversation_summaries.message_count + EXCLUDED.message_count,
+                                updated_at = NOW()
+                        """, (dm_id, summary, convo["through"], len(convo["messages"])))
+            return True
+        except Exception as e:
+            logger.error(f"Error storing conversation summaries: {e}")
+            return False
+        finally:
+            await conn.close()
+
+    async def summarize(self, conversations: dict) -> dict:
+        """One request for all conversations; ids missing from the answer are retried next round."""
+        items = [{"id": dm_id, "summary_so_far": c["summary"], "new_messages": c["messages"]}
+                 for dm_id, c in conversations.items()]
+        try:
+            chain = self.prompt | self.llm
+            response = await chain.ainvoke({"items": json.dumps(items, ensure_ascii=False)})
+            parsed = extract_json(response.content)
+        except Exception as e:
+            logger.error(f"Error summarizing {len(items)} conversations: {e}")
+            return {}
+        metrics.incr("conversation_summary", "requests")
+        return {
+            str(s.get("id")): s["summary"].strip()
+            for s in parsed.get("summaries", [])
+            if str(s.get("id")) in conversations and (s.get("summary") or "").strip()
+        }
+
+async def get_conversation_summary(cursor, dm_id: str) -> str:
+    await cursor.execute("SELECT summary FROM conversation_summaries WHERE decision_maker_id = %s", (dm_id,))
+    row = await cursor.fetchone()
+    return row['summary'] if row else ""
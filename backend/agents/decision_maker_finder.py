@@ -3,14 +3,16 @@ import asyncio
 import httpx
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts import get_prompt
 from langchain_tavily import TavilySearch
+from backend.services.usage_ledger import MeteredSearch
+from backend.services.search_cache import CachedSearch
 from backend.config.settings import settings
 from backend.schemas.campaign import DecisionMaker, TargetCompany
 from backend.graphs.state import AgentState
 from backend.services.neon_db import save_decision_maker, save_target_company
 from backend.services.apollo import get_work_email
+from backend.services.context_builder import search_results_context
 
 logger = logging.getLogger(__name__)
 
@@ -27,15 +29,11 @@ class CandidatePersonList(BaseModel):
 
 class DecisionMakerFinderAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0
-        )
-        self.search = TavilySearch(
+        self.llm = get_prompt("decision_maker_finder.identity").chat_model("DecisionMakerFinderAgent", temperature=0)
+        self.search = CachedSearch(MeteredSearch(TavilySearch(
             max_results=10,
             tavily_api_key=settings.TAVILY_API_KEY
-        )
+        ), "DecisionMakerFinderAgent"), "leadership")
         self.structured_llm = self.llm.with_structured_output(CandidatePersonList)
         
         self.categories = {
@@ -47,22 +45,7 @@ class DecisionMakerFinderAgent:
             "6": "Product / Program / Strategy Head"
         }
 
-        self.identification_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a professional executive recruiter and lead prospector. "
-                       "Your goal is to identify the top 5 REAL decision makers at a specific company. "
-                       "Assign each person to one of these categories:\n"
-                       "1. Founder / Co-Founder\n"
-                       "2. CEO / Managing Director\n"
-                       "3. CTO / Head of Technology\n"
-                       "4. COO / Head of Operations\n"
-                       "5. Director / Head of Department\n"
-                       "6. Product / Program / Strategy Head\n\n"
-                       "STRICT RULES:\n"
-                       "1. ONLY include people who currently work at the company.\n"
-                       "2. Provide their full name, exact role, LinkedIn URL, and the category number.\n"
-                       "3. BE CERTAIN of the identity. If search data is ambiguous, skip that person."),
-            ("user", "Company Name: {company_name}\nTarget Categories: {categories}\nSearch Results:\n{search_results}")
-        ])
+        self.identification_prompt = get_prompt("decision_maker_finder.identity").template()
 
     async def run(self, state: AgentState) -> AgentState:
         try:
@@ -102,7 +85,7 @@ class DecisionMakerFinderAgent:
                     candidate_res = await (self.identification_prompt | self.structured_llm).ainvoke({
                         "company_name": company.name,
                         "categories": str(self.categories),
-                        "search_results": str(search_response)
+                        "search_results": search_results_context(search_response, "decision_maker_finder.identity")
                     })
                     
                     verified_candidates = [p for p in candidate_res.people if p.is_current and p.name not in processed_names]
@@ -117,7 +100,7 @@ class DecisionMakerFinderAgent:
                         print(f"    📡 Enriching: {candidate.name} ({candidate.role})")
                         
                         try:
-                            email = await get_work_email(candidate.name, domain)
+                            email = await get_work_email(candidate.name, domain, caller="DecisionMakerFinderAgent")
                         except Exception as e:
                             logger.error(f"Apollo error: {e}")
                             email = None
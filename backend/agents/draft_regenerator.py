@@ -0,0 +1,46 @@
+import logging
+from types import SimpleNamespace
+from typing import Optional
+
+from backend.agents.email_drafter import EmailDraftingAgent, draft_inputs_from_records, split_subject_line
+from backend.agents.response_drafter import ResponseDrafter
+
+logger = logging.getLogger(__name__)
+
+class DraftRegenerator:
+    """Redrafts a pending outbound email with the agent that wrote it, relaying tokens to a DraftStream."""
+
+    def __init__(self):
+        self.email_drafter = EmailDraftingAgent()
+        self.response_drafter = ResponseDrafter()
+
+    async def regenerate(self, context: dict, stream=None) -> Optional[dict]:
+        email, dm = context["email"], context["dm"]
+        kind = email["type"] or "initial"
+
+        if kind == "reply":
+            inbound, original = context["inbound"], context["original"]
+            if not inbound or not original:
+                logger.warning(f"Cannot redraft reply {email['id']}: no prospect message or earlier outreach")
+                return None
+            # The reviewer asked for something new, so approved-answer reuse is skipped
+            return await self.response_drafter.draft_response(
+                {"intent": inbound["intent"] or "NEUTRAL", "reasoning": "Reviewer requested a new draft"},
+                original,
+                inbound["body"],
+                context["summary"],
+                dm["name"],
+                stream=stream,
+                allow_reuse=False
+            )
+
+        if kind.startswith("reminder"):
+            if not context["original"]:
+                logger.warning(f"Cannot redraft reminder {email['id']}: no earlier outreach")
+                return None
+            return await self.response_drafter.draft_reminder(kind.upper(), context["original"], context["summary"], stream=stream)
+
+        inputs = draft_inputs_from_records(context["campaign"] or {}, dm, context["company"])
+        content = await self.email_drafter.draft_one(SimpleNamespace(name=dm["name"]), inputs, stream)
+        subject, body = split_subject_line(content)
+        return {"subject": subject, "body": body}
@@ -1,116 +1,169 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts import get_prompt
 from backend.config.settings import settings
 from backend.graphs.state import AgentState
 from typing import List, Dict, Any
-from backend.services.neon_db import save_email_draft, save_decision_maker, save_target_company
+from backend.services.neon_db import save_email_drafts_batch, save_leads_batch, create_batch_job
+from backend.services.llm_batch import get_batch_backend, build_batch_request, messages_to_openai
+from backend.services.metrics import metrics
+from backend.services.draft_stream import draft_streams, stream_completion
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+def split_subject_line(draft_content: str):
+    """Splits a 'Subject: ...' first line off a drafted email. Returns (subject, body)."""
+    subject = "Follow-up"
+    body_text = draft_content
+    if "Subject:" in draft_content:
+        parts = draft_content.split("\n", 1)
+        subject = parts[0].replace("Subject:", "").strip()
+        body_text = parts[1].strip() if len(parts) > 1 else ""
+    return subject, body_text
+
+def draft_inputs_from_records(campaign: dict, dm: dict, company: dict) -> Dict[str, Any]:
+    """draft_inputs() for stored rows (redrafting). The sender company is not stored, so the campaign name stands in."""
+    company = company or {}
+    first = lambda items: "; ".join((items or [])[:1]) or "N/A"
+    return {
+        "my_company": campaign.get("name"),
+        "my_product": campaign.get("product_description"),
+        "my_value_prop": campaign.get("value_proposition") or "N/A",
+        "person_name": dm.get("name"),
+        "person_role": dm.get("role"),
+        "company_name": company.get("name"),
+        "news": first(company.get("recent_news")),
+        "challenges": first(company.get("key_challenges")),
+        "priorities": first(company.get("strategic_priorities"))
+    }
+
 class EmailDraftingAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.7 
-        )
+        self.llm = get_prompt("email_drafter.initial").chat_model("EmailDraftingAgent", temperature=0.7)
         
-        self.drafting_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert sales copywriter. Draft a personalized cold email to the decision maker. "
-                       "STRICT RULES:\n"
-                       "1. Use ONLY the provided information. Do NOT hallucinate or insert placeholders like '[Insert Company]' or '[Result]'.\n"
-                       "2. If a specific detail (e.g., recent news) is 'N/A' or missing, WRITE AROUND IT or OMIT that part entirely.\n"
-                       "3. Keep it under 150 words.\n"
-                       "4. Be professional, direct, and value-driven.\n"
-                       "5. Include a subject line.\n"
-                       "6. Sign off as 'The {my_company} Team' if no specific sender name is provided. Do NOT use '[Your Name]'."),
-            ("user", "My Company: {my_company}\nMy Product: {my_product}\nMy Value Prop: {my_value_prop}\n\n"
-                     "Target Person: {person_name}, {person_role}\n"
-                     "Target Company: {company_name}\n"
-                     "Recent News: {news}\n"
-                     "Challenges: {challenges}\n"
-                     "Strategic Priorities: {priorities}")
-        ])
+        self.drafting_prompt = get_prompt("email_drafter.initial").template()
+        self.max_attempts = 3
+
+    def draft_inputs(self, campaign, person, company) -> Dict[str, Any]:
+        if not company:
+            news = "N/A"
+            challenges = "N/A"
+            priorities = "N/A"
+        else:
+            news = "; ".join(company.recent_news[:1]) if company.recent_news else "N/A"
+            challenges = "; ".join(company.key_challenges[:1]) if company.key_challenges else "N/A"
+            priorities = "; ".join(company.strategic_priorities[:1]) if company.strategic_priorities else "N/A"
+
+        return {
+            "my_company": campaign.user_company_name,
+            "my_product": campaign.product_description,
+            "my_value_prop": campaign.user_company_profile.value_proposition if campaign.user_company_profile else "N/A",
+            "person_name": person.name,
+            "person_role": person.role,
+            "company_name": person.company_name,
+            "news": news,
+            "challenges": challenges,
+            "priorities": priorities
+        }
+
+    async def draft_one(self, person, inputs: Dict[str, Any], stream=None) -> str:
+        """Drafts one lead, retrying transient failures with backoff. Tokens go to `stream` if given."""
+        chain = self.drafting_prompt | self.llm
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await stream_completion(chain, inputs, stream)
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                logger.warning(f"Drafting attempt {attempt} failed for {person.name}: {e}. Retrying.")
+                await asyncio.sleep(2 ** attempt)
 
     async def run(self, state: AgentState) -> AgentState:
         try:
             campaign = state.get("campaign_data")
             decision_makers = state.get("decision_makers", [])
             target_companies = state.get("target_companies", [])
+            campaign_id = state.get("campaign_id")
             
             if not campaign or not decision_makers:
                 print("Missing campaign or decision makers for EmailDraftingAgent.")
                 return state
 
             print(f"Drafting emails (async) for {len(decision_makers)} people.")
+            started = time.monotonic()
             
             company_lookup = {c.name: c for c in target_companies}
             email_drafts = []
-            
+            pending_persist = []
+            persisted = 0
+            slots = asyncio.Semaphore(settings.DRAFTING_CONCURRENCY)
+
+            async def draft_lead(person):
+                async with slots:
+                    inputs = self.draft_inputs(campaign, person, company_lookup.get(person.company_name))
+                    if not (campaign_id and settings.DRAFT_STREAMING_ENABLED):
+                        return person, await self.draft_one(person, inputs)
+                    # The DM row is written with the draft, so the stream is labelled by recipient
+                    async with draft_streams.open(campaign_id, kind="initial", label={
+                        "recipient_name": person.name, "recipient_email": person.email
+                    }) as stream:
+                        content = await self.draft_one(person, inputs, stream)
+                        stream.done(*split_subject_line(content))
+                    return person, content
+
+            leads = []
             for person in decision_makers:
                 if not person.email:
                     print(f"Skipping email draft (async) for {person.name} ({person.company_name}) - No email found.")
                     continue
+                leads.append(person)
+
+            if settings.DRAFTING_MODE == "batch" and campaign_id and leads:
+                return await self.submit_batch(state, campaign, campaign_id, leads, company_lookup)
 
-                company = company_lookup.get(person.company_name)
-                if not company:
-                    news = "N/A"
-                    challenges = "N/A"
-                    priorities = "N/A"
-                else:
-                    news = "; ".join(company.recent_news[:1]) if company.recent_news else "N/A"
-                    challenges = "; ".join(company.key_challenges[:1]) if company.key_challenges else "N/A"
-                    priorities = "; ".join(company.strategic_priorities[:1]) if company.strategic_priorities else "N/A"
-                
+            # Bounded concurrency here; the shared LLM gateway enforces the global rate limit
+            tasks = [asyncio.create_task(draft_lead(person)) for person in leads]
+            failed = 0
+            for finished in asyncio.as_completed(tasks):
                 try:
-                    chain = self.drafting_prompt | self.llm
-                    response = await chain.ainvoke({
-                        "my_company": campaign.user_company_name,
-                        "my_product": campaign.product_description,
-                        "my_value_prop": campaign.user_company_profile.value_proposition if campaign.user_company_profile else "N/A",
-                        "person_name": person.name,
-                        "person_role": person.role,
+                    person, draft_content = await finished
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Error drafting email asynchronously: {e}")
+                    continue
+
+                email_drafts.append({
+                    "recipient_name": person.name,
+                    "recipient_email": person.email,
+                    "company": person.company_name,
+                    "content": draft_content
+                })
+                print(f"Drafted email (async) for {person.name}")
+
+                if campaign_id:
+                    subject, body_text = split_subject_line(draft_content)
+                    pending_persist.append({
                         "company_name": person.company_name,
-                        "news": news,
-                        "challenges": challenges,
-                        "priorities": priorities
-                    })
-                    
-                    draft_content = response.content
-                    
-                    email_drafts.append({
-                        "recipient_name": person.name,
-                        "recipient_email": person.email,
-                        "company": person.company_name,
-                        "content": draft_content
+                        "person": person.dict(),
+                        "subject": subject,
+                        "body": body_text
                     })
-                    
-                    # Persist Email Draft
-                    campaign_id = state.get("campaign_id")
-                    if campaign_id:
-                        try:
-                            comp_data = {"name": person.company_name}
-                            company_id = await save_target_company(campaign_id, comp_data)
-                            if company_id:
-                                dm_id = await save_decision_maker(campaign_id, company_id, person.dict())
-                                if dm_id:
-                                    subject = "Follow-up"
-                                    body_text = draft_content
-                                    if "Subject:" in draft_content:
-                                        parts = draft_content.split("\n", 1)
-                                        subject = parts[0].replace("Subject:", "").strip()
-                                        body_text = parts[1].strip() if len(parts) > 1 else ""
-
-                                    email_id = await save_email_draft(dm_id, subject, body_text, person.email)
-                                    print(f"Persisted draft (async) for {person.name} (ID: {email_id})")
-                        except Exception as e:
-                            logger.error(f"Failed to persist draft for {person.name} asynchronously: {e}")
-
-                    print(f"Drafted email (async) for {person.name}")
-                    
-                except Exception as e:
-                    logger.error(f"Error drafting email for {person.name} asynchronously: {e}")
+                    # Stream finished drafts into the database while the rest are still drafting
+                    if len(pending_persist) >= settings.DRAFT_PERSIST_BATCH_SIZE:
+                        persisted += await self.persist_batch(campaign_id, pending_persist)
+                        pending_persist = []
+
+            if campaign_id and pending_persist:
+                persisted += await self.persist_batch(campaign_id, pending_persist)
+
+            elapsed = time.monotonic() - started
+            metrics.observe("email_drafting", "run", elapsed)
+            metrics.incr("email_drafting", "drafted", len(email_drafts))
+            metrics.incr("email_drafting", "failed", failed)
+            rate = len(email_drafts) / elapsed * 60 if elapsed > 0 else 0.0
+            print(f"Drafted {len(email_drafts)}/{len(leads)} emails in {elapsed:.1f}s "
+                  f"({rate:.1f} drafts/min, {persisted} persisted, {failed} failed)")
             
             state["email_drafts"] = email_drafts
             state["current_agent"] = "EmailDraftingAgent"
@@ -121,3 +174,39 @@ class EmailDraftingAgent:
             state["errors"].append(error_msg)
             
         return state
+
+    async def submit_batch(self, state: AgentState, campaign, campaign_id: str, leads, company_lookup) -> AgentState:
+        """
+        Bulk mode: every lead's prompt goes out as one offline batch job. Leads are
+        saved now; the BatchJobPoller upserts the drafts as PENDING_APPROVAL later.
+        """
+        requests = []
+        items = {}
+        for i, person in enumerate(leads):
+            inputs = self.draft_inputs(campaign, person, company_lookup.get(person.company_name))
+            custom_id = f"initial-draft-{i}"
+            messages = messages_to_openai(self.drafting_prompt.format_messages(**inputs))
+            requests.append(build_batch_request(custom_id, messages, temperature=0.7))
+            items[custom_id] = {"company_name": person.company_name, "person": person.dict()}
+
+        await save_leads_batch(campaign_id, list(items.values()))
+
+        backend = get_batch_backend()
+        batch_id = await backend.submit(requests, {"campaign_id": campaign_id, "kind": "initial_drafts"})
+        job_id = await create_batch_job(campaign_id, "initial_drafts", backend.name, batch_id, items)
+        print(f"Submitted {len(requests)} drafts as batch {batch_id} (job {job_id}, backend {backend.name})")
+        metrics.incr("email_drafting", "batch_submitted", len(requests))
+
+        state["email_drafts"] = []
+        state["drafting_batch_job_id"] = job_id
+        state["current_agent"] = "EmailDraftingAgent"
+        return state
+
+    async def persist_batch(self, campaign_id: str, drafts: List[Dict[str, Any]]) -> int:
+        email_ids = await save_email_drafts_batch(campaign_id, drafts)
+        for draft, email_id in zip(drafts, email_ids):
+            if email_id:
+                print(f"Persisted draft (async) for {draft['person']['name']} (ID: {email_id})")
+            else:
+                logger.error(f"Failed to persist draft for {draft['person']['name']} asynchronously")
+        return sum(1 for email_id in email_ids if email_id)
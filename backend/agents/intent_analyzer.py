@@ -1,34 +1,68 @@
+import asyncio
 import json
 import logging
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+import re
+from typing import Dict, List
+from backend.agents.prompts import get_prompt
 from backend.config.settings import settings
+from backend.services.llm_gateway import INTERACTIVE
+from backend.services.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+def extract_json(content: str):
+    """Parses the JSON object out of a model response (tolerates code fences and chatter)."""
+    content = content.strip()
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+
+    # Remove possible JSON prefix/suffix garbage
+    content = content.strip()
+    if not content.startswith("{"):
+        start = content.find("{")
+        end = content.rfind("}")
+        if start != -1 and end != -1:
+            content = content[start:end+1]
+    return json.loads(content)
+
+# Joins the messages of a coalesced reply burst (see orchestrator_worker.merge_replies)
+BURST_SEPARATOR = "\n\n--- Next message ---\n\n"
+
+def trim_reply(reply_text: str) -> str:
+    """Drops quoted history (> lines, 'On ... wrote:' trailers) and collapses blank runs."""
+    lines = []
+    for line in (reply_text or "").splitlines():
+        if re.match(r"^\s*On .+wrote:\s*$", line):
+            break
+        if line.lstrip().startswith(">"):
+            continue
+        lines.append(line.rstrip())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
 class IntentAnalyzer:
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert Sales Intent Analyst.
-            Analyze the following email reply from a prospect and classify their intent.
-            
-            Classification Categories:
-            - POSITIVE: Interested in a meeting, asking for a demo, clear buying signal, or asking for a discovery call.
-            - NEUTRAL: Asking a clarifying question, asking for more info, or not yet convinced but not a rejection.
-            - NEGATIVE: Explicit rejection, "not interested", "remove me", or clearly stating they are not the right person / no budget.
-            
-            Provide the output in strict JSON format:
-            {{
-                "intent": "POSITIVE" | "NEUTRAL" | "NEGATIVE",
-                "confidence": 0.0 to 1.0,
-                "reasoning": "brief explanation"
-            }}
-            """),
-            ("human", "Prospect Reply:\n\n{reply_text}")
-        ])
+    def __init__(self, llm=None, fast_path=None):
+        # Optional IntentFastPath: local rules/model that decide clear-cut replies without the LLM
+        self.fast_path = fast_path
+        # An injected llm (any runnable chat model) serves both single and batched requests
+        self.llm = llm or get_prompt("intent_analyzer.classify").chat_model("IntentAnalyzer", temperature=0, priority=INTERACTIVE)
+        self.batch_llm = llm or get_prompt("intent_analyzer.batch").chat_model("IntentAnalyzer.batch", temperature=0, priority=INTERACTIVE)
+        self.prompt = get_prompt("intent_analyzer.classify").template()
+        # Same instructions once per request, then many replies keyed by id
+        self.batch_prompt = get_prompt("intent_analyzer.batch").template()
 
     async def analyze(self, reply_text: str):
+        local = self.fast_path.classify(trim_reply(reply_text)) if self.fast_path else None
+        if local and not self.fast_path.should_shadow():
+            return local
+
+        result = await self._analyze_with_llm(reply_text)
+        if local:
+            self.fast_path.record_agreement(local, result)
+        return result
+
+    async def _analyze_with_llm(self, reply_text: str):
         try:
             chain = self.prompt | self.llm
             response = await chain.ainvoke({"reply_text": reply_text})
@@ -36,21 +70,7 @@ class IntentAnalyzer:
             content = response.content.strip()
             logger.info(f"Intent Analysis Raw Output: {content}")
             
-            # Extract JSON
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            # Remove possible JSON prefix/suffix garbage
-            content = content.strip()
-            if not content.startswith("{"):
-                start = content.find("{")
-                end = content.rfind("}")
-                if start != -1 and end != -1:
-                    content = content[start:end+1]
-
-            result = json.loads(content)
+            result = extract_json(content)
             logger.info(f"Classified Intent: {result.get('intent')} (Confidence: {result.get('confidence')})")
             return result
         except Exception as e:
@@ -60,3 +80,73 @@ class IntentAnalyzer:
                 "confidence": 0,
                 "reasoning": f"Analyzer error: {str(e)}"
             }
+
+    async def analyze_many(self, replies: Dict[str, str]) -> Dict[str, dict]:
+        """
+        Classifies many replies ({id: text}) with few requests: trimmed replies are
+        packed INTENT_BATCH_SIZE to a request. Replies still longer than
+        INTENT_BATCH_MAX_CHARS after trimming, and items a batch fails to return,
+        go through analyze() one by one. Returns {id: analysis}.
+        """
+        results = {}
+        packable = []
+        singles = []
+        shadowed = {}
+        for item_id, text in replies.items():
+            trimmed = trim_reply(text)
+            local = self.fast_path.classify(trimmed) if self.fast_path else None
+            # Quoted-only replies escalate above; the LLM still gets to read them
+            trimmed = trimmed or (text or "").strip()
+            if local:
+                if not self.fast_path.should_shadow():
+                    results[str(item_id)] = local
+                    continue
+                shadowed[str(item_id)] = local
+            if len(trimmed) > settings.INTENT_BATCH_MAX_CHARS:
+                singles.append(item_id)
+            else:
+                packable.append({"id": str(item_id), "reply": trimmed})
+
+        size = max(1, settings.INTENT_BATCH_SIZE)
+        batches = [packable[i:i + size] for i in range(0, len(packable), size)]
+        for batch_results in await asyncio.gather(*(self._analyze_batch(b) for b in batches)):
+            results.update(batch_results)
+
+        # Oversized replies and anything a batch dropped fall back to single calls
+        singles += [item_id for item_id in replies if str(item_id) not in results and item_id not in singles]
+        if singles:
+            metrics.incr("intent_batching", "single_fallbacks", len(singles))
+            analyses = await asyncio.gather(*(self._analyze_with_llm(replies[item_id]) for item_id in singles))
+            results.update({str(item_id): a for item_id, a in zip(singles, analyses)})
+
+        for item_id, local in shadowed.items():
+            self.fast_path.record_agreement(local, results[item_id])
+
+        return {item_id: results[str(item_id)] for item_id in replies}
+
+    async def _analyze_batch(self, items: List[dict]) -> Dict[str, dict]:
+        if len(items) == 1:
+            # Not worth the batch framing
+            return {}
+        try:
+            chain = self.batch_prompt | self.batch_llm
+            response = await chain.ainvoke({"items": json.dumps(items, ensure_ascii=False)})
+            parsed = extract_json(response.content)
+        except Exception as e:
+            logger.error(f"Error analyzing intent batch of {len(items)}: {e}")
+            return {}
+
+        wanted = {item["id"] for item in items}
+        results = {}
+        for r in parsed.get("results", []):
+            item_id = str(r.get("id"))
+            if item_id in wanted and r.get("intent") in ("POSITIVE", "NEUTRAL", "NEGATIVE"):
+                results[item_id] = {
+                    "intent": r["intent"],
+                    "confidence": r.get("confidence", 0),
+                    "reasoning": r.get("reasoning", "")
+                }
+        metrics.incr("intent_batching", "requests")
+        metrics.incr("intent_batching", "items", len(results))
+        logger.info(f"Classified {len(results)}/{len(items)} replies in one batched request")
+        return results
@@ -0,0 +1,192 @@
+import logging
+import math
+import random
+import re
+from collections import Counter, defaultdict
+from typing import Iterable, Optional, Tuple
+
+from backend.config.settings import settings
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("POSITIVE", "NEUTRAL", "NEGATIVE")
+
+# Opt-out requests; they only decide a reply that is little more than the request itself
+OPT_OUT = re.compile(r"\bunsubscribe\b|\bremove me\b|\btake me off\b|\bstop (emailing|contacting) me\b|\bdo not (email|contact) me\b")
+
+# Unambiguous phrasings that decide a short reply on their own
+PHRASE_RULES = [
+    (OPT_OUT, "NEGATIVE"),
+    (re.compile(r"\bnot interested\b|\bno thanks\b|\bno thank you\b|\bnot a fit\b"), "NEGATIVE"),
+    (re.compile(r"\b(let'?s|happy to|we can|i'?d like to) (book|schedule|set up|hop on|jump on) (a|an)?\s*(call|meeting|demo|time)\b"), "POSITIVE"),
+    (re.compile(r"\bsend (me|over|us) (a|your)? ?(calendar|calendly|booking) link\b"), "POSITIVE"),
+    (re.compile(r"\b(book|schedule) (a )?(demo|call|meeting)\b"), "POSITIVE"),
+]
+
+# A negation ahead of a POSITIVE phrase or an opt-out ("don't book a meeting", "no need to
+# schedule a call", "don't unsubscribe me") turns it around, so such replies go to the LLM
+NEGATION = re.compile(r"\b(not|no need|never|cannot|(do|does|did|would|will|wo|ca|could|should)n'?t|(do|would|will) not)\b")
+
+# Words that commonly surround an opt-out ("please remove me from your mailing list, thanks").
+# Anything else next to it ("remove me from the CC, loop in Sarah", a newsletter footer) goes to the LLM
+OPT_OUT_FILLER = frozenset("""
+    please pls kindly just me us from of off to the this that these your our all any future
+    list lists mailing email emails messages sequence now immediately asap thanks thank you
+""".split())
+OPT_OUT_MAX_OTHER_WORDS = 1
+
+# Someone else named as the contact ("remove me and reach out to jane@acme.com")
+REFERRAL = re.compile(r"@|\b(loop in|cc|reach out to|speak (to|with)|talk to|contact|forward (this|it) to|try)\b")
+
+# Phrase rules only speak for short replies; long ones usually hedge or mix signals
+RULE_MAX_CHARS = 400
+
+# Shorter replies (after trimming quoted history) carry too little to decide locally
+MIN_REPLY_CHARS = 3
+
+_TOKEN = re.compile(r"[a-z']+")
+
+
+def tokenize(text: str):
+    words = _TOKEN.findall((text or "").lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class NaiveBayesIntentModel:
+    """Multinomial naive Bayes over unigrams and bigrams (a linear model in log space)."""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.log_priors = {}
+        self.log_likelihoods = {}
+        self.unseen = {}
+        self.samples = 0
+
+    @property
+    def trained(self) -> bool:
+        return bool(self.log_priors)
+
+    def train(self, samples: Iterable[Tuple[str, str]]):
+        class_counts = Counter()
+        token_counts = defaultdict(Counter)
+        for text, intent in samples:
+            if intent not in INTENTS:
+                continue
+            class_counts[intent] += 1
+            token_counts[intent].update(tokenize(text))
+
+        vocabulary = set()
+        for counts in token_counts.values():
+            vocabulary.update(counts)
+        total = sum(class_counts.values())
+
+        self.log_priors, self.log_likelihoods, self.unseen = {}, {}, {}
+        for intent, count in class_counts.items():
+            denom = sum(token_counts[intent].values()) + self.alpha * (len(vocabulary) + 1)
+            self.log_priors[intent] = math.log(count / total)
+            self.log_likelihoods[intent] = {
+                token: math.log((n + self.alpha) / denom) for token, n in token_counts[intent].items()
+            }
+            self.unseen[intent] = math.log(self.alpha / denom)
+        self.samples = total
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Returns (intent, probability); (None, 0.0) before training."""
+        if not self.trained:
+            return None, 0.0
+        tokens = tokenize(text)
+        scores = {
+            intent: prior + sum(self.log_likelihoods[intent].get(t, self.unseen[intent]) for t in tokens)
+            for intent, prior in self.log_priors.items()
+        }
+        best = max(scores, key=scores.get)
+        norm = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / norm
+
+
+class IntentFastPath:
+    """
+    In-process first pass for IntentAnalyzer: phrase rules, then the naive
+    Bayes model trained on LLM-labeled replies. Decides only at or above
+    INTENT_FAST_PATH_THRESHOLD; everything else escalates to the LLM. A
+    sample of local decisions is re-checked by the LLM to track agreement.
+    """
+
+    def __init__(self, threshold: float = None, shadow_rate: float = None):
+        self.threshold = settings.INTENT_FAST_PATH_THRESHOLD if threshold is None else threshold
+        self.shadow_rate = settings.INTENT_FAST_PATH_SHADOW_RATE if shadow_rate is None else shadow_rate
+        self.model = NaiveBayesIntentModel()
+
+    def train(self, samples):
+        samples = list(samples)
+        if len(samples) < settings.INTENT_FAST_PATH_MIN_SAMPLES:
+            logger.info(f"Intent fast path: {len(samples)} labeled replies, need {settings.INTENT_FAST_PATH_MIN_SAMPLES} to train")
+            return
+        self.model.train(samples)
+        logger.info(f"Intent fast path model trained on {self.model.samples} labeled replies")
+
+    def match_rules(self, text: str) -> Optional[str]:
+        if len(text) > RULE_MAX_CHARS:
+            return None
+        lowered = text.lower().replace("\u2019", "'")
+        hits = set()
+        for pattern, intent in PHRASE_RULES:
+            match = pattern.search(lowered)
+            if not match:
+                continue
+            if intent == "POSITIVE" and NEGATION.search(lowered, 0, match.start()):
+                return None
+            if pattern is OPT_OUT and not self._only_opt_out(lowered, match):
+                return None
+            hits.add(intent)
+        # Conflicting phrases ("not interested now, but book a call in Q3") go to the LLM
+        return hits.pop() if len(hits) == 1 else None
+
+    @staticmethod
+    def _only_opt_out(lowered: str, match: re.Match) -> bool:
+        """True if the opt-out phrase makes up the reply, without a negation, referral or other request."""
+        if NEGATION.search(lowered, 0, match.start()):
+            return False
+        rest = lowered[:match.start()] + " " + lowered[match.end():]
+        if REFERRAL.search(rest):
+            return False
+        return sum(word not in OPT_OUT_FILLER for word in _TOKEN.findall(rest)) <= OPT_OUT_MAX_OTHER_WORDS
+
+    def classify(self, text: str) -> Optional[dict]:
+        """Analysis dict (same shape as IntentAnalyzer.analyze) or None to escalate."""
+        if len((text or "").strip()) < MIN_REPLY_CHARS or not tokenize(text):
+            # Nothing left to read (e.g. only quoted text); the model would just return its priors
+            metrics.incr("intent_fast_path", "escalated")
+            return None
+
+        intent = self.match_rules(text)
+        if intent:
+            metrics.incr("intent_fast_path", "rules_decided")
+            return {"intent": intent, "confidence": 0.99, "reasoning": "Matched an unambiguous phrase", "source": "fast_path"}
+
+        intent, probability = self.model.predict(text)
+        if intent and probability >= self.threshold:
+            metrics.incr("intent_fast_path", "model_decided")
+            return {"intent": intent, "confidence": round(probability, 3),
+                    "reasoning": "Local intent model", "source": "fast_path"}
+
+        metrics.incr("intent_fast_path", "escalated")
+        return None
+
+    def should_shadow(self) -> bool:
+        return random.random() < self.shadow_rate
+
+    def record_agreement(self, local: dict, llm: dict):
+        """Compares a local decision with the LLM's label for the same reply."""
+        if llm.get("confidence", 0) == 0:
+            return  # analyzer error, not a real label
+        agreed = local["intent"] == llm.get("intent")
+        metrics.incr("intent_fast_path", "shadow_agree" if agreed else "shadow_disagree")
+        if not agreed:
+            logger.info(f"Intent fast path disagreed with LLM: local {local['intent']} vs LLM {llm.get('intent')}")
+
+    def agreement_rate(self) -> Optional[float]:
+        counters = metrics.snapshot("intent_fast_path")["intent_fast_path"]["counters"]
+        checked = counters.get("shadow_agree", 0) + counters.get("shadow_disagree", 0)
+        return round(counters.get("shadow_agree", 0) / checked, 3) if checked else None
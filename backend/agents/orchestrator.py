@@ -1,5 +1,4 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts import get_prompt
 from backend.config.settings import settings
 from backend.schemas.campaign import Campaign
 from backend.graphs.state import AgentState
@@ -10,23 +9,9 @@ logger = logging.getLogger(__name__)
 
 class ContextPlanningAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0
-        )
+        self.llm = get_prompt("context_planning.extract").chat_model("ContextPlanningAgent", temperature=0)
         self.structured_llm = self.llm.with_structured_output(Campaign)
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert sales campaign planner. Your goal is to analyze the user's request and extract structured campaign details. "
-                       "The user will provide their company name, their offerings/products, and target company filters (industry, size, revenue, etc.). "
-                       "Extract: \n"
-                       "1. 'user_company_name': The user's own company.\n"
-                       "2. 'product_description': What they are selling.\n"
-                       "3. 'target_filters': Filters for companies they want to reach out to (industries, locations, roles, company_size, revenue/profit ranges).\n"
-                       "Pay close attention to financial constraints "
-                       "(e.g., 'turnover' maps to 'revenue', 'profit' maps to 'profit'). distinguish between minimum and maximum values."),
-            ("user", "{input}")
-        ])
+        self.prompt = get_prompt("context_planning.extract").template()
 
     async def run(self, state: AgentState) -> AgentState:
         try:
@@ -0,0 +1,283 @@
+"""
+Prompt registry: every chain's prompt as a static system prefix followed by
+variable message suffixes.
+
+The system text of a PromptSpec is sent verbatim (it is not a template), so
+every request of a chain starts with the same bytes and the provider's prompt
+cache can serve that prefix. Anything that varies per request - campaign,
+prospect, page content - belongs in the suffix. Bump `version` whenever the
+text changes; the gateway reports cached-token counts per chain and version.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from backend.services.llm_gateway import llm_gateway
+
+
+@dataclass(frozen=True)
+class PromptSpec:
+    chain: str
+    version: int
+    system: str                       # static prefix, sent as-is
+    suffix: Tuple[Tuple[str, str], ...]  # (role, template) messages carrying the variables
+
+    @property
+    def tag(self) -> str:
+        return f"{self.chain}@v{self.version}"
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(self.system.encode()).hexdigest()[:12]
+
+    def template(self) -> ChatPromptTemplate:
+        return ChatPromptTemplate.from_messages([SystemMessage(content=self.system), *self.suffix])
+
+    def chat_model(self, caller: str, **kwargs):
+        """Gateway model for this chain, tagged so cached tokens are reported per chain and version."""
+        return llm_gateway.chat_model(caller, chain=self.chain, prompt_version=self.version, **kwargs)
+
+
+PROMPTS: Dict[str, PromptSpec] = {}
+
+
+def register(chain: str, version: int, system: str, *suffix: Tuple[str, str]) -> PromptSpec:
+    if chain in PROMPTS:
+        raise ValueError(f"Prompt for chain '{chain}' is already registered")
+    spec = PromptSpec(chain, version, system.strip(), tuple(suffix))
+    PROMPTS[chain] = spec
+    return spec
+
+
+def get_prompt(chain: str) -> PromptSpec:
+    return PROMPTS[chain]
+
+
+def prompt_versions() -> Dict[str, dict]:
+    return {chain: {"version": s.version, "fingerprint": s.fingerprint} for chain, s in sorted(PROMPTS.items())}
+
+
+INTENT_CATEGORIES = """
+Classification Categories:
+- POSITIVE: Interested in a meeting, asking for a demo, clear buying signal, or asking for a discovery call.
+- NEUTRAL: Asking a clarifying question, asking for more info, or not yet convinced but not a rejection.
+- NEGATIVE: Explicit rejection, "not interested", "remove me", or clearly stating they are not the right person / no budget.
+"""
+
+register(
+    "context_planning.extract", 1,
+    "You are an expert sales campaign planner. Your goal is to analyze the user's request and extract structured campaign details. "
+    "The user will provide their company name, their offerings/products, and target company filters (industry, size, revenue, etc.). "
+    "Extract: \n"
+    "1. 'user_company_name': The user's own company.\n"
+    "2. 'product_description': What they are selling.\n"
+    "3. 'target_filters': Filters for companies they want to reach out to (industries, locations, roles, company_size, revenue/profit ranges).\n"
+    "Pay close attention to financial constraints "
+    "(e.g., 'turnover' maps to 'revenue', 'profit' maps to 'profit'). distinguish between minimum and maximum values.",
+    ("user", "{input}"),
+)
+
+register(
+    "user_intelligence.profile", 1,
+    "You are an expert business analyst. Your goal is to research a company and create a comprehensive profile. "
+    "You will be provided with text extracted from multiple pages of the company website (Homepage, About, Products/Offerings). "
+    "Your primary task is to extract a detailed list of products/services and the company's core value proposition. "
+    "Focus on factual data found in the text. "
+    "If specific information is missing, infer reasonable values but prioritize direct extraction.",
+    ("user", "Company Name: {company_name}\nProduct Description: {product_description}\n\nWebsite Content from multiple pages:\n{website_content}"),
+)
+
+register(
+    "user_intelligence.map", 1,
+    "You are an expert business analyst. You are given one section of a company's website. "
+    "List every fact it states about the company's products/services, target customers, "
+    "value proposition and differentiators as concise bullet points. Keep product names exact. "
+    "Do not infer anything the text does not say. If the section has nothing relevant, reply NONE.",
+    ("user", "Company Name: {company_name}\n\nWebsite Section:\n{content}"),
+)
+
+register(
+    "target_discovery.candidates", 1,
+    "You are a professional lead prospector. Based on the target criteria and my company's offerings, "
+    "identify REAL candidate companies from the search results. Provide their name, website, description, and relevance. "
+    "ONLY include companies that appear to be active and legitimate.",
+    ("user", "Target Criteria: {filters}\nMy Offerings: {offerings}\n\nSearch Results:\n{search_results}"),
+)
+
+register(
+    "target_discovery.research", 1,
+    "Analyze the extracted text from a company's website. "
+    "Extract: 'recent_news', 'key_challenges', and 'strategic_priorities'. "
+    "If specific news is missing, summarize their recent focus areas from the text. "
+    "NEVER hallucinate specific news events if not found.",
+    ("user", "Company: {company_name}\nWebsite Content:\n{content}"),
+)
+
+register(
+    "target_discovery.map", 1,
+    "You are given one section of a company's website. List, as concise bullet points, everything it says "
+    "about recent news, announcements, challenges, and strategic priorities or focus areas. "
+    "Do not infer anything the text does not say. If the section has nothing relevant, reply NONE.",
+    ("user", "Company: {company_name}\nWebsite Section:\n{content}"),
+)
+
+register(
+    "decision_maker_finder.identity", 1,
+    "You are a professional executive recruiter and lead prospector. "
+    "Your goal is to identify the top 5 REAL decision makers at a specific company. "
+    "Assign each person to one of these categories:\n"
+    "1. Founder / Co-Founder\n"
+    "2. CEO / Managing Director\n"
+    "3. CTO / Head of Technology\n"
+    "4. COO / Head of Operations\n"
+    "5. Director / Head of Department\n"
+    "6. Product / Program / Strategy Head\n\n"
+    "STRICT RULES:\n"
+    "1. ONLY include people who currently work at the company.\n"
+    "2. Provide their full name, exact role, LinkedIn URL, and the category number.\n"
+    "3. BE CERTAIN of the identity. If search data is ambiguous, skip that person.",
+    ("user", "Company Name: {company_name}\nTarget Categories: {categories}\nSearch Results:\n{search_results}"),
+)
+
+# v2: sign-off rule no longer embeds the company name (it is read from the user message)
+register(
+    "email_drafter.initial", 2,
+    "You are an expert sales copywriter. Draft a personalized cold email to the decision maker. "
+    "STRICT RULES:\n"
+    "1. Use ONLY the provided information. Do NOT hallucinate or insert placeholders like '[Insert Company]' or '[Result]'.\n"
+    "2. If a specific detail (e.g., recent news) is 'N/A' or missing, WRITE AROUND IT or OMIT that part entirely.\n"
+    "3. Keep it under 150 words.\n"
+    "4. Be professional, direct, and value-driven.\n"
+    "5. Include a subject line.\n"
+    "6. Sign off as 'The <My Company> Team' (using the My Company value given) if no specific sender name is provided. "
+    "Do NOT use '[Your Name]'.",
+    ("user", "My Company: {my_company}\nMy Product: {my_product}\nMy Value Prop: {my_value_prop}\n\n"
+             "Target Person: {person_name}, {person_role}\n"
+             "Target Company: {company_name}\n"
+             "Recent News: {news}\n"
+             "Challenges: {challenges}\n"
+             "Strategic Priorities: {priorities}"),
+)
+
+register(
+    "intent_analyzer.classify", 1,
+    """
+You are an expert Sales Intent Analyst.
+Analyze the following email reply from a prospect and classify their intent.
+""" + INTENT_CATEGORIES + """
+Provide the output in strict JSON format:
+{
+    "intent": "POSITIVE" | "NEUTRAL" | "NEGATIVE",
+    "confidence": 0.0 to 1.0,
+    "reasoning": "brief explanation"
+}
+""",
+    ("human", "Prospect Reply:\n\n{reply_text}"),
+)
+
+# Same instructions once per request, then many replies keyed by id
+register(
+    "intent_analyzer.batch", 1,
+    """
+You are an expert Sales Intent Analyst.
+Each item below is an email reply from a different prospect. Classify every item independently.
+""" + INTENT_CATEGORIES + """
+Provide the output in strict JSON format, with exactly one result per input id:
+{
+    "results": [
+        {"id": "<input id>", "intent": "POSITIVE" | "NEUTRAL" | "NEGATIVE", "confidence": 0.0 to 1.0, "reasoning": "brief explanation"}
+    ]
+}
+""",
+    ("human", "Prospect Replies (JSON):\n\n{items}"),
+)
+
+# v2: intent, summary, pitch and reply moved from the system message to the user message
+register(
+    "response_drafter.reply", 2,
+    """
+You are a Principal Sales Correspondent.
+Your task is to draft a personalized reply to a prospect based on their intent.
+The user message gives the intent, a summary of the conversation so far, the original pitch and the prospect's reply.
+
+Guidelines:
+- If intent is POSITIVE: Focus on scheduling a 15-min discovery call. Suggest 2-3 specific times or ask for their calendar.
+- If intent is NEUTRAL: Address their specific question/concerns from the reply. Pivot back to the value prop of the original pitch.
+- Stay consistent with the conversation so far: do not repeat answers already given or re-ask settled questions.
+- Tone: High-end, professional, yet empathetic and human.
+
+Provide the output in JSON format:
+{
+    "subject": "Re: <original subject>",
+    "body": "The email body text here."
+}
+""",
+    ("human", "Intent: {intent} (Reason: {reasoning})\n"
+              "Original Subject: {original_subject}\n"
+              "Conversation So Far (summary): {conversation_summary}\n\n"
+              "Original Pitch:\n{original_pitch}\n\n"
+              "Prospect's Reply:\n{prospect_reply}\n\n"
+              "Draft the response now."),
+)
+
+register(
+    "response_drafter.adapt", 1,
+    """
+You are a Principal Sales Correspondent.
+A colleague's approved answer to a very similar question is below. Adapt it to this prospect's reply:
+keep facts, figures and links exactly as approved, answer only what this prospect asked, address them by name, and keep it short.
+
+Provide the output in JSON format:
+{
+    "subject": "Re: <original subject>",
+    "body": "The email body text here."
+}
+""",
+    ("human", "Original Subject: {original_subject}\nProspect Name: {prospect_name}\n"
+              "Prospect's Reply:\n{prospect_reply}\n\nApproved Answer To A Similar Question:\n{approved_answer}"),
+)
+
+# v2: stage, summary and original email moved from the system message to the user message
+register(
+    "response_drafter.reminder", 2,
+    """
+You are a Principal Sales Correspondent.
+no reply was received to the previous email. Draft a polite, professional follow-up.
+The user message gives the stage (REMINDER_1 = 3 days later, REMINDER_2 = 7 days later),
+a summary of the conversation so far and the original email.
+
+Guidelines:
+- REMINDER_1: "Just floating this to the top of your inbox..." very brief.
+- REMINDER_2: "One last check-in before I assume this isn't a priority..." strictly professional.
+- Do not be nagging. Be helpful.
+
+Output JSON:
+{
+    "subject": "Re: <original subject>",
+    "body": "Your draft here."
+}
+""",
+    ("human", "Stage: {timer_type}\n"
+              "Conversation So Far (summary): {conversation_summary}\n"
+              "Original Subject: {original_subject}\n"
+              "Original Email Body:\n{original_body}\n\n"
+              "Draft the reminder."),
+)
+
+register(
+    "conversation_summary.update", 1,
+    """
+You maintain running summaries of B2B sales email threads between us (the seller) and a prospect.
+For each item, update "summary_so_far" with "new_messages" (oldest first).
+Keep: what we pitched, questions and objections raised, answers given, commitments, dates, and the current state.
+Drop greetings, signatures and repetition. At most 120 words per summary, third person, past tense.
+
+Provide the output in strict JSON format, with exactly one result per input id:
+{
+    "summaries": [{"id": "<input id>", "summary": "updated summary"}]
+}
+""",
+    ("human", "Conversations (JSON):\n\n{items}"),
+)
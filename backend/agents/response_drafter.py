@@ -1,49 +1,63 @@
 import json
 import logging
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+import re
+from backend.agents.prompts import get_prompt
 from backend.config.settings import settings
+from backend.services.llm_gateway import INTERACTIVE, BACKGROUND
+from backend.services.metrics import metrics
+from backend.services.draft_stream import stream_completion
 
 logger = logging.getLogger(__name__)
 
+GREETING = re.compile(r"^\s*(hi|hello|hey|dear)\b[^,\n]*,?", re.IGNORECASE)
+
+def readdress(body: str, name: str = None) -> str:
+    """Swaps the greeting of a reused reply over to the new recipient."""
+    first_name = (name or "").split(" ")[0] or "there"
+    if GREETING.match(body or ""):
+        return GREETING.sub(f"Hi {first_name},", body, count=1)
+    return f"Hi {first_name},\n\n{body}"
+
+def reply_subject(original_subject: str) -> str:
+    subject = original_subject or ""
+    return subject if subject.lower().startswith("re:") else f"Re: {subject}"
+
 class ResponseDrafter:
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a Principal Sales Correspondent.
-            Your task is to draft a personalized reply to a prospect based on their intent.
-            
-            Context Provided:
-            - Intent: {intent} (Reason: {reasoning})
-            - Original Pitch: {original_pitch}
-            - Prospect's Reply: {prospect_reply}
-            
-            Guidelines:
-            - If intent is POSITIVE: Focus on scheduling a 15-min discovery call. Suggest 2-3 specific times or ask for their calendar.
-            - If intent is NEUTRAL: Address their specific question/concerns from the reply. Pivot back to the value prop of the original pitch.
-            - Tone: High-end, professional, yet empathetic and human.
-            
-            Provide the output in JSON format:
-            {{
-                "subject": "Re: {original_subject}",
-                "body": "The email body text here."
-            }}
-            """),
-            ("human", "Draft the response now.")
-        ])
+    def __init__(self, reply_index=None):
+        # Optional ReplyIndex of approved answers to earlier, similar questions
+        self.reply_index = reply_index
+        # One model per prompt so cached-token metrics are attributed to the right chain
+        self.llm = get_prompt("response_drafter.reply").chat_model("ResponseDrafter", temperature=0.7, priority=INTERACTIVE)
+        self.prompt = get_prompt("response_drafter.reply").template()
+        self.adapt_llm = get_prompt("response_drafter.adapt").chat_model("ResponseDrafter", temperature=0.7, priority=INTERACTIVE)
+        self.adapt_prompt = get_prompt("response_drafter.adapt").template()
+        # Idle-time pre-drafting runs in the background lane; fire-time fallbacks and regenerations are interactive
+        self.reminder_llms = {
+            priority: get_prompt("response_drafter.reminder").chat_model("ResponseDrafter", temperature=0.7, priority=priority)
+            for priority in (INTERACTIVE, BACKGROUND)
+        }
+        self.reminder_prompt = get_prompt("response_drafter.reminder").template()
 
-    async def draft_response(self, intent_data: dict, original_email: dict, prospect_reply: str):
+    async def draft_response(self, intent_data: dict, original_email: dict, prospect_reply: str,
+                             conversation_summary: str = None, prospect_name: str = None,
+                             stream=None, allow_reuse: bool = True, campaign_id=None):
+        # Summary of the earlier thread + latest exchange keeps the prompt constant-size however long the thread gets
+        # `stream` (a DraftStream) receives the body as it is generated; the caller finishes it once the draft is saved
+        if allow_reuse and self.reply_index is not None and intent_data.get("intent") == "NEUTRAL":
+            reused = await self.reuse_approved_reply(original_email, prospect_reply, prospect_name, stream, campaign_id)
+            if reused:
+                return reused
         try:
             chain = self.prompt | self.llm
-            response = await chain.ainvoke({
+            content = await stream_completion(chain, {
                 "intent": intent_data.get("intent"),
                 "reasoning": intent_data.get("reasoning"),
+                "conversation_summary": conversation_summary or "No earlier conversation.",
                 "original_pitch": original_email.get("body"),
                 "original_subject": original_email.get("subject"),
                 "prospect_reply": prospect_reply
-            })
+            }, stream, json_body=True)
             
-            content = response.content
             if "```json" in content:
                 content = content.split("```json")[1].split("```")[0].strip()
             
@@ -51,39 +65,61 @@ class ResponseDrafter:
         except Exception as e:
             logger.error(f"Error drafting response: {e}")
             return None
-    async def draft_reminder(self, timer_type: str, original_email: dict):
+
+    async def reuse_approved_reply(self, original_email: dict, prospect_reply: str, prospect_name: str = None,
+                                   stream=None, campaign_id=None):
+        """
+        Near-identical question already answered and approved in the same campaign:
+        reuse that answer as a template (no LLM call). Similar enough, or answered
+        for another campaign: a short adapt-this-answer call. Otherwise None, and
+        the reply is drafted from scratch.
+        """
         try:
-            reminder_prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are a Principal Sales Correspondent.
-                no reply was received to the previous email. Draft a polite, professional follow-up.
-                
-                Context:
-                - Original Email Body: {original_body}
-                - Original Subject: {original_subject}
-                - Stage: {timer_type} (REMINDER_1 = 3 days later, REMINDER_2 = 7 days later)
-                
-                Guidelines:
-                - REMINDER_1: "Just floating this to the top of your inbox..." very brief.
-                - REMINDER_2: "One last check-in before I assume this isn't a priority..." strictly professional.
-                - Do not be nagging. Be helpful.
-                
-                Output JSON:
-                {{
-                    "subject": "Re: {original_subject}",
-                    "body": "Your draft here."
-                }}
-                """),
-                ("human", "Draft the reminder.")
-            ])
-            
-            chain = reminder_prompt | self.llm
-            response = await chain.ainvoke({
+            match, score = await self.reply_index.search(prospect_reply)
+        except Exception as e:
+            logger.warning(f"Reply index lookup failed: {e}")
+            return None
+
+        same_campaign = bool(match and campaign_id and match.get('campaign_id') == str(campaign_id))
+        if same_campaign and score >= settings.REPLY_REUSE_TEMPLATE_THRESHOLD:
+            metrics.incr("reply_reuse", "template_hits")
+            logger.info(f"Reusing approved reply {match['reply_id']} as template (similarity {score:.3f})")
+            draft = {"subject": reply_subject(original_email.get("subject")),
+                     "body": readdress(match['body'], prospect_name)}
+            if stream:
+                stream.update(draft["body"])
+            return draft
+
+        if match and score >= settings.REPLY_REUSE_ADAPT_THRESHOLD:
+            try:
+                content = await stream_completion(self.adapt_prompt | self.adapt_llm, {
+                    "original_subject": original_email.get("subject"),
+                    "prospect_name": prospect_name or "there",
+                    "prospect_reply": prospect_reply,
+                    "approved_answer": match['body']
+                }, stream, json_body=True)
+                if "```json" in content:
+                    content = content.split("```json")[1].split("```")[0].strip()
+                metrics.incr("reply_reuse", "adapt_hits")
+                logger.info(f"Adapted approved reply {match['reply_id']} (similarity {score:.3f})")
+                return json.loads(content)
+            except Exception as e:
+                logger.warning(f"Adapting approved reply failed, drafting from scratch: {e}")
+
+        metrics.incr("reply_reuse", "misses")
+        return None
+
+    async def draft_reminder(self, timer_type: str, original_email: dict, conversation_summary: str = None, stream=None,
+                             priority: str = INTERACTIVE):
+        try:
+            chain = self.reminder_prompt | self.reminder_llms[priority]
+            content = await stream_completion(chain, {
                 "original_body": original_email.get("body"),
                 "original_subject": original_email.get("subject"),
+                "conversation_summary": conversation_summary or "No earlier conversation.",
                 "timer_type": timer_type
-            })
+            }, stream, json_body=True)
             
-            content = response.content
             if "```json" in content:
                 content = content.split("```json")[1].split("```")[0].strip()
             
@@ -1,17 +1,27 @@
 import logging
+import hashlib
 import httpx
 import trafilatura
 import asyncio
 import re
+import time
 from typing import List, Optional
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts import get_prompt
 from langchain_tavily import TavilySearch
+from backend.services.usage_ledger import MeteredSearch
+from backend.services.search_cache import CachedSearch
 from backend.config.settings import settings
 from backend.schemas.campaign import TargetCompany
 from backend.graphs.state import AgentState
-from backend.services.neon_db import save_target_company
+from backend.services.neon_db import save_target_company, get_company_intel, save_company_intel, touch_company_intel
+from backend.services.context_builder import (
+    search_results_context, pages_context, count_tokens, normalize_text, normalize_domain, CHAIN_CONTEXT_BUDGETS
+)
+from backend.services.metrics import metrics
+from backend.services.http_client import http_client, BROWSER_USER_AGENT
+from backend.services.map_reduce import map_pages
+from backend.services.content_dedup import dedupe_pages
 
 logger = logging.getLogger(__name__)
 
@@ -29,63 +39,147 @@ class ResearchData(BaseModel):
     key_challenges: List[str]
     strategic_priorities: List[str]
 
+def site_hash(text: str) -> str:
+    """Fingerprint of scraped site text, insensitive to whitespace and case."""
+    return hashlib.sha256(normalize_text(text).lower().encode()).hexdigest()
+
+RESEARCH_FIELDS = ("recent_news", "key_challenges", "strategic_priorities")
+
 class TargetDiscoveryAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0
-        )
-        self.search = TavilySearch(
+        self.llm = get_prompt("target_discovery.candidates").chat_model("TargetDiscoveryAgent", temperature=0)
+        self.research_model = get_prompt("target_discovery.research").chat_model("TargetDiscoveryAgent", temperature=0)
+        self.search = CachedSearch(MeteredSearch(TavilySearch(
             max_results=10,
             tavily_api_key=settings.TAVILY_API_KEY
-        )
+        ), "TargetDiscoveryAgent"), "prospect_list")
         self.candidate_llm = self.llm.with_structured_output(CandidateList)
-        self.research_llm = self.llm.with_structured_output(ResearchData)
+        self.research_llm = self.research_model.with_structured_output(ResearchData)
         
-        self.discovery_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a professional lead prospector. Based on the target criteria and my company's offerings, "
-                       "identify REAL candidate companies from the search results. Provide their name, website, description, and relevance. "
-                       "ONLY include companies that appear to be active and legitimate."),
-            ("user", "Target Criteria: {filters}\nMy Offerings: {offerings}\n\nSearch Results:\n{search_results}")
-        ])
-
-        self.research_prompt = ChatPromptTemplate.from_messages([
-            ("system", "Analyze the extracted text from a company's website. "
-                       "Extract: 'recent_news', 'key_challenges', and 'strategic_priorities'. "
-                       "If specific news is missing, summarize their recent focus areas from the text. "
-                       "NEVER hallucinate specific news events if not found."),
-            ("user", "Company: {company_name}\nWebsite Content:\n{content}")
-        ])
+        self.discovery_prompt = get_prompt("target_discovery.candidates").template()
+
+        self.research_prompt = get_prompt("target_discovery.research").template()
+        # Map step for sites too large for one prompt; the research prompt above is the reduce step
+        self.map_llm = get_prompt("target_discovery.map").chat_model("TargetDiscoveryAgent", temperature=0)
+        self.map_prompt = get_prompt("target_discovery.map").template()
 
     async def verify_domain(self, url: str) -> bool:
         """Verify the domain is alive using a real-world User-Agent."""
         if not url: return False
         if not url.startswith("http"): url = "https://" + url
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"}
+        headers = {"User-Agent": BROWSER_USER_AGENT}
         try:
-            async with httpx.AsyncClient(follow_redirects=True, verify=False, headers=headers) as client:
-                try:
-                    response = await client.head(url, timeout=7.0)
-                    if response.status_code < 500: return True
-                except:
-                    response = await client.get(url, timeout=10.0)
-                    return response.status_code < 500
+            try:
+                response = await http_client.request("HEAD", url, "TargetDiscoveryAgent", verify=False, headers=headers, timeout=7.0)
+                if response.status_code < 500: return True
+            except httpx.HTTPError:
+                response = await http_client.request("GET", url, "TargetDiscoveryAgent", verify=False, headers=headers, timeout=10.0)
+                return response.status_code < 500
         except Exception as e:
             logger.warning(f"Domain verification failed for {url}: {e}")
             return False
         return False
 
     async def deep_scrape(self, url: str) -> str:
-        """Scrape text using Trafilatura."""
+        """Scrape text using Trafilatura, with repeated blocks (menus, banners) removed."""
         try:
-            downloaded = await asyncio.to_thread(trafilatura.fetch_url, url)
+            downloaded = await http_client.fetch_html(url, "TargetDiscoveryAgent")
             if not downloaded: return ""
-            return await asyncio.to_thread(trafilatura.extract, downloaded) or ""
+            text = await asyncio.to_thread(trafilatura.extract, downloaded) or ""
+            pages = await asyncio.to_thread(dedupe_pages, [(url, text)], "target_discovery")
+            return pages[0][1] if pages else ""
         except Exception as e:
             logger.warning(f"Scraping failed for {url}: {e}")
             return ""
 
+    def map_extractor(self, company_name: str):
+        async def extract(chunk: str) -> str:
+            response = await (self.map_prompt | self.map_llm).ainvoke({"company_name": company_name, "content": chunk})
+            return response.content
+        return extract
+
+    async def research_site(self, company_name: str, url: str, site_content: str) -> dict:
+        print(f"    🔍 Extracting intel from {len(site_content)} chars...")
+        pages = [(url, site_content)]
+        if settings.MAP_REDUCE_ENABLED and count_tokens(site_content) > CHAIN_CONTEXT_BUDGETS["target_discovery.research"]:
+            pages = await map_pages(pages, self.map_extractor(company_name), "target_discovery")
+        research_data = await (self.research_prompt | self.research_llm).ainvoke({
+            "company_name": company_name,
+            "content": pages_context(pages, "target_discovery.research")
+        })
+        return research_data.dict()
+
+    async def company_research(self, candidate: CandidateCompany) -> Optional[dict]:
+        """
+        Research for a verified candidate, shared across campaigns through company_intel.
+        Reused as-is within the recheck window; after it the site is re-scraped and the
+        research redone only if the site text changed, it passed the max age, or the
+        research prompt version changed. None if the site has too little text.
+        """
+        domain = normalize_domain(candidate.website)
+        version = get_prompt("target_discovery.research").tag
+        intel = await get_company_intel(domain, settings.COMPANY_INTEL_RECHECK_HOURS,
+                                        settings.COMPANY_INTEL_MAX_AGE_HOURS) if domain else None
+        current = intel is not None and intel['research_version'] == version and intel['within_max_age']
+        if current and intel['checked_recently']:
+            metrics.incr("company_intel", "reused")
+            print(f"    ♻️ Reusing research for {domain}")
+            return {**{f: intel[f] or [] for f in RESEARCH_FIELDS}, "domain": domain}
+
+        site_content = await self.deep_scrape(candidate.website)
+        if not site_content or len(site_content.strip()) < 100:
+            print(f"    ⚠️ Thin content ({len(site_content.strip()) if site_content else 0} chars). Skipping.")
+            return None
+
+        fingerprint = site_hash(site_content)
+        if current and intel['site_hash'] == fingerprint:
+            metrics.incr("company_intel", "unchanged")
+            print(f"    ♻️ Site unchanged, reusing research for {domain}")
+            await touch_company_intel(domain)
+            return {**{f: intel[f] or [] for f in RESEARCH_FIELDS}, "domain": domain}
+
+        metrics.incr("company_intel", "researched" if intel is None else "refreshed")
+        research = await self.research_site(candidate.name, candidate.website, site_content)
+        if domain and not await save_company_intel(domain, candidate.name, fingerprint, version, research):
+            domain = None  # not stored, so the target cannot reference it
+        return {**research, "domain": domain}
+
+    async def find_candidates(self, query: str, filters, offerings: str) -> List[CandidateCompany]:
+        print(f"  🔍 Searching: {query}")
+        search_results = await self.search.ainvoke({"query": query})
+
+        chain = self.discovery_prompt | self.candidate_llm
+        res = await chain.ainvoke({
+            "filters": str(filters),
+            "offerings": offerings,
+            "search_results": search_results_context(search_results, "target_discovery.candidates")
+        })
+        return res.candidates
+
+    async def evaluate_candidate(self, candidate: CandidateCompany, industries_str: str) -> Optional[TargetCompany]:
+        """Verifies and researches one candidate; None if it does not qualify."""
+        print(f"  📡 Checking: {candidate.name} ({candidate.website})")
+
+        if not await self.verify_domain(candidate.website):
+            print(f"    ❌ Domain dead. Skipping.")
+            return None
+
+        research = await self.company_research(candidate)
+        if research is None:
+            return None
+
+        return TargetCompany(
+            name=candidate.name,
+            website=candidate.website,
+            description=candidate.description,
+            source="Tavily + Deep Research",
+            relevance_score=10,
+            recent_news=research["recent_news"] or ["Recently active in their sector."],
+            key_challenges=research["key_challenges"] or [f"Managing {industries_str} market shifts."],
+            strategic_priorities=research["strategic_priorities"] or ["Expanding digital innovation."],
+            intel_domain=research["domain"]
+        )
+
     async def run(self, state: AgentState) -> AgentState:
         try:
             print("\n--- TargetDiscoveryAgent (Ultra-Robust Engine) ---")
@@ -105,62 +199,8 @@ class TargetDiscoveryAgent:
                 f"leading {industries_str} enterprises in {locations_str} official sites",
                 f"largest {industries_str} firms in {locations_str} directory"
             ]
-            
-            final_targets = []
-            seen_websites = set()
-
-            for query in queries:
-                if len(final_targets) >= 2: break
-                
-                print(f"  🔍 Searching: {query}")
-                search_results = await self.search.ainvoke({"query": query})
-                
-                chain = self.discovery_prompt | self.candidate_llm
-                res = await chain.ainvoke({
-                    "filters": str(filters),
-                    "offerings": offerings,
-                    "search_results": str(search_results)
-                })
-                
-                for candidate in res.candidates:
-                    if len(final_targets) >= 2: break
-                    if candidate.website in seen_websites: continue
-                    seen_websites.add(candidate.website)
-
-                    print(f"  📡 Checking: {candidate.name} ({candidate.website})")
-                    
-                    if not await self.verify_domain(candidate.website):
-                        print(f"    ❌ Domain dead. Skipping.")
-                        continue
-                    
-                    site_content = await self.deep_scrape(candidate.website)
-                    if not site_content or len(site_content.strip()) < 100:
-                        print(f"    ⚠️ Thin content ({len(site_content.strip()) if site_content else 0} chars). Skipping.")
-                        continue
-                    
-                    print(f"    🔍 Extracting intel from {len(site_content)} chars...")
-                    research_data = await (self.research_prompt | self.research_llm).ainvoke({
-                        "company_name": candidate.name,
-                        "content": site_content[:12000]
-                    })
-                    
-                    target = TargetCompany(
-                        name=candidate.name,
-                        website=candidate.website,
-                        description=candidate.description,
-                        source="Tavily + Deep Research",
-                        relevance_score=10,
-                        recent_news=research_data.recent_news or ["Recently active in their sector."],
-                        key_challenges=research_data.key_challenges or [f"Managing {industries_str} market shifts."],
-                        strategic_priorities=research_data.strategic_priorities or ["Expanding digital innovation."]
-                    )
-                    
-                    final_targets.append(target)
-                    print(f"    ✅ MATCH ADDED: {target.name}")
-                    
-                    campaign_id = state.get("campaign_id")
-                    if campaign_id:
-                        await save_target_company(campaign_id, target.dict())
+
+            final_targets = await self.discover(queries, filters, offerings, industries_str, state.get("campaign_id"))
 
             state["target_companies"] = final_targets
             state["current_agent"] = "TargetDiscoveryAgent"
@@ -172,3 +212,74 @@ class TargetDiscoveryAgent:
             state["errors"].append(error_msg)
             
         return state
+
+    async def discover(self, queries: List[str], filters, offerings: str, industries_str: str,
+                       campaign_id: Optional[str] = None) -> List[TargetCompany]:
+        """
+        Evaluates up to DISCOVERY_CONCURRENCY candidates concurrently, in the order their queries
+        found them; requests to any one site are capped by http_client. The next query is searched
+        only once the candidates still in flight cannot reach DISCOVERY_TARGET_COUNT, or straight
+        away if a search fails; once it is reached, outstanding evaluations are cancelled.
+        """
+        target_count = settings.DISCOVERY_TARGET_COUNT
+        slots = asyncio.Semaphore(settings.DISCOVERY_CONCURRENCY)
+
+        async def evaluate(candidate: CandidateCompany) -> Optional[TargetCompany]:
+            async with slots:
+                started = time.monotonic()
+                try:
+                    target = await self.evaluate_candidate(candidate, industries_str)
+                except Exception as e:
+                    logger.warning(f"Candidate {candidate.name} failed: {e}")
+                    target = None
+                metrics.observe("target_discovery", "candidate", time.monotonic() - started, ok=target is not None)
+                return target
+
+        async def search(query: str) -> List[CandidateCompany]:
+            started = time.monotonic()
+            try:
+                candidates = await self.find_candidates(query, filters, offerings)
+            except Exception as e:
+                logger.warning(f"Search for '{query}' failed: {e}")
+                metrics.observe("target_discovery", "search", time.monotonic() - started, ok=False)
+                return []
+            metrics.observe("target_discovery", "search", time.monotonic() - started)
+            return candidates
+
+        final_targets = []
+        seen_websites = set()
+        remaining_queries = list(queries)
+        searching = None
+        evaluating = set()
+        try:
+            while len(final_targets) < target_count:
+                if searching is None and remaining_queries and len(final_targets) + len(evaluating) < target_count:
+                    searching = asyncio.create_task(search(remaining_queries.pop(0)))
+                waiting = evaluating | ({searching} if searching else set())
+                if not waiting:
+                    break
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is searching:
+                        searching = None
+                        for candidate in task.result():
+                            if candidate.website in seen_websites: continue
+                            seen_websites.add(candidate.website)
+                            evaluating.add(asyncio.create_task(evaluate(candidate)))
+                        continue
+                    evaluating.discard(task)
+                    target = task.result()
+                    if target is None or len(final_targets) >= target_count:
+                        continue
+                    final_targets.append(target)
+                    print(f"    ✅ MATCH ADDED: {target.name}")
+                    if campaign_id:
+                        await save_target_company(campaign_id, target.dict())
+        finally:
+            outstanding = evaluating | ({searching} if searching else set())
+            if outstanding:
+                metrics.incr("target_discovery", "cancelled", len(outstanding))
+                for task in outstanding:
+                    task.cancel()
+                await asyncio.gather(*outstanding, return_exceptions=True)
+        return final_targets
@@ -1,57 +1,42 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts import get_prompt
 from langchain_tavily import TavilySearch
+from backend.services.usage_ledger import MeteredSearch
+from backend.services.search_cache import CachedSearch
 from backend.config.settings import settings
 from backend.schemas.campaign import Campaign, CompanyProfile
 from backend.graphs.state import AgentState
 from backend.services.neon_db import update_campaign_profile
+from backend.services.context_builder import pages_context, count_tokens, CHAIN_CONTEXT_BUDGETS
+from backend.services.map_reduce import map_pages
+from backend.services.content_dedup import dedupe_pages
 import trafilatura
 from playwright.async_api import async_playwright
 import logging
 from typing import List, Set
 import asyncio
-import httpx
+from backend.services.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
 class UserIntelligenceAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0
-        )
-        self.search = TavilySearch(
+        self.llm = get_prompt("user_intelligence.profile").chat_model("UserIntelligenceAgent", temperature=0)
+        self.search = CachedSearch(MeteredSearch(TavilySearch(
             max_results=5,
             tavily_api_key=settings.TAVILY_API_KEY
-        )
+        ), "UserIntelligenceAgent"), "company_profile")
         self.structured_llm = self.llm.with_structured_output(CompanyProfile)
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert business analyst. Your goal is to research a company and create a comprehensive profile. "
-                       "You will be provided with text extracted from multiple pages of the company website (Homepage, About, Products/Offerings). "
-                       "Your primary task is to extract a detailed list of products/services and the company's core value proposition. "
-                       "Focus on factual data found in the text. "
-                       "If specific information is missing, infer reasonable values but prioritize direct extraction."),
-            ("user", "Company Name: {company_name}\nProduct Description: {product_description}\n\nWebsite Content from multiple pages:\n{website_content}")
-        ])
+        self.prompt = get_prompt("user_intelligence.profile").template()
+        # Map step for sites too large for one prompt; the profile prompt above is the reduce step
+        self.map_llm = get_prompt("user_intelligence.map").chat_model("UserIntelligenceAgent", temperature=0)
+        self.map_prompt = get_prompt("user_intelligence.map").template()
 
     async def scrape_url(self, url: str) -> str:
-        """Tiered scraping: Trafilatura -> HTTPX (Verify=False) -> Playwright."""
+        """Tiered scraping: pooled HTTP fetch (verify=False) + Trafilatura extraction -> Playwright."""
         try:
-            print(f"  --> Attempting Trafilatura for: {url}")
-            downloaded = await asyncio.to_thread(trafilatura.fetch_url, url)
+            print(f"  --> Fetching with the shared HTTP client: {url}")
+            downloaded = await http_client.fetch_html(url, "UserIntelligenceAgent")
             text = await asyncio.to_thread(trafilatura.extract, downloaded) if downloaded else None
-            
-            # If trafilatura fails (e.g. SSL error), try HTTPX without verification
-            if not text:
-                print(f"  --> Trafilatura failed or returned empty. Trying HTTPX (verify=False) for: {url}")
-                async with httpx.AsyncClient(verify=False, timeout=10.0) as client:
-                    try:
-                        resp = await client.get(url, follow_redirects=True)
-                        if resp.status_code == 200:
-                            text = await asyncio.to_thread(trafilatura.extract, resp.text)
-                    except Exception as he:
-                        print(f"      HTTPX also failed: {he}")
 
             # If still fails or returns very little content, use Playwright
             if not text or len(text.split()) < 100:
@@ -85,6 +70,12 @@ class UserIntelligenceAgent:
             logger.error(f"Failed to scrape {url} asynchronously: {e}")
             return f"Error scraping {url}: {str(e)}"
 
+    def map_extractor(self, company_name: str):
+        async def extract(chunk: str) -> str:
+            response = await (self.map_prompt | self.map_llm).ainvoke({"company_name": company_name, "content": chunk})
+            return response.content
+        return extract
+
     async def find_key_urls(self, company_name: str, base_url: str) -> List[str]:
         """Find About, Products, and Offerings URLs via Tavily search."""
         try:
@@ -135,25 +126,29 @@ class UserIntelligenceAgent:
             print(f"Found {len(key_urls)} URLs to scan (async): {key_urls}")
 
             # 3. Scrape all relevant URLs
-            consolidated_content = ""
+            pages = []
             for url in key_urls:
                 print(f"Scanning (async): {url}...")
                 page_text = await self.scrape_url(url)
                 if page_text and "Error scraping" not in page_text:
-                    consolidated_content += f"\n--- CONTENT FROM {url} ---\n{page_text}\n"
+                    pages.append((url, page_text))
 
-            # 4. Synthesize Profile with LLM
+            # 4. Synthesize Profile with LLM (site-wide boilerplate removed first)
+            pages = await asyncio.to_thread(dedupe_pages, pages, "user_intelligence")
+            if settings.MAP_REDUCE_ENABLED and sum(count_tokens(t) for _, t in pages) > CHAIN_CONTEXT_BUDGETS["user_intelligence.profile"]:
+                pages = await map_pages(pages, self.map_extractor(campaign.user_company_name), "user_intelligence")
+            consolidated_content = pages_context(pages, "user_intelligence.profile")
             if not consolidated_content.strip():
                 state["errors"].append(f"Failed to extract any text from {base_url}")
                 return state
 
-            print(f"Synthesizing profile (async) from {len(consolidated_content)} chars of text...")
+            print(f"Synthesizing profile (async) from {len(pages)} pages ({len(consolidated_content)} chars of context)...")
             chain = self.prompt | self.structured_llm
             try:
                 profile = await chain.ainvoke({
                     "company_name": campaign.user_company_name,
                     "product_description": campaign.product_description,
-                    "website_content": consolidated_content[:12000]
+                    "website_content": consolidated_content
                 })
                 
                 campaign.user_company_profile = profile
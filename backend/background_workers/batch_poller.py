@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime, timezone
+from backend.config.settings import settings
+from backend.services.neon_db import get_open_batch_jobs, complete_batch_job, save_email_drafts_batch
+from backend.services.llm_batch import get_batch_backend, parse_batch_output, IN_PROGRESS, FAILED
+from backend.services.metrics import metrics
+from backend.services.usage_ledger import usage_ledger, usage_context, BATCH, BATCH_PRICE_FACTOR
+from backend.agents.email_drafter import split_subject_line
+from backend.agents.prompts import get_prompt
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Job kind -> (pipeline stage, agent, prompt chain) the batch was submitted for
+BATCH_SOURCES = {
+    "initial_drafts": ("email_drafting", "EmailDraftingAgent", "email_drafter.initial"),
+}
+
+class BatchJobPoller:
+    """Polls submitted bulk drafting jobs and upserts finished drafts as PENDING_APPROVAL."""
+
+    def __init__(self):
+        self._backends = {}
+
+    def backend(self, name: str):
+        if name not in self._backends:
+            self._backends[name] = get_batch_backend(name)
+        return self._backends[name]
+
+    async def run(self):
+        logger.info("Starting Batch Job Poller...")
+        while True:
+            try:
+                await self.poll_jobs()
+                await asyncio.sleep(settings.LLM_BATCH_POLL_SECONDS)
+            except Exception as e:
+                logger.error(f"Error in Batch Poller loop: {e}")
+                await asyncio.sleep(60)
+
+    async def poll_jobs(self) -> int:
+        """Returns the number of jobs that finished this pass."""
+        finished = 0
+        for job in await get_open_batch_jobs():
+            try:
+                finished += await self.poll_job(job)
+            except Exception as e:
+                # Provider hiccups leave the job SUBMITTED for the next pass
+                logger.error(f"Error polling batch job {job['id']}: {e}")
+        return finished
+
+    async def poll_job(self, job) -> int:
+        job_id = str(job['id'])
+        result = await self.backend(job['backend']).poll(job['provider_batch_id'])
+        if result['status'] == IN_PROGRESS:
+            return 0
+
+        turnaround = (datetime.now(timezone.utc) - job['created_at']).total_seconds()
+        metrics.observe("llm_batch", job['kind'], turnaround, ok=result['status'] != FAILED)
+        if result['status'] == FAILED:
+            logger.error(f"Batch job {job_id} failed: {result['error']}")
+            await complete_batch_job(job_id, 'FAILED', error=result['error'])
+            return 1
+
+        outputs = parse_batch_output(result['output'])
+        self.record_usage(job, outputs, turnaround)
+        drafts = []
+        failed = 0
+        for custom_id, lead in (job['items'] or {}).items():
+            output = outputs.get(custom_id)
+            if not output or not output['content']:
+                failed += 1
+                logger.warning(f"Batch job {job_id}: no draft for {lead['person'].get('name')} "
+                               f"({output['error'] if output else 'missing from output'})")
+                continue
+            subject, body_text = split_subject_line(output['content'])
+            drafts.append({**lead, "subject": subject, "body": body_text})
+
+        succeeded = 0
+        size = settings.DRAFT_PERSIST_BATCH_SIZE
+        for i in range(0, len(drafts), size):
+            email_ids = await save_email_drafts_batch(str(job['campaign_id']), drafts[i:i + size])
+            succeeded += sum(1 for email_id in email_ids if email_id)
+        failed += len(drafts) - succeeded
+
+        metrics.incr("llm_batch", f"{job['kind']}.succeeded", succeeded)
+        metrics.incr("llm_batch", f"{job['kind']}.failed", failed)
+        logger.info(f"Batch job {job_id} complete: {succeeded} drafts saved, {failed} failed, {turnaround / 60:.1f} min turnaround")
+        await complete_batch_job(job_id, 'COMPLETED', succeeded, failed)
+        return 1
+
+    def record_usage(self, job, outputs: dict, turnaround: float):
+        """One usage row per returned result, with the batch turnaround as its latency."""
+        stage, agent, chain = BATCH_SOURCES.get(job['kind'], (None, "LLMBatch", None))
+        tag = get_prompt(chain).tag if chain else None
+        with usage_context(campaign_id=job['campaign_id'], stage=stage):
+            for output in outputs.values():
+                usage_ledger.record_llm(agent, tag, output['model'], output['usage'], turnaround,
+                                        ok=output['content'] is not None, cache_status=BATCH,
+                                        price_factor=BATCH_PRICE_FACTOR)
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    poller = BatchJobPoller()
+    asyncio.run(poller.run())
@@ -1,9 +1,21 @@
 import asyncio
+import hashlib
 import logging
 import json
-from backend.services.neon_db import get_db_connection, log_event
-from backend.agents.intent_analyzer import IntentAnalyzer
+import time
+import traceback
+from contextlib import nullcontext
+from dataclasses import dataclass
+from backend.services.neon_db import get_db_connection, log_event, move_exhausted_events, get_labeled_replies
+from backend.services.metrics import metrics
+from backend.config.settings import settings
+from backend.agents.intent_analyzer import IntentAnalyzer, BURST_SEPARATOR
+from backend.agents.intent_fast_path import IntentFastPath
 from backend.agents.response_drafter import ResponseDrafter
+from backend.agents.conversation_summarizer import ConversationSummarizer, get_conversation_summary
+from backend.services.llm_gateway import llm_gateway, BACKGROUND
+from backend.services.draft_stream import draft_streams
+from backend.services.usage_ledger import usage_context
 import uuid
 import sys
 
@@ -13,107 +25,489 @@ import sys
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class EventRoute:
+    event_type: str
+    handler: str  # MonitoringOrchestrator method, called as handler(cursor, entity_id, payload)
+    concurrency: int = 1  # events of this type handled in parallel
+    timeout: float = 120.0  # seconds before the handler is abandoned and retried
+
+class DeferEvent(Exception):
+    """Raised by a handler to put its event back in the queue without counting a retry."""
+    def __init__(self, seconds: float):
+        super().__init__(f"deferred for {seconds:.0f}s")
+        self.seconds = max(float(seconds), 1.0)
+
+MAX_EVENT_RETRIES = 5
+PRIORITY_AGING_SECONDS = 15
+
+# Event types not listed here are marked processed in bulk and never claimed
+EVENT_ROUTES = {route.event_type: route for route in (
+    EventRoute('EMAIL_RECEIVED', 'handle_email_received', concurrency=4, timeout=90),
+    EventRoute('INTENT_CLASSIFIED', 'handle_intent_classified', concurrency=4, timeout=120),
+    EventRoute('TIMER_FIRED', 'handle_timer_fired', concurrency=2, timeout=120),
+)}
+
+def merge_replies(bodies) -> str:
+    """Joins a burst of replies into one thread-level text, oldest first."""
+    bodies = [b.strip() for b in bodies if b and b.strip()]
+    return BURST_SEPARATOR.join(bodies)
+
+def _reply_key(dm_id, reply_text: str) -> str:
+    return f"{dm_id}:{hashlib.sha256(reply_text.encode()).hexdigest()}"
+
+def speculates(campaign_id) -> bool:
+    """True if SPECULATIVE_DRAFTING_CAMPAIGNS ("*" for all) covers the campaign."""
+    enabled = {c.strip() for c in settings.SPECULATIVE_DRAFTING_CAMPAIGNS.split(",") if c.strip()}
+    return "*" in enabled or str(campaign_id) in enabled
+
 class MonitoringOrchestrator:
     def __init__(self):
-        self.intent_analyzer = IntentAnalyzer()
-        self.response_drafter = ResponseDrafter()
+        self.fast_path = IntentFastPath() if settings.INTENT_FAST_PATH_ENABLED else None
+        self.intent_analyzer = IntentAnalyzer(fast_path=self.fast_path)
+        self._fast_path_trained_at = None
+        self.reply_index = None
+        if settings.REPLY_REUSE_ENABLED:
+            from backend.services.reply_index import ReplyIndex
+            self.reply_index = ReplyIndex(llm_gateway.embeddings("ReplyIndex"))
+        self._reply_index_refreshed_at = None
+        self.response_drafter = ResponseDrafter(reply_index=self.reply_index)
+        self.summarizer = ConversationSummarizer()
+        self.batch_size = 10
+        self.pre_draft_batch_size = 5
+        self.claim_lease_seconds = 300
+        self._route_slots = {
+            event_type: asyncio.Semaphore(route.concurrency)
+            for event_type, route in EVENT_ROUTES.items()
+        }
+        self._ticks = 0
+        # Intents classified in one batched request ahead of the EMAIL_RECEIVED handlers,
+        # keyed by DM and merged reply text so a changed burst never reuses a stale result
+        self._prefetched_intents = {}
 
     async def run(self):
         logger.info("Starting Monitoring Orchestrator Worker...")
         while True:
             try:
-                await self.process_events()
+                await self.retrain_fast_path()
+                processed = await self.process_events()
+                # Idle capacity: queue drained this tick, so prepare upcoming reminders
+                # and fold new messages into the conversation summaries and reply index
+                if processed < self.batch_size:
+                    await self.pre_draft_reminders()
+                    await self.summarizer.refresh_pending()
+                    await self.refresh_reply_index()
                 await asyncio.sleep(10) # Process events every 10s
             except Exception as e:
                 logger.error(f"Error in Orchestrator loop: {e}")
                 await asyncio.sleep(30)
 
-    async def process_events(self):
+    async def retrain_fast_path(self):
+        """Refits the local intent model from LLM-labeled replies every INTENT_FAST_PATH_RETRAIN_MINUTES."""
+        if not self.fast_path:
+            return
+        now = time.monotonic()
+        if self._fast_path_trained_at and now - self._fast_path_trained_at < settings.INTENT_FAST_PATH_RETRAIN_MINUTES * 60:
+            return
+        self._fast_path_trained_at = now
+        rows = await get_labeled_replies()
+        self.fast_path.train((r['body'], r['intent']) for r in rows)
+
+    async def refresh_reply_index(self):
+        """Indexes newly sent replies every REPLY_INDEX_REFRESH_MINUTES."""
+        if not self.reply_index:
+            return
+        now = time.monotonic()
+        if self._reply_index_refreshed_at and now - self._reply_index_refreshed_at < settings.REPLY_INDEX_REFRESH_MINUTES * 60:
+            return
+        self._reply_index_refreshed_at = now
+        try:
+            await self.reply_index.refresh()
+        except Exception as e:
+            logger.warning(f"Reply index refresh failed: {e}")
+
+    async def process_events(self) -> int:
+        routed_types = list(EVENT_ROUTES)
         conn = await get_db_connection()
         try:
             async with conn:
                 async with conn.cursor() as cur:
-                    # 1. Fetch events with Concurrency Control
+                    # 1. Events nobody handles: mark processed in one set-based statement
                     await cur.execute("""
-                        SELECT * FROM event_log 
-                        WHERE processed = FALSE 
-                          AND (next_retry_at IS NULL OR next_retry_at <= NOW())
-                          AND retry_count < 5
-                        ORDER BY created_at ASC 
-                        LIMIT 10
-                        FOR UPDATE SKIP LOCKED
-                    """)
+                        UPDATE event_log SET processed = TRUE
+                        WHERE processed = FALSE AND event_type <> ALL(%s)
+                    """, (routed_types,))
+                    if cur.rowcount:
+                        metrics.incr("orchestrator", "noop_skipped", cur.rowcount)
+
+                    # Exhausted events (incl. legacy rows) leave the queue for the dead-letter table
+                    dead = await move_exhausted_events(cur, MAX_EVENT_RETRIES)
+                    if dead:
+                        metrics.incr("orchestrator", "dead_lettered", dead)
+
+                    # 2. Claim routed events with a lease (Concurrency Control).
+                    # Lowest priority value first; waiting time ages events upwards
+                    # by one level per PRIORITY_AGING_SECONDS so nothing starves.
+                    await cur.execute("""
+                        UPDATE event_log SET claimed_until = NOW() + make_interval(secs => %s)
+                        WHERE id IN (
+                            SELECT id FROM event_log 
+                            WHERE processed = FALSE 
+                              AND event_type = ANY(%s)
+                              AND (next_retry_at IS NULL OR next_retry_at <= NOW())
+                              AND (claimed_until IS NULL OR claimed_until < NOW())
+                              AND retry_count < %s
+                            ORDER BY priority - EXTRACT(EPOCH FROM (NOW() - created_at)) / %s ASC, created_at ASC 
+                            LIMIT %s
+                            FOR UPDATE SKIP LOCKED
+                        )
+                        RETURNING *, EXTRACT(EPOCH FROM (NOW() - COALESCE(next_retry_at, created_at))) AS queue_seconds
+                    """, (self.claim_lease_seconds, routed_types, MAX_EVENT_RETRIES, PRIORITY_AGING_SECONDS, self.batch_size))
                     events = await cur.fetchall()
-                    
-                    if not events: return
 
                     for event in events:
-                        event_id = event['id']
+                        metrics.observe("queue_latency", f"priority_{event['priority']}", float(event['queue_seconds']))
+        except Exception as e:
+            logger.error(f"Critical error in process_events: {e}")
+            return 0
+        finally:
+            await conn.close()
+
+        if not events: return 0
+
+        # 3. Several replies claimed at once: classify them in batched requests up front
+        await self._prefetch_intents(events)
+
+        # 4. Events of the same decision maker keep their order; lanes run concurrently
+        lanes = {}
+        for event in sorted(events, key=lambda ev: ev['created_at']):
+            lanes.setdefault(self._lane_key(event), []).append(event)
+        try:
+            await asyncio.gather(*(self._run_lane(lane) for lane in lanes.values()))
+        finally:
+            self._prefetched_intents.clear()
+
+        self._ticks += 1
+        if self._ticks % 30 == 0:
+            logger.info(f"Orchestrator handler stats: {metrics.snapshot('orchestrator')}")
+            logger.info(f"Orchestrator queue latency: {metrics.snapshot('queue_latency')}")
+            if self.fast_path:
+                logger.info(f"Intent fast path: {metrics.snapshot('intent_fast_path')} "
+                            f"(LLM agreement: {self.fast_path.agreement_rate()})")
+            if self.reply_index:
+                logger.info(f"Reply reuse: {metrics.snapshot('reply_reuse')} "
+                            f"(hit rate: {self.reply_index.hit_rate()}, {len(self.reply_index)} indexed)")
+        return len(events)
+
+    async def _prefetch_intents(self, events):
+        """
+        Reads the reply bursts the claimed EMAIL_RECEIVED events will analyze and
+        classifies them with IntentAnalyzer.analyze_many. Bursts still inside the
+        debounce window are left alone; the handlers defer those anyway.
+        """
+        email_ids = [str(e['entity_id']) for e in events if e['event_type'] == 'EMAIL_RECEIVED']
+        if len(email_ids) < 2:
+            return
+
+        try:
+            conn = await get_db_connection()
+            try:
+                async with conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute("""
+                            SELECT e.decision_maker_id, dm.campaign_id, e.body,
+                                   EXTRACT(EPOCH FROM (NOW() - e.created_at)) AS age_seconds
+                            FROM emails e
+                            JOIN decision_makers dm ON dm.id = e.decision_maker_id
+                            WHERE e.direction = 'inbound' AND e.intent IS NULL
+                              AND e.decision_maker_id IN (SELECT decision_maker_id FROM emails WHERE id = ANY(%s::uuid[]))
+                            ORDER BY e.created_at ASC
+                        """, (email_ids,))
+                        rows = await cur.fetchall()
+            finally:
+                await conn.close()
+        except Exception as e:
+            logger.error(f"Intent prefetch query failed: {e}")
+            return
+
+        bursts = {}
+        for row in rows:
+            # Speculative drafting classifies alongside the draft, so those DMs keep the single-call path
+            if speculates(row['campaign_id']):
+                continue
+            bursts.setdefault(str(row['decision_maker_id']), []).append(row)
+
+        debounce = settings.REPLY_DEBOUNCE_SECONDS
+        replies = {}
+        for dm_id, burst in bursts.items():
+            if debounce > 0 and min(float(m['age_seconds']) for m in burst) < debounce:
+                continue
+            replies[dm_id] = merge_replies([m['body'] for m in burst])
+        if len(replies) < 2:
+            return
+
+        started = time.monotonic()
+        analyses = await self.intent_analyzer.analyze_many(replies)
+        metrics.observe("orchestrator", "intent_prefetch", time.monotonic() - started)
+        for dm_id, analysis in analyses.items():
+            self._prefetched_intents[_reply_key(dm_id, replies[dm_id])] = analysis
+
+    def _lane_key(self, event) -> str:
+        payload = event.get('payload') or {}
+        return str(payload.get('dm_id') or event['entity_id'])
+
+    async def _run_lane(self, events):
+        for event in events:
+            # Follow-ups returned by a handler run right away, ahead of the rest of the lane
+            pending = [event]
+            while pending:
+                follow_ups = await self._run_event(pending.pop(0))
+                if follow_ups:
+                    metrics.incr("orchestrator", "continuations", len(follow_ups))
+                pending = follow_ups + pending
+
+    async def _run_event(self, event) -> list:
+        """Runs one event in its own transaction. Returns routed follow-up events to continue with."""
+        route = EVENT_ROUTES[event['event_type']]
+        event_id = event['id']
+        follow_ups = []
+        async with self._route_slots[route.event_type]:
+            started = time.monotonic()
+            conn = await get_db_connection()
+            try:
+                async with conn:
+                    async with conn.cursor() as cur:
                         try:
-                            # 2. Individual Event Transaction (Atomicity)
+                            # Individual Event Transaction (Atomicity)
                             async with conn.transaction():
-                                await self.handle_event(cur, event)
-                                await cur.execute("UPDATE event_log SET processed = TRUE WHERE id = %s", (event_id,))
+                                follow_ups = await asyncio.wait_for(self.handle_event(cur, event), timeout=route.timeout) or []
+                                await cur.execute("UPDATE event_log SET processed = TRUE, claimed_until = NULL WHERE id = %s", (event_id,))
+                            metrics.observe("orchestrator", route.event_type, time.monotonic() - started)
                             logger.info(f"Successfully processed event {event_id}")
+                        except DeferEvent as d:
+                            # Not a failure: release the claim and come back later, retry budget untouched
+                            await cur.execute("""
+                                UPDATE event_log SET next_retry_at = NOW() + make_interval(secs => %s), claimed_until = NULL
+                                WHERE id = %s
+                            """, (d.seconds, event_id))
+                            follow_ups = []
+                            metrics.incr("orchestrator", f"{route.event_type}_deferred")
+                            logger.info(f"Deferred event {event_id} for {d.seconds:.0f}s")
                         except Exception as e:
-                            logger.error(f"Failure processing event {event_id}: {e}")
-                            # 3. Error Handling & Potential Backoff (Component 10)
+                            follow_ups = []
+                            metrics.observe("orchestrator", route.event_type, time.monotonic() - started, ok=False)
+                            error = str(e) or type(e).__name__
+                            logger.error(f"Failure processing event {event_id}: {error}")
+                            # Error Handling & Potential Backoff (Component 10)
                             retries = (event.get('retry_count') or 0) + 1
                             backoff_map = {1: 1, 2: 5, 3: 30, 4: 120, 5: 600}
                             delay = backoff_map.get(retries, 1440) # Default 1 day if somehow beyond 5
-                            
+
                             await cur.execute("""
                                 UPDATE event_log SET 
                                 retry_count = %s, 
                                 last_error = %s,
-                                next_retry_at = NOW() + INTERVAL '%s minutes'
+                                error_class = %s,
+                                last_stack = %s,
+                                next_retry_at = NOW() + make_interval(mins => %s),
+                                claimed_until = NULL
                                 WHERE id = %s
-                            """, (retries, str(e), delay, event_id))
-                    
-                    await conn.commit()
+                            """, (retries, error, type(e).__name__, traceback.format_exc(), delay, event_id))
+
+                            if retries >= MAX_EVENT_RETRIES:
+                                await move_exhausted_events(cur, MAX_EVENT_RETRIES)
+                                metrics.incr("orchestrator", "dead_lettered")
+                                logger.warning(f"Event {event_id} exhausted {retries} retries. Moved to dead-letter queue.")
+            except Exception as e:
+                # The lease expires on its own, so the event is picked up again later
+                logger.error(f"Critical error processing event {event_id}: {e}")
+                follow_ups = []
+            finally:
+                await conn.close()
+        return [ev for ev in follow_ups if ev and ev['event_type'] in EVENT_ROUTES]
+
+    async def pre_draft_reminders(self) -> int:
+        """
+        Draft REMINDER_1/REMINDER_2 bodies ahead of time and park them on the
+        scheduled row, so TimerEngine can fire them without an LLM call.
+        Rows are leased in one short transaction and drafted outside it, so no
+        row lock or connection is held across the LLM calls.
+        """
+        drafted = 0
+        for task in await self._claim_reminders():
+            draft = None
+            if task['original']:
+                draft = await self.response_drafter.draft_reminder(task['type'], task['original'], task['summary'],
+                                                                    priority=BACKGROUND)
+            if await self._store_reminder_draft(task, draft):
+                drafted += 1
+        if drafted:
+            logger.info(f"Pre-drafted {drafted} reminder(s)")
+        return drafted
+
+    async def _claim_reminders(self) -> list:
+        """Leases undrafted reminders and reads what drafting them needs, then commits."""
+        conn = await get_db_connection()
+        try:
+            async with conn:
+                async with conn.cursor() as cur:
+                    await cur.execute("""
+                        UPDATE scheduled_emails SET draft_claimed_until = NOW() + make_interval(secs => %s)
+                        WHERE id IN (
+                            SELECT se.id
+                            FROM scheduled_emails se
+                            JOIN decision_makers dm ON se.decision_maker_id = dm.id
+                            WHERE se.status = 'pending' AND se.drafted_at IS NULL
+                              AND se.type IN ('REMINDER_1', 'REMINDER_2')
+                              AND dm.status = 'ACTIVE'
+                              AND (se.draft_claimed_until IS NULL OR se.draft_claimed_until < NOW())
+                            ORDER BY se.scheduled_date ASC
+                            LIMIT %s
+                            FOR UPDATE OF se SKIP LOCKED
+                        )
+                        RETURNING id, type, decision_maker_id
+                    """, (self.claim_lease_seconds, self.pre_draft_batch_size))
+                    tasks = await cur.fetchall()
+
+                    for task in tasks:
+                        await cur.execute("""
+                            SELECT * FROM emails 
+                            WHERE decision_maker_id = %s AND direction = 'outbound' 
+                            ORDER BY created_at DESC LIMIT 1
+                        """, (task['decision_maker_id'],))
+                        task['original'] = await cur.fetchone()
+                        task['summary'] = await get_conversation_summary(cur, task['decision_maker_id'])
+                    return tasks
         except Exception as e:
-            logger.error(f"Critical error in process_events: {e}")
+            logger.error(f"Error claiming reminders to pre-draft: {e}")
+            return []
+        finally:
+            await conn.close()
+
+    async def _store_reminder_draft(self, task, draft) -> bool:
+        """
+        Parks a finished draft on its scheduled row, remembering which outbound
+        email it follows up on. Rows that fired meanwhile are left untouched.
+        """
+        conn = await get_db_connection()
+        try:
+            async with conn:
+                async with conn.cursor() as cur:
+                    if not task['original']:
+                        # Nothing to follow up on; leave it to the fire-time fallback
+                        await cur.execute("""
+                            UPDATE scheduled_emails SET drafted_at = NOW(), draft_claimed_until = NULL WHERE id = %s
+                        """, (task['id'],))
+                        return False
+                    if not draft:
+                        # LLM failure: release the lease and retry on the next idle tick
+                        await cur.execute("UPDATE scheduled_emails SET draft_claimed_until = NULL WHERE id = %s", (task['id'],))
+                        return False
+                    await cur.execute("""
+                        UPDATE scheduled_emails 
+                        SET subject = %s, body = %s, drafted_at = NOW(), drafted_from_email_id = %s, draft_claimed_until = NULL
+                        WHERE id = %s AND status = 'pending'
+                    """, (draft['subject'], draft['body'], task['original']['id'], task['id']))
+                    return cur.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error storing pre-drafted reminder {task['id']}: {e}")
+            return False
         finally:
             await conn.close()
 
-    async def handle_event(self, cursor, event):
+    async def handle_event(self, cursor, event) -> list:
         event_type = event['event_type']
         entity_id = str(event['entity_id'])
         logger.info(f"Handling event: {event_type} for {entity_id}")
 
-        if event_type == 'EMAIL_RECEIVED':
-            await self.handle_email_received(cursor, entity_id)
-        elif event_type == 'INTENT_CLASSIFIED':
-            await self.handle_intent_classified(cursor, entity_id)
-        elif event_type == 'TIMER_FIRED':
-            await self.handle_timer_fired(cursor, entity_id, event['payload'])
+        route = EVENT_ROUTES.get(event_type)
+        if not route:
+            return []
+        handler = getattr(self, route.handler)
+        with usage_context(campaign_id=await self._event_campaign(cursor, entity_id), stage=event_type):
+            return await handler(cursor, entity_id, event.get('payload') or {})
+
+    async def _event_campaign(self, cursor, entity_id):
+        """Campaign an event's entity (email or decision maker) belongs to, for usage attribution."""
+        await cursor.execute("""
+            SELECT campaign_id FROM decision_makers WHERE id = %s
+            UNION ALL
+            SELECT dm.campaign_id FROM emails e JOIN decision_makers dm ON dm.id = e.decision_maker_id WHERE e.id = %s
+            LIMIT 1
+        """, (entity_id, entity_id))
+        row = await cursor.fetchone()
+        return row['campaign_id'] if row else None
 
-    async def handle_email_received(self, cursor, email_id):
+    async def handle_email_received(self, cursor, email_id, payload=None):
         # 1. Get email body
-        await cursor.execute("SELECT body, decision_maker_id FROM emails WHERE id = %s", (email_id,))
+        await cursor.execute("SELECT body, decision_maker_id, intent FROM emails WHERE id = %s", (email_id,))
         email = await cursor.fetchone()
         if not email:
              logger.warning(f"Orphan event detected: Email {email_id} no longer exists. Marking event as processed.")
              return # Return normally so it gets marked as processed
+        if email['intent']:
+            logger.info(f"Email {email_id} was already classified as part of a coalesced burst. Skipping.")
+            return
 
-        # 2. Analyze Intent
-        analysis = await self.intent_analyzer.analyze(email['body'])
+        # 2. Coalesce bursts: every unclassified reply from this DM is analyzed as one thread
+        dm_id = str(email['decision_maker_id'])
+        await cursor.execute("""
+            SELECT id, body, EXTRACT(EPOCH FROM (NOW() - created_at)) AS age_seconds
+            FROM emails
+            WHERE decision_maker_id = %s AND direction = 'inbound' AND intent IS NULL
+            ORDER BY created_at ASC
+            FOR UPDATE
+        """, (dm_id,))
+        burst = await cursor.fetchall() or [{"id": email_id, "body": email['body'], "age_seconds": None}]
+
+        debounce = settings.REPLY_DEBOUNCE_SECONDS
+        ages = [float(m['age_seconds']) for m in burst if m['age_seconds'] is not None]
+        if debounce > 0 and ages and min(ages) < debounce:
+            # The prospect may still be typing; wait until the burst goes quiet
+            raise DeferEvent(debounce - min(ages))
+
+        burst_ids = [str(m['id']) for m in burst]
+        if len(burst_ids) > 1:
+            metrics.incr("orchestrator", "replies_coalesced", len(burst_ids) - 1)
+            logger.info(f"Coalescing {len(burst_ids)} replies from DM {dm_id} into one analysis")
+
+        # 3. Analyze Intent (optionally drafting the NEUTRAL response in parallel)
+        reply_text = merge_replies([m['body'] for m in burst])
+        speculative_draft = None
+        analysis = self._prefetched_intents.pop(_reply_key(dm_id, reply_text), None)
+        original, dm = (None, None) if analysis else await self._speculation_context(cursor, dm_id)
+        if analysis:
+            metrics.incr("orchestrator", "intent_prefetch_hits")
+        elif original:
+            summary = await get_conversation_summary(cursor, dm_id)
+            analysis, speculative_draft = await self._classify_with_speculative_draft(reply_text, original, summary, dm)
+        else:
+            analysis = await self.intent_analyzer.analyze(reply_text)
         
-        # 3. Update Email with intent
+        # 4. Update Emails with intent
         await cursor.execute("""
             UPDATE emails SET 
             intent = %s, 
-            intent_confidence = %s 
-            WHERE id = %s
-        """, (analysis['intent'], analysis['confidence'], email_id))
+            intent_confidence = %s,
+            intent_source = %s
+            WHERE id = ANY(%s::uuid[])
+        """, (analysis['intent'], analysis['confidence'], analysis.get('source', 'llm'), burst_ids))
         
-        # 4. Emit INTENT_CLASSIFIED
-        await log_event(cursor, 'INTENT_CLASSIFIED', email_id, 'EMAIL', {
+        # 5. Emit INTENT_CLASSIFIED once, on the latest message of the burst.
+        # It is logged pre-claimed and continued in-process right after this commit;
+        # if the worker dies first, the lease expires and any worker picks it up.
+        event_payload = {
             "intent": analysis['intent'],
-            "dm_id": str(email['decision_maker_id'])
-        })
+            "dm_id": dm_id,
+            "coalesced_email_ids": burst_ids
+        }
+        if speculative_draft:
+            event_payload["speculative_draft"] = speculative_draft
+        follow_up = await log_event(cursor, 'INTENT_CLASSIFIED', burst_ids[-1], 'EMAIL', event_payload,
+                                    claim_seconds=self.claim_lease_seconds)
+        return [follow_up] if follow_up else []
 
-    async def handle_intent_classified(self, cursor, email_id):
+    async def handle_intent_classified(self, cursor, email_id, payload=None):
         # 1. Get context
         await cursor.execute("""
             SELECT e.*, dm.campaign_id 
@@ -179,39 +573,122 @@ class MonitoringOrchestrator:
             return
 
         if intent == 'NEUTRAL':
-            # 2. Find original pitch for context
-            # We want the last OUTBOUND PITCH or REPLY that initiated this.
-            await cursor.execute("""
-                SELECT * FROM emails 
-                WHERE decision_maker_id = %s AND direction = 'outbound' 
-                AND type IN ('pitch', 'reply', 'reminder_1', 'reminder_2')
-                ORDER BY created_at DESC LIMIT 1
-            """, (dm_id,))
-            original = await cursor.fetchone()
-            if not original:
-                logger.warning(f"No original pitch found for DM {dm_id}")
-                return
-
-            # 3. Draft Response
-            draft = await self.response_drafter.draft_response(
-                {"intent": intent, "reasoning": "Neutral sentiment detected"},
-                original,
-                email['body']
-            )
-            
+            draft = (payload or {}).get('speculative_draft')
+            stream = None
             if draft:
-                # 4. Consolidate Draft to DB (PENDING_APPROVAL)
-                draft_id = str(uuid.uuid4())
-                await cursor.execute("""
-                    INSERT INTO emails (id, decision_maker_id, subject, body, status, direction, type)
-                    VALUES (%s, %s, %s, %s, 'PENDING_APPROVAL', 'outbound', 'reply')
-                """, (draft_id, dm_id, draft['subject'], draft['body']))
-                
-                await log_event(cursor, 'RESPONSE_DRAFTED', draft_id, 'EMAIL', {"parent_email_id": email_id})
+                logger.info(f"Using speculative draft for DM {dm_id}")
+            else:
+                # 2. Find original pitch for context
+                original = await self._find_original_pitch(cursor, dm_id)
+                if not original:
+                    logger.warning(f"No original pitch found for DM {dm_id}")
+                    return
+
+                # 3. Draft Response (one draft for the whole coalesced burst)
+                prospect_reply = email['body']
+                coalesced_ids = (payload or {}).get('coalesced_email_ids') or []
+                if len(coalesced_ids) > 1:
+                    await cursor.execute("""
+                        SELECT body FROM emails WHERE id = ANY(%s::uuid[]) ORDER BY created_at ASC
+                    """, (coalesced_ids,))
+                    prospect_reply = merge_replies([row['body'] for row in await cursor.fetchall()])
+
+                dm = await self._decision_maker(cursor, dm_id)
+                stream = draft_streams.open(dm['campaign_id'], dm_id, kind="reply") if settings.DRAFT_STREAMING_ENABLED else None
+
+            # Subscribers get an error event unless the draft is saved, whatever raises on the way
+            async with stream or nullcontext():
+                if not draft:
+                    draft = await self.response_drafter.draft_response(
+                        {"intent": intent, "reasoning": "Neutral sentiment detected"},
+                        original,
+                        prospect_reply,
+                        await get_conversation_summary(cursor, dm_id),
+                        dm['name'],
+                        stream=stream,
+                        campaign_id=dm['campaign_id']
+                    )
+
+                if draft:
+                    # 4. Consolidate Draft to DB (PENDING_APPROVAL)
+                    draft_id = str(uuid.uuid4())
+                    await cursor.execute("""
+                        INSERT INTO emails (id, decision_maker_id, subject, body, status, direction, type)
+                        VALUES (%s, %s, %s, %s, 'PENDING_APPROVAL', 'outbound', 'reply')
+                    """, (draft_id, dm_id, draft['subject'], draft['body']))
+
+                    await log_event(cursor, 'RESPONSE_DRAFTED', draft_id, 'EMAIL', {"parent_email_id": email_id})
+                    if stream:
+                        stream.done(draft['subject'], draft['body'], draft_id)
+
+    async def _find_original_pitch(self, cursor, dm_id):
+        # We want the last OUTBOUND PITCH or REPLY that initiated this.
+        await cursor.execute("""
+            SELECT * FROM emails 
+            WHERE decision_maker_id = %s AND direction = 'outbound' 
+            AND type IN ('pitch', 'reply', 'reminder_1', 'reminder_2')
+            ORDER BY created_at DESC LIMIT 1
+        """, (dm_id,))
+        return await cursor.fetchone()
+
+    async def _decision_maker(self, cursor, dm_id):
+        await cursor.execute("SELECT name, campaign_id FROM decision_makers WHERE id = %s", (dm_id,))
+        return await cursor.fetchone() or {"name": None, "campaign_id": None}
+
+    async def _speculation_context(self, cursor, dm_id):
+        """Original pitch and decision maker to draft for if speculative drafting is on for the DM's campaign."""
+        if not settings.SPECULATIVE_DRAFTING_CAMPAIGNS.strip():
+            return None, None
+        dm = await self._decision_maker(cursor, dm_id)
+        if not dm['campaign_id'] or not speculates(dm['campaign_id']):
+            return None, None
+        return await self._find_original_pitch(cursor, dm_id), dm
+
+    async def _classify_with_speculative_draft(self, reply_text: str, original, summary: str = None, dm: dict = None):
+        """
+        Runs intent classification and the NEUTRAL response draft concurrently.
+        The draft is kept only if the intent turns out NEUTRAL; otherwise it is
+        the wasted call this mode pays for lower reply-to-draft latency.
+        """
+        async def timed(coro):
+            started = time.monotonic()
+            result = await coro
+            return result, time.monotonic() - started
+
+        (analysis, intent_secs), (draft, draft_secs) = await asyncio.gather(
+            timed(self.intent_analyzer.analyze(reply_text)),
+            timed(self.response_drafter.draft_response(
+                {"intent": "NEUTRAL", "reasoning": "Neutral sentiment detected"},
+                original,
+                reply_text,
+                summary,
+                (dm or {}).get('name'),
+                campaign_id=(dm or {}).get('campaign_id')
+            ))
+        )
+        metrics.observe("speculative", "intent", intent_secs)
+        metrics.observe("speculative", "draft", draft_secs)
+
+        if analysis['intent'] == 'NEUTRAL' and draft:
+            metrics.incr("speculative", "drafts_used")
+            metrics.incr("speculative", "latency_saved_seconds", min(intent_secs, draft_secs))
+            return analysis, draft
+
+        metrics.incr("speculative", "drafts_discarded")
+        return analysis, None
 
     async def handle_timer_fired(self, cursor, dm_id, payload):
         timer_type = payload.get('timer_type')
         logger.info(f"Handling TIMER_FIRED {timer_type} for DM {dm_id}")
+
+        # TimerEngine already applied the termination; there is nothing to draft
+        if timer_type == 'TERMINATION_CHECK':
+            return
+
+        # Pre-drafted reminders are promoted by TimerEngine at fire time
+        if payload.get('draft_id'):
+            logger.info(f"Reminder {timer_type} for DM {dm_id} was pre-drafted ({payload['draft_id']}). Skipping.")
+            return
         
         # 1. Get original pitch (context)
         await cursor.execute("""
@@ -220,12 +697,13 @@ class MonitoringOrchestrator:
             ORDER BY created_at DESC LIMIT 1
         """, (dm_id,))
         original = await cursor.fetchone()
-        if not original and timer_type != 'TERMINATION_CHECK':
+        if not original:
             logger.warning(f"Orphan event detected: DM {dm_id} has no outreach history for timer {timer_type}. Skipping.")
             return
         
-        # 2. Draft Reminder
-        draft = await self.response_drafter.draft_reminder(timer_type, original or {})
+        # 2. Draft Reminder (fallback when no pre-draft was ready)
+        summary = await get_conversation_summary(cursor, dm_id)
+        draft = await self.response_drafter.draft_reminder(timer_type, original, summary)
         
         if draft:
             # 3. Save as Draft
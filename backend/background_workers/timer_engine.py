@@ -32,7 +32,12 @@ class TimerEngine:
             async with conn:
                 async with conn.cursor() as cur:
                     await cur.execute("""
-                        SELECT se.id, se.type, se.decision_maker_id, se.step, dm.name, dm.status as dm_status, 
+                        SELECT se.id, se.type, se.decision_maker_id, se.step, se.subject, se.body,
+                               se.drafted_from_email_id,
+                               (SELECT e.id FROM emails e
+                                WHERE e.decision_maker_id = se.decision_maker_id AND e.direction = 'outbound'
+                                ORDER BY e.created_at DESC LIMIT 1) AS latest_outbound_id,
+                               dm.name, dm.status as dm_status, 
                                c.status as camp_status, tc.status as comp_status
                         FROM scheduled_emails se
                         JOIN decision_makers dm ON se.decision_maker_id = dm.id
@@ -83,13 +88,30 @@ class TimerEngine:
         next_turn = task['step']
         
         logger.info(f"Firing {timer_type} for M {task['name']} ({dm_id})")
-        
-        # Log event
-        await log_event(cursor, 'TIMER_FIRED', dm_id, 'DECISION_MAKER', {
+
+        payload = {
             "timer_type": timer_type,
             "next_turn": next_turn,
             "schedule_id": str(task['id'])
-        })
+        }
+
+        # Promote a pre-drafted reminder straight into the approval queue (no LLM call)
+        draft_id = None
+        pre_drafted = timer_type != 'TERMINATION_CHECK' and task.get('body') and task.get('drafted_from_email_id')
+        if pre_drafted and task['drafted_from_email_id'] != task.get('latest_outbound_id'):
+            # Another email went out after the draft was written, so it no longer follows on
+            logger.info(f"Discarding stale pre-drafted {timer_type} for DM {dm_id}")
+            pre_drafted = False
+        if pre_drafted:
+            draft_id = str(uuid.uuid4())
+            await cursor.execute("""
+                INSERT INTO emails (id, decision_maker_id, subject, body, status, direction, type)
+                VALUES (%s, %s, %s, %s, 'PENDING_APPROVAL', 'outbound', %s)
+            """, (draft_id, dm_id, task['subject'], task['body'], timer_type.lower()))
+            payload["draft_id"] = draft_id
+        
+        # Log event
+        await log_event(cursor, 'TIMER_FIRED', dm_id, 'DECISION_MAKER', payload)
         
         if timer_type == 'TERMINATION_CHECK':
             # Termination logic
@@ -97,10 +119,12 @@ class TimerEngine:
             await log_event(cursor, 'DECISION_MAKER_TERMINATED', dm_id, 'DECISION_MAKER', {"reason": "NO_REPLY_AFTER_REMINDERS"})
             return
 
-        # For Reminders: We need to draft a follow-up
-        # This will be handled by the Orchestrator reacting to TIMER_FIRED
-        # or we can do it here. The user said Orchestrator is COORDINATOR.
-        # I'll let the Orchestrator handle the drafting part to keep TimerEngine dumb.
+        if draft_id:
+            await log_event(cursor, 'REMINDER_DRAFTED', draft_id, 'EMAIL', {"timer_type": timer_type, "pre_drafted": True})
+            return
+
+        # Reminders without a ready draft (pre-drafting has not reached them yet)
+        # are drafted by the Orchestrator reacting to TIMER_FIRED.
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
@@ -23,6 +23,86 @@ class Settings(BaseSettings):
     TARGET_EMAIL: str = os.getenv("TARGET_EMAIL", "")
     TARGET_PASSWORD: str = os.getenv("TARGET_PASSWORD", "")
     APOLLO_API_KEY: str = os.getenv("APOLLO_API_KEY", "")
+    # LLM gateway: shared OpenAI budget for every agent in this process
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "5"))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    # Persistent cache for deterministic (temperature=0) LLM chains
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_MB: int = int(os.getenv("LLM_CACHE_MAX_MB", "200"))
+    # Shared HTTP client for scraping, domain checks and enrichment APIs (HTTP/2 needs the optional 'h2' package)
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+    HTTP_PER_HOST_CONNECTIONS: int = int(os.getenv("HTTP_PER_HOST_CONNECTIONS", "4"))
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+    HTTP_MAX_PAGE_BYTES: int = int(os.getenv("HTTP_MAX_PAGE_BYTES", str(5 * 1024 * 1024)))
+    # Persistent Tavily search cache shared across agents and campaigns (TTLs per query class in services/search_cache.py)
+    SEARCH_CACHE_ENABLED: bool = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    SEARCH_CACHE_MAX_MB: int = int(os.getenv("SEARCH_CACHE_MAX_MB", "200"))
+    # Map-reduce extraction for scraped sites larger than a chain's context budget
+    MAP_REDUCE_ENABLED: bool = os.getenv("MAP_REDUCE_ENABLED", "true").lower() == "true"
+    MAP_CHUNK_TOKENS: int = int(os.getenv("MAP_CHUNK_TOKENS", "3000"))
+    MAP_MAX_CHUNKS: int = int(os.getenv("MAP_MAX_CHUNKS", "12"))
+    MAP_REDUCE_CONCURRENCY: int = int(os.getenv("MAP_REDUCE_CONCURRENCY", "6"))
+    # TargetDiscoveryAgent: companies to find and candidates evaluated at once
+    DISCOVERY_TARGET_COUNT: int = int(os.getenv("DISCOVERY_TARGET_COUNT", "2"))
+    DISCOVERY_CONCURRENCY: int = int(os.getenv("DISCOVERY_CONCURRENCY", "6"))
+    # Shared company research: reused without re-scraping within the recheck window, and while the
+    # site hash is unchanged up to the max age
+    COMPANY_INTEL_RECHECK_HOURS: int = int(os.getenv("COMPANY_INTEL_RECHECK_HOURS", "24"))
+    COMPANY_INTEL_MAX_AGE_HOURS: int = int(os.getenv("COMPANY_INTEL_MAX_AGE_HOURS", "720"))
+    # EmailDraftingAgent: leads drafted in parallel and drafts persisted per DB round trip
+    DRAFTING_CONCURRENCY: int = int(os.getenv("DRAFTING_CONCURRENCY", "8"))
+    DRAFT_PERSIST_BATCH_SIZE: int = int(os.getenv("DRAFT_PERSIST_BATCH_SIZE", "20"))
+    # Initial drafts: "interactive" drafts in-process; "batch" submits one offline batch job per campaign
+    DRAFTING_MODE: str = os.getenv("DRAFTING_MODE", "interactive")
+    # Batch jobs: "openai" (Batch API) or "local" (file-based stand-in for offline runs)
+    LLM_BATCH_BACKEND: str = os.getenv("LLM_BATCH_BACKEND", "openai")
+    LLM_BATCH_LOCAL_DIR: str = os.getenv("LLM_BATCH_LOCAL_DIR", ".llm_batches")
+    LLM_BATCH_LOCAL_DELAY_SECONDS: float = float(os.getenv("LLM_BATCH_LOCAL_DELAY_SECONDS", "0"))
+    LLM_BATCH_POLL_SECONDS: int = int(os.getenv("LLM_BATCH_POLL_SECONDS", "60"))
+    # IntentAnalyzer.analyze_many: replies packed per request, and the longest reply that is still packed
+    INTENT_BATCH_SIZE: int = int(os.getenv("INTENT_BATCH_SIZE", "8"))
+    INTENT_BATCH_MAX_CHARS: int = int(os.getenv("INTENT_BATCH_MAX_CHARS", "3000"))
+    # Local intent fast path: replies decided without the LLM at/above the threshold; a sample
+    # of local decisions is re-checked by the LLM to measure agreement
+    INTENT_FAST_PATH_ENABLED: bool = os.getenv("INTENT_FAST_PATH_ENABLED", "true").lower() == "true"
+    INTENT_FAST_PATH_THRESHOLD: float = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.95"))
+    INTENT_FAST_PATH_SHADOW_RATE: float = float(os.getenv("INTENT_FAST_PATH_SHADOW_RATE", "0.05"))
+    INTENT_FAST_PATH_MIN_SAMPLES: int = int(os.getenv("INTENT_FAST_PATH_MIN_SAMPLES", "200"))
+    INTENT_FAST_PATH_RETRAIN_MINUTES: int = int(os.getenv("INTENT_FAST_PATH_RETRAIN_MINUTES", "60"))
+    # Rolling conversation summaries: conversations folded per LLM request, and per-message size cap
+    CONVERSATION_SUMMARY_BATCH_SIZE: int = int(os.getenv("CONVERSATION_SUMMARY_BATCH_SIZE", "8"))
+    CONVERSATION_SUMMARY_MESSAGE_TOKENS: int = int(os.getenv("CONVERSATION_SUMMARY_MESSAGE_TOKENS", "300"))
+    # Reuse of approved answers to similar NEUTRAL questions (cosine similarity of question embeddings)
+    REPLY_REUSE_ENABLED: bool = os.getenv("REPLY_REUSE_ENABLED", "true").lower() == "true"
+    REPLY_REUSE_TEMPLATE_THRESHOLD: float = float(os.getenv("REPLY_REUSE_TEMPLATE_THRESHOLD", "0.95"))
+    REPLY_REUSE_ADAPT_THRESHOLD: float = float(os.getenv("REPLY_REUSE_ADAPT_THRESHOLD", "0.85"))
+    REPLY_INDEX_DIR: str = os.getenv("REPLY_INDEX_DIR", ".reply_index")
+    REPLY_INDEX_REFRESH_LIMIT: int = int(os.getenv("REPLY_INDEX_REFRESH_LIMIT", "500"))
+    REPLY_INDEX_REFRESH_MINUTES: int = int(os.getenv("REPLY_INDEX_REFRESH_MINUTES", "10"))
+    # Token streaming of drafts to the UI over Server-Sent Events
+    DRAFT_STREAMING_ENABLED: bool = os.getenv("DRAFT_STREAMING_ENABLED", "true").lower() == "true"
+    DRAFT_STREAM_QUEUE_SIZE: int = int(os.getenv("DRAFT_STREAM_QUEUE_SIZE", "1000"))
+    DRAFT_STREAM_KEEPALIVE_SECONDS: float = float(os.getenv("DRAFT_STREAM_KEEPALIVE_SECONDS", "15"))
+    DRAFT_STREAM_MAX_SECONDS: int = int(os.getenv("DRAFT_STREAM_MAX_SECONDS", "600"))
+    # Usage ledger: per-call tokens/credits, latency and cost, written to usage_events in batches
+    USAGE_LEDGER_ENABLED: bool = os.getenv("USAGE_LEDGER_ENABLED", "true").lower() == "true"
+    USAGE_FLUSH_SECONDS: float = float(os.getenv("USAGE_FLUSH_SECONDS", "5"))
+    USAGE_FLUSH_BATCH_SIZE: int = int(os.getenv("USAGE_FLUSH_BATCH_SIZE", "200"))
+    USAGE_MAX_BACKLOG: int = int(os.getenv("USAGE_MAX_BACKLOG", "10000"))
+    USAGE_TAVILY_CREDIT_USD: float = float(os.getenv("USAGE_TAVILY_CREDIT_USD", "0.008"))
+    USAGE_APOLLO_CREDIT_USD: float = float(os.getenv("USAGE_APOLLO_CREDIT_USD", "0.02"))
+    # Orchestrator: replies from one DM arriving within this window are analyzed together (0 disables)
+    REPLY_DEBOUNCE_SECONDS: int = int(os.getenv("REPLY_DEBOUNCE_SECONDS", "60"))
+    # Orchestrator: comma-separated campaign ids ("*" = all) that draft NEUTRAL responses
+    # in parallel with intent classification (lower latency, one extra LLM call per non-NEUTRAL reply)
+    SPECULATIVE_DRAFTING_CAMPAIGNS: str = os.getenv("SPECULATIVE_DRAFTING_CAMPAIGNS", "")
 
     class Config:
         case_sensitive = True
@@ -8,6 +8,7 @@ class AgentState(TypedDict):
     target_companies: List[TargetCompany]
     decision_makers: List[DecisionMaker]
     email_drafts: List[Dict[str, Any]]
+    drafting_batch_job_id: Optional[str]  # set when initial drafts were submitted as a bulk batch job
     validation_status: str
     errors: List[str]
     current_agent: str
@@ -5,6 +5,14 @@ from backend.agents.user_intelligence import UserIntelligenceAgent
 from backend.agents.target_discovery import TargetDiscoveryAgent
 from backend.agents.decision_maker_finder import DecisionMakerFinderAgent
 from backend.agents.email_drafter import EmailDraftingAgent
+from backend.services.usage_ledger import usage_context
+
+def metered(stage: str, node):
+    """Runs a node with its LLM/search/enrichment usage attributed to the campaign and stage."""
+    async def run(state: AgentState):
+        with usage_context(campaign_id=state.get("campaign_id"), stage=stage):
+            return await node(state)
+    return run
 
 def create_workflow():
     workflow = StateGraph(AgentState)
@@ -17,11 +25,11 @@ def create_workflow():
     email_drafter = EmailDraftingAgent()
     
     # Add nodes
-    workflow.add_node("context_planning", planner.run)
-    workflow.add_node("user_intelligence", user_intel.run)
-    workflow.add_node("target_discovery", target_discovery.run)
-    workflow.add_node("decision_maker_finder", decision_maker_finder.run)
-    workflow.add_node("email_drafting", email_drafter.run)
+    workflow.add_node("context_planning", metered("context_planning", planner.run))
+    workflow.add_node("user_intelligence", metered("user_intelligence", user_intel.run))
+    workflow.add_node("target_discovery", metered("target_discovery", target_discovery.run))
+    workflow.add_node("decision_maker_finder", metered("decision_maker_finder", decision_maker_finder.run))
+    workflow.add_node("email_drafting", metered("email_drafting", email_drafter.run))
     
     # Set entry point
     workflow.set_entry_point("context_planning")
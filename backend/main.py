@@ -9,9 +9,11 @@ if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from backend.config.settings import settings
 from pydantic import BaseModel, EmailStr
+from typing import List, Optional
 from backend.services.mail_service import EmailService
 from backend.graphs.workflow import app_workflow
 from backend.schemas.campaign import UserInput, CampaignResponse
@@ -31,8 +33,11 @@ from backend.services.neon_db import (
     mark_email_sent,
     get_db_connection,
     save_sent_discovery_email,
+    get_draft_context,
+    get_usage_summary,
     create_campaign as db_create_campaign
 )
+from backend.services.draft_stream import draft_streams
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -46,21 +51,30 @@ async def lifespan(app: FastAPI):
         from backend.background_workers.email_ingestion import EmailIngestionService
         from backend.background_workers.orchestrator_worker import MonitoringOrchestrator
         from backend.background_workers.timer_engine import TimerEngine
+        from backend.background_workers.batch_poller import BatchJobPoller
         
         ingestion = EmailIngestionService()
         orchestrator = MonitoringOrchestrator()
         timer = TimerEngine()
+        batch_poller = BatchJobPoller()
         
         # Fire and forget tasks
         asyncio.create_task(ingestion.run())
         asyncio.create_task(orchestrator.run())
         asyncio.create_task(timer.run())
+        asyncio.create_task(batch_poller.run())
         
         logger.info("Autonomous workers bundled and initialized in background process.")
     
     yield
     # Shutdown
     logger.info("Shutting down...")
+    from backend.services.llm_gateway import llm_gateway
+    from backend.services.usage_ledger import usage_ledger
+    from backend.services.http_client import http_client
+    await llm_gateway.aclose()
+    await http_client.aclose()
+    await usage_ledger.aclose()
 
 app = FastAPI(
     title="Agentic B2B Outbound Sales Automation System",
@@ -98,6 +112,11 @@ class DiscoverySendRequest(BaseModel):
     subject: str
     body: str
 
+class DeadLetterReplayRequest(BaseModel):
+    ids: Optional[List[str]] = None
+    event_type: Optional[str] = None
+    error_class: Optional[str] = None
+
 @app.get("/")
 async def root():
     return {"message": "Agentic B2B Outbound Sales Automation System API"}
@@ -106,6 +125,39 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def get_metrics(group: str = None):
+    # In-process only: covers the bundled workers (BUNDLE_WORKERS) and API-side agents
+    from backend.services.metrics import metrics
+    return metrics.snapshot(group)
+
+@app.get("/metrics/prompt-cache")
+async def get_prompt_cache_metrics():
+    # Provider-side prompt caching per chain@version, next to the registered prompt versions
+    from backend.services.llm_gateway import llm_gateway
+    from backend.agents.prompts import prompt_versions
+    return {"chains": llm_gateway.prompt_cache_report(), "prompts": prompt_versions()}
+
+@app.get("/metrics/search-cache")
+async def get_search_cache_metrics():
+    # Hit rate per query class (in-process, like /metrics)
+    from backend.services.search_cache import search_cache
+    return search_cache.report()
+
+@app.get("/usage/campaigns")
+async def get_usage_by_campaign(since_hours: int = None):
+    # Spend and p50/p95 latency per campaign, from the usage ledger
+    return await get_usage_summary(("campaign_id",), since_hours=since_hours)
+
+@app.get("/usage/campaigns/{campaign_id}")
+async def get_campaign_usage(campaign_id: str, group_by: str = "agent,provider", since_hours: int = None):
+    # e.g. group_by=stage or group_by=agent,chain
+    return await get_usage_summary(group_by.split(","), campaign_id=campaign_id, since_hours=since_hours)
+
+@app.get("/usage/agents")
+async def get_usage_by_agent(group_by: str = "agent,provider", since_hours: int = None):
+    return await get_usage_summary(group_by.split(","), since_hours=since_hours)
+
 @app.post("/campaigns/initialize")
 async def initialize_campaign(req: InitialCampaignRequest):
     campaign_id = await db_create_campaign(req.name, "")
@@ -146,6 +198,30 @@ async def fetch_events(entity_id: str):
     events = await get_event_logs(entity_id)
     return {"events": events}
 
+@app.get("/dead-letters")
+async def list_dead_letters(event_type: str = None, error_class: str = None, include_replayed: bool = False, limit: int = 100):
+    from backend.services.neon_db import get_dead_letters
+    dead_letters = await get_dead_letters(event_type, error_class, include_replayed, limit)
+    return {"dead_letters": dead_letters}
+
+@app.get("/dead-letters/{dead_letter_id}")
+async def inspect_dead_letter(dead_letter_id: str):
+    from backend.services.neon_db import get_dead_letter
+    dead_letter = await get_dead_letter(dead_letter_id)
+    if not dead_letter:
+        return {"error": "Dead letter not found"}
+    return dead_letter
+
+@app.post("/dead-letters/replay")
+async def replay_dead_letter_events(req: DeadLetterReplayRequest):
+    from backend.services.neon_db import replay_dead_letters
+    if not (req.ids or req.event_type or req.error_class):
+        return {"error": "Provide ids, event_type or error_class to select dead letters to replay"}
+    replayed = await replay_dead_letters(req.ids, req.event_type, req.error_class)
+    if replayed < 0:
+        return {"error": "Failed to replay dead letters"}
+    return {"status": "success", "replayed": replayed}
+
 @app.delete("/campaigns/{campaign_id}")
 async def remove_campaign(campaign_id: str):
     success = await delete_campaign(campaign_id)
@@ -154,7 +230,14 @@ async def remove_campaign(campaign_id: str):
     return {"error": "Failed to delete campaign"}
 
 @app.post("/campaigns/{campaign_id}/launch", response_model=CampaignResponse)
-async def launch_campaign(campaign_id: str, req: UserInput):
+async def launch_campaign(campaign_id: str, req: UserInput, refresh_cache: bool = False):
+    if refresh_cache:
+        # Re-run every search and extraction live instead of from the search and LLM caches
+        from backend.services.llm_cache import bypass_llm_cache
+        from backend.services.search_cache import bypass_search_cache
+        with bypass_llm_cache(), bypass_search_cache():
+            return await launch_campaign(campaign_id, req)
+
     initial_state = AgentState(
         user_input=req.query,
         campaign_id=campaign_id,
@@ -228,6 +311,51 @@ async def send_email_endpoint(email_req: EmailRequest):
     else:
         return {"status": "error", "message": "Failed to send email. Check logs/credentials."}
 
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Redraft tasks keep running (and persist) if the reviewer closes the stream
+_redraft_tasks = set()
+
+async def _sse(subscription):
+    with subscription:
+        async for chunk in subscription.events():
+            yield chunk
+
+@app.get("/campaigns/{campaign_id}/drafts/stream")
+async def stream_campaign_drafts(campaign_id: str):
+    """Server-Sent Events with the tokens of every draft being generated for the campaign."""
+    return StreamingResponse(_sse(draft_streams.subscribe(campaign_id=campaign_id)),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/decision-makers/{dm_id}/drafts/stream")
+async def stream_dm_drafts(dm_id: str):
+    return StreamingResponse(_sse(draft_streams.subscribe(dm_id=dm_id)),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+async def _redraft(email_id: str, context: dict, stream):
+    from backend.agents.draft_regenerator import DraftRegenerator
+    from backend.services.usage_ledger import usage_context
+    with usage_context(campaign_id=context['dm']['campaign_id'], stage="regenerate"):
+        async with stream:
+            draft = await DraftRegenerator().regenerate(context, stream)
+            if draft and await update_email_draft(email_id, draft['subject'], draft['body']):
+                stream.done(draft['subject'], draft['body'], email_id)
+
+@app.post("/emails/{email_id}/regenerate")
+async def regenerate_email(email_id: str):
+    """Redrafts a pending draft, streaming it as Server-Sent Events; the result replaces the stored draft."""
+    context = await get_draft_context(email_id)
+    if not context:
+        return {"error": "Email not found"}
+    if context['email']['status'] != 'PENDING_APPROVAL':
+        return {"error": "Only drafts pending approval can be regenerated"}
+
+    stream = draft_streams.open(context['dm']['campaign_id'], context['dm']['id'], kind="regenerate")
+    subscription = draft_streams.subscribe(stream_id=stream.id)
+    task = asyncio.create_task(_redraft(email_id, context, stream))
+    _redraft_tasks.add(task)
+    task.add_done_callback(_redraft_tasks.discard)
+    return StreamingResponse(_sse(subscription), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.post("/emails/{email_id}/approve")
 async def approve_email(email_id: str):
     from backend.services.neon_db import get_campaign_details_by_email_id
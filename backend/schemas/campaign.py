@@ -33,6 +33,7 @@ class TargetCompany(BaseModel):
     recent_news: List[str] = Field(default_factory=list, description="Recent news headlines or summaries.")
     key_challenges: List[str] = Field(default_factory=list, description="Inferred key challenges.")
     strategic_priorities: List[str] = Field(default_factory=list, description="Inferred strategic priorities.")
+    intel_domain: Optional[str] = Field(None, description="Normalized domain of the shared company_intel research.")
 
 class ScheduledEmail(BaseModel):
     recipient_email: str = Field(..., description="Email address of the recipient.")
@@ -1,14 +1,17 @@
-import httpx
 import logging
+import time
 from backend.config.settings import settings
+from backend.services.usage_ledger import usage_ledger, APOLLO
+from backend.services.http_client import http_client
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
-async def get_work_email(name: str, domain: str) -> Optional[str]:
+async def get_work_email(name: str, domain: str, caller: str = "apollo") -> Optional[str]:
     """
     Search for a person's work email using Apollo.io API.
     Uses 'match' logic to be as precise as possible and save credits.
+    Each match request is recorded in the usage ledger under `caller`.
     """
     if not settings.APOLLO_API_KEY:
         logger.warning("APOLLO_API_KEY not set. Skipping enrichment.")
@@ -33,29 +36,36 @@ async def get_work_email(name: str, domain: str) -> Optional[str]:
         "domain": domain
     }
 
+    started = time.monotonic()
+    ok = False
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers, timeout=10.0)
+        response = await http_client.request("POST", url, caller, json=payload, headers=headers, timeout=10.0)
+        ok = response.status_code == 200
+
+        if response.status_code == 200:
+            data = response.json()
+            person = data.get("person", {})
             
-            if response.status_code == 200:
-                data = response.json()
-                person = data.get("person", {})
-                
-                # Check for verified email
-                email = person.get("email")
-                if email:
-                    status = person.get("email_status")
-                    if status in ["verified", "likely_to_be_deliverable"]:
-                        return email
-                    else:
-                        logger.info(f"Apollo found unverified email for {name}: {email} (Status: {status})")
-                        return None
+            # Check for verified email
+            email = person.get("email")
+            if email:
+                status = person.get("email_status")
+                if status in ["verified", "likely_to_be_deliverable"]:
+                    return email
                 else:
-                    logger.info(f"Apollo found person but no email for {name}.")
-                return None
+                    logger.info(f"Apollo found unverified email for {name}: {email} (Status: {status})")
+                    return None
             else:
-                logger.error(f"Apollo API error ({response.status_code}): {response.text}")
-                return None
+                logger.info(f"Apollo found person but no email for {name}.")
+            return None
+        else:
+            logger.error(f"Apollo API error ({response.status_code}): {response.text}")
+            return None
     except Exception as e:
         logger.error(f"Error calling Apollo API: {e}")
         return None
+    finally:
+        # One enrichment credit per successful match request
+        credits = 1 if ok else 0
+        usage_ledger.record(APOLLO, caller, time.monotonic() - started, ok, units=credits,
+                            cost_usd=credits * settings.USAGE_APOLLO_CREDIT_USD)
@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import random
+import re
+from typing import Dict, List, Tuple
+
+from backend.services.context_builder import count_tokens
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 16 bands x 4 rows: pairs at ~0.8 Jaccard collide in a band with >95% probability
+ROWS = NUM_PERMUTATIONS // BANDS
+SIMILARITY_THRESHOLD = 0.8
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(1337)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERMUTATIONS)]
+
+_WORD = re.compile(r"\w+")
+
+
+def _shingles(words: List[str]) -> set:
+    if len(words) < SHINGLE_WORDS:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _stable_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+
+
+def minhash(shingles: set) -> Tuple[int, ...]:
+    hashes = [_stable_hash(s) for s in shingles]
+    return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimated_similarity(sig_a, sig_b) -> float:
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class ParagraphDeduper:
+    """
+    Remembers every paragraph it has kept (across the pages of one site) and
+    rejects exact repeats and near-duplicates (MinHash over word shingles,
+    LSH-banded), i.e. navigation, footers and cookie banners.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._exact = set()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[Tuple[int, ...]]] = {}
+
+    def is_new(self, paragraph: str) -> bool:
+        words = _WORD.findall(paragraph.lower())
+        if not words:
+            return False
+        exact = " ".join(words)
+        if exact in self._exact:
+            return False
+        if len(words) >= SHINGLE_WORDS:
+            signature = minhash(_shingles(words))
+            bands = [(b, signature[b * ROWS:(b + 1) * ROWS]) for b in range(BANDS)]
+            for key in bands:
+                for other in self._buckets.get(key, ()):
+                    if estimated_similarity(signature, other) >= self.threshold:
+                        return False
+            for key in bands:
+                self._buckets.setdefault(key, []).append(signature)
+        self._exact.add(exact)
+        return True
+
+    def filter(self, text: str) -> str:
+        paragraphs = [p.strip() for p in re.split(r"\n+", text or "")]
+        return "\n".join(p for p in paragraphs if p and self.is_new(p))
+
+
+def dedupe_pages(pages: List[Tuple[str, str]], source: str = "pages") -> List[Tuple[str, str]]:
+    """
+    Drops paragraphs already seen on an earlier page of the same site (or
+    earlier on the same page). Pages left empty are removed. Token reduction
+    is recorded under the 'content_dedup' metrics group, keyed by `source`.
+    """
+    deduper = ParagraphDeduper()
+    before = after = 0
+    result = []
+    for label, text in pages:
+        kept = deduper.filter(text)
+        before += count_tokens(text)
+        after += count_tokens(kept)
+        if kept:
+            result.append((label, kept))
+
+    metrics.incr("content_dedup", f"{source}.tokens_before", before)
+    metrics.incr("content_dedup", f"{source}.tokens_after", after)
+    if before:
+        logger.info(f"Content dedup ({source}): {before} -> {after} tokens ({1 - after / before:.0%} removed)")
+    return result
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import re
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o / gpt-4o-mini tokenizer
+except Exception:  # tiktoken missing or encoding files unavailable offline
+    _encoding = None
+
+# Token budget for the search/page context block of each chain's prompt
+CHAIN_CONTEXT_BUDGETS = {
+    "target_discovery.candidates": 3000,
+    "target_discovery.research": 3000,
+    "decision_maker_finder.identity": 2500,
+    "user_intelligence.profile": 4000,
+}
+DEFAULT_CONTEXT_BUDGET = 3000
+
+# A search result never gets less than this, so low-ranked hits are dropped rather than shredded
+MIN_RESULT_TOKENS = 120
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to at most max_tokens, on a token boundary and preferably at a sentence/line end."""
+    if max_tokens <= 0 or not text:
+        return ""
+    # Two tokens are kept back for the ellipsis marking the cut
+    if _encoding is not None:
+        tokens = _encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        cut = _encoding.decode(tokens[:max(max_tokens - 2, 1)])
+    else:
+        if len(text) <= max_tokens * 4:
+            return text
+        cut = text[:max(max_tokens - 2, 1) * 4]
+    # Back off to the last sentence/line end if it does not cost more than a fifth of the text
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    if boundary > len(cut) * 0.8:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + " …"
+
+
+def normalize_text(text: str) -> str:
+    text = re.sub(r"[ \t\r\f\v]+", " ", text or "")
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit((url or "").strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def normalize_domain(url: str) -> str:
+    """'https://www.Acme.com/about' -> 'acme.com'."""
+    url = (url or "").strip().lower()
+    host = urlsplit(url if "//" in url else f"//{url}").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha1(re.sub(r"\W+", " ", text.lower()).strip().encode()).hexdigest()
+
+
+def _budget(chain: str, budget: Optional[int]) -> int:
+    return budget or CHAIN_CONTEXT_BUDGETS.get(chain, DEFAULT_CONTEXT_BUDGET)
+
+
+def _report(chain: str, before: int, after: int):
+    metrics.incr("context_tokens", f"{chain}.before", before)
+    metrics.incr("context_tokens", f"{chain}.after", after)
+    logger.info(f"Context for {chain}: {before} -> {after} tokens")
+
+
+def search_results_context(search_response, chain: str, budget: int = None) -> str:
+    """
+    Compact prompt context from a Tavily response: best-scored results first,
+    duplicates (same URL or same snippet) dropped, only title/url/snippet kept,
+    each result capped so that as many sources as possible fit the budget.
+    """
+    budget = _budget(chain, budget)
+    before = count_tokens(str(search_response))
+
+    if isinstance(search_response, str):
+        context = truncate_to_tokens(normalize_text(search_response), budget)
+        _report(chain, before, count_tokens(context))
+        return context
+
+    results = search_response.get("results", []) if isinstance(search_response, dict) else list(search_response or [])
+    results = sorted(results, key=lambda r: r.get("score") or 0, reverse=True)
+
+    unique = []
+    seen_urls, seen_content = set(), set()
+    for r in results:
+        content = normalize_text(r.get("content") or "")
+        url_key, content_key = normalize_url(r.get("url", "")), _fingerprint(content)
+        if not content or url_key in seen_urls or content_key in seen_content:
+            continue
+        seen_urls.add(url_key)
+        seen_content.add(content_key)
+        unique.append((r.get("title") or "", r.get("url") or "", content))
+
+    blocks = []
+    answer = search_response.get("answer") if isinstance(search_response, dict) else None
+    if answer:
+        blocks.append(f"Summary: {normalize_text(answer)}")
+    remaining = budget - count_tokens("\n\n".join(blocks))
+    per_result = max(MIN_RESULT_TOKENS, remaining // max(len(unique), 1))
+
+    for i, (title, url, content) in enumerate(unique, 1):
+        header = f"[{i}] {title}\nURL: {url}\n"
+        allowance = min(per_result, remaining) - count_tokens(header)
+        if allowance < MIN_RESULT_TOKENS // 2:
+            break
+        block = header + truncate_to_tokens(content, allowance)
+        blocks.append(block)
+        remaining -= count_tokens(block) + 1
+
+    context = "\n\n".join(blocks)
+    _report(chain, before, count_tokens(context))
+    return context
+
+
+def pages_context(pages: Iterable[Tuple[str, str]], chain: str, budget: int = None) -> str:
+    """
+    Compact prompt context from scraped pages [(label, text)]: whitespace
+    normalized, paragraphs repeated across pages (nav, footers) kept once,
+    and the budget shared fairly so one long page cannot crowd out the rest.
+    """
+    budget = _budget(chain, budget)
+    pages = [(label, text) for label, text in pages if text]
+    before = sum(count_tokens(text) for _, text in pages)
+
+    seen = set()
+    cleaned: List[Tuple[str, str]] = []
+    for label, text in pages:
+        paragraphs = []
+        for para in normalize_text(text).split("\n"):
+            para = para.strip()
+            key = _fingerprint(para)
+            if not para or key in seen:
+                continue
+            seen.add(key)
+            paragraphs.append(para)
+        if paragraphs:
+            cleaned.append((label, "\n".join(paragraphs)))
+
+    # Water-filling: small pages keep everything, the rest split what is left evenly
+    headers = [f"--- CONTENT FROM {label} ---\n" for label, _ in cleaned]
+    sizes = [count_tokens(text) for _, text in cleaned]
+    available = budget - sum(count_tokens(h) for h in headers)
+    allowances = [0] * len(cleaned)
+    pending = sorted(range(len(cleaned)), key=lambda i: sizes[i])
+    while pending:
+        share = max(available, 0) // len(pending)
+        i = pending.pop(0)
+        allowances[i] = min(sizes[i], share)
+        available -= allowances[i]
+
+    blocks = [h + truncate_to_tokens(text, allowance)
+              for h, (_, text), allowance in zip(headers, cleaned, allowances) if allowance > 0]
+    context = "\n\n".join(blocks)
+    _report(chain, before, count_tokens(context))
+    return context
@@ -85,3 +85,139 @@ CREATE TABLE IF NOT EXISTS scheduled_emails (
     step INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
+
+-- Reminder pre-drafting: subject/body on scheduled_emails hold the ready draft
+ALTER TABLE scheduled_emails ADD COLUMN IF NOT EXISTS drafted_at TIMESTAMP WITH TIME ZONE;
+-- Lease while a reminder is being drafted, and the outbound email the draft follows up on
+ALTER TABLE scheduled_emails ADD COLUMN IF NOT EXISTS draft_claimed_until TIMESTAMP WITH TIME ZONE;
+ALTER TABLE scheduled_emails ADD COLUMN IF NOT EXISTS drafted_from_email_id UUID;
+
+-- Orchestrator queue bookkeeping (retries and claim leases)
+ALTER TABLE event_log ADD COLUMN IF NOT EXISTS retry_count INTEGER DEFAULT 0;
+ALTER TABLE event_log ADD COLUMN IF NOT EXISTS last_error TEXT;
+ALTER TABLE event_log ADD COLUMN IF NOT EXISTS next_retry_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE event_log ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP WITH TIME ZONE;
+CREATE INDEX IF NOT EXISTS idx_event_log_unprocessed ON event_log (created_at) WHERE processed = FALSE;
+ALTER TABLE event_log ADD COLUMN IF NOT EXISTS error_class TEXT;
+ALTER TABLE event_log ADD COLUMN IF NOT EXISTS last_stack TEXT;
+
+-- Dead-letter queue for events that exhausted their retries
+CREATE TABLE IF NOT EXISTS event_dead_letters (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    event_id UUID NOT NULL,
+    event_type TEXT NOT NULL,
+    entity_id UUID,
+    entity_type TEXT,
+    payload JSONB,
+    retry_count INTEGER,
+    last_error TEXT,
+    error_class TEXT,
+    stack TEXT,
+    event_created_at TIMESTAMP WITH TIME ZONE,
+    dead_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    replayed_at TIMESTAMP WITH TIME ZONE
+);
+CREATE INDEX IF NOT EXISTS idx_dead_letters_pending ON event_dead_letters (event_type, error_class) WHERE replayed_at IS NULL;
+
+-- Orchestrator claim priority (lower runs first, see neon_db.EVENT_PRIORITIES)
+ALTER TABLE event_log ADD COLUMN IF NOT EXISTS priority INTEGER DEFAULT 50;
+ALTER TABLE event_dead_letters ADD COLUMN IF NOT EXISTS priority INTEGER;
+-- The claim orders by priority aged by wait time, which no index can serve; the unprocessed
+-- rows it sorts are found through idx_event_log_unprocessed
+DROP INDEX IF EXISTS idx_event_log_priority;
+
+-- Shared cache of deterministic LLM responses (see services/llm_cache.py)
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,
+    chain TEXT NOT NULL,
+    model TEXT,
+    response TEXT NOT NULL,
+    size_bytes INTEGER,
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_lru ON llm_cache (last_hit_at);
+
+-- Shared cache of Tavily search responses (see services/search_cache.py)
+CREATE TABLE IF NOT EXISTS search_cache (
+    cache_key TEXT PRIMARY KEY,
+    query_class TEXT NOT NULL, -- 'company_profile', 'prospect_list', 'leadership'
+    query TEXT NOT NULL, -- normalized query text
+    response TEXT NOT NULL,
+    size_bytes INTEGER,
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    fresh_until TIMESTAMP WITH TIME ZONE NOT NULL,
+    stale_until TIMESTAMP WITH TIME ZONE NOT NULL -- served while refreshing in the background until then
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_lru ON search_cache (last_hit_at);
+
+-- Who labeled an inbound reply ('llm' or 'fast_path'); the fast path trains only on LLM labels
+ALTER TABLE emails ADD COLUMN IF NOT EXISTS intent_source TEXT;
+
+-- Offline bulk drafting jobs (see services/llm_batch.py and background_workers/batch_poller.py)
+CREATE TABLE IF NOT EXISTS llm_batch_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    campaign_id UUID REFERENCES campaigns(id),
+    kind TEXT NOT NULL, -- 'initial_drafts'
+    backend TEXT NOT NULL, -- 'openai', 'local'
+    provider_batch_id TEXT NOT NULL,
+    status TEXT DEFAULT 'SUBMITTED', -- 'SUBMITTED', 'COMPLETED', 'FAILED'
+    request_count INTEGER,
+    succeeded_count INTEGER DEFAULT 0,
+    failed_count INTEGER DEFAULT 0,
+    items JSONB, -- custom_id -> lead the request drafts for
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+CREATE INDEX IF NOT EXISTS idx_llm_batch_jobs_open ON llm_batch_jobs (created_at) WHERE status = 'SUBMITTED';
+
+-- Rolling per-DM thread summary, refreshed in orchestrator idle time (see agents/conversation_summarizer.py)
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+    decision_maker_id UUID PRIMARY KEY REFERENCES decision_makers(id),
+    summary TEXT NOT NULL,
+    summarized_through TIMESTAMP WITH TIME ZONE NOT NULL, -- newest message folded into the summary
+    message_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Append-only usage ledger: one row per LLM, search or enrichment call (see services/usage_ledger.py).
+-- No foreign key on campaign_id: spend stays auditable after a campaign is deleted.
+CREATE TABLE IF NOT EXISTS usage_events (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    campaign_id UUID,
+    stage TEXT, -- workflow node or orchestrator event type
+    agent TEXT NOT NULL,
+    provider TEXT NOT NULL, -- 'openai', 'tavily', 'apollo'
+    chain TEXT, -- prompt chain@version for LLM calls
+    model TEXT,
+    prompt_tokens INTEGER DEFAULT 0,
+    cached_tokens INTEGER DEFAULT 0,
+    completion_tokens INTEGER DEFAULT 0,
+    units REAL DEFAULT 0, -- provider credits for search/enrichment calls
+    latency_ms INTEGER,
+    cache_status TEXT, -- 'hit', 'miss', 'batch' for Batch API results, NULL when not cacheable
+    ok BOOLEAN DEFAULT TRUE,
+    cost_usd NUMERIC(12, 6) DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_usage_events_campaign ON usage_events (campaign_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_usage_events_created ON usage_events (created_at);
+
+-- Company research shared across campaigns, keyed by normalized domain (see TargetDiscoveryAgent.company_research)
+CREATE TABLE IF NOT EXISTS company_intel (
+    domain TEXT PRIMARY KEY,
+    name TEXT,
+    site_hash TEXT NOT NULL, -- fingerprint of the scraped site text the research was made from
+    research_version TEXT, -- research prompt chain@version
+    recent_news TEXT[],
+    key_challenges TEXT[],
+    strategic_priorities TEXT[],
+    researched_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    checked_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP -- last re-scrape that confirmed site_hash
+);
+ALTER TABLE target_companies ADD COLUMN IF NOT EXISTS intel_domain TEXT REFERENCES company_intel(domain);
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+
+from langchain_core.utils.json import parse_partial_json
+from backend.config.settings import settings
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def json_body_so_far(raw: str) -> Optional[str]:
+    """Readable part of a partially generated {"subject", "body"} JSON draft (None while undecidable)."""
+    start = raw.find("{")
+    if start < 0:
+        return ""
+    parsed = parse_partial_json(raw[start:])
+    if not isinstance(parsed, dict):
+        return None
+    body = parsed.get("body")
+    return body if isinstance(body, str) else ""
+
+
+def sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+class DraftStream:
+    """
+    One draft being generated. `update()` takes the full readable text so far
+    and publishes only what was appended; anything else (a retry, a JSON field
+    that parsed differently) is sent as a reset with the whole text.
+    """
+
+    def __init__(self, broker: "DraftStreamBroker", campaign_id: str, dm_id: str = None,
+                 kind: str = "draft", label: dict = None):
+        self.broker = broker
+        self.id = str(uuid.uuid4())
+        self.campaign_id = str(campaign_id) if campaign_id else None
+        self.dm_id = str(dm_id) if dm_id else None
+        self.kind = kind
+        self.label = label or {}  # e.g. recipient name/email while the DM row does not exist yet
+        self.text = ""
+        self.finished = False
+        self.started = time.monotonic()
+        self._first_token = None
+
+    def _event(self, type_: str, **fields) -> dict:
+        return {"type": type_, "stream_id": self.id, "campaign_id": self.campaign_id,
+                "dm_id": self.dm_id, "kind": self.kind, **self.label, **fields}
+
+    def snapshot(self) -> dict:
+        return self._event("snapshot", text=self.text)
+
+    def update(self, text: Optional[str]):
+        if text is None or text == self.text or self.finished:
+            return
+        if self._first_token is None:
+            self._first_token = time.monotonic()
+            metrics.observe("draft_stream", f"{self.kind}.first_token", self._first_token - self.started)
+        if text.startswith(self.text):
+            delta, self.text = text[len(self.text):], text
+            self.broker.publish(self._event("delta", text=delta))
+        else:
+            self.text = text
+            self.broker.publish(self._event("reset", text=text))
+
+    def done(self, subject: str, body: str, email_id: str = None):
+        if self.finished:
+            return
+        self.finished = True
+        metrics.observe("draft_stream", f"{self.kind}.complete", time.monotonic() - self.started)
+        self.broker.publish(self._event("done", subject=subject, body=body, email_id=email_id))
+        self.broker.close(self)
+
+    def fail(self, error: str):
+        if self.finished:
+            return
+        self.finished = True
+        metrics.observe("draft_stream", f"{self.kind}.complete", time.monotonic() - self.started, ok=False)
+        self.broker.publish(self._event("error", error=error))
+        self.broker.close(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if not self.finished:
+            self.fail(str(exc) if exc else "Draft was not produced")
+        return False
+
+
+class Subscription:
+    """Queue of stream events matching a campaign, a DM or a single stream."""
+
+    def __init__(self, broker: "DraftStreamBroker", campaign_id: str = None, dm_id: str = None, stream_id: str = None):
+        self.broker = broker
+        self.campaign_id = str(campaign_id) if campaign_id else None
+        self.dm_id = str(dm_id) if dm_id else None
+        self.stream_id = stream_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.DRAFT_STREAM_QUEUE_SIZE)
+
+    def matches(self, event: dict) -> bool:
+        if self.stream_id:
+            return event["stream_id"] == self.stream_id
+        if self.dm_id:
+            return event["dm_id"] == self.dm_id
+        return event["campaign_id"] == self.campaign_id
+
+    def push(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow reader: drop the backlog and resync it with snapshots of the live drafts
+            metrics.incr("draft_stream", "resyncs")
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            for stream in list(self.broker._streams.values()):
+                if self.matches(stream.snapshot()):
+                    self.queue.put_nowait(stream.snapshot())
+            if event["type"] in ("done", "error"):
+                self.queue.put_nowait(event)
+
+    async def events(self, keepalive: float = None):
+        """SSE-formatted events; a comment line every `keepalive` seconds keeps proxies from closing the stream."""
+        keepalive = keepalive or settings.DRAFT_STREAM_KEEPALIVE_SECONDS
+        while True:
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield sse(event)
+            if self.stream_id and event["type"] in ("done", "error"):
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.broker.unsubscribe(self)
+
+
+class DraftStreamBroker:
+    """
+    In-process fan-out of draft tokens to SSE subscribers. Covers drafts made by
+    the API process and by bundled workers (BUNDLE_WORKERS); a worker running in
+    its own process has no subscribers, so its drafts only appear on the next poll.
+    """
+
+    def __init__(self):
+        self._streams = {}
+        self._subscribers = set()
+
+    def open(self, campaign_id: str, dm_id: str = None, kind: str = "draft", label: dict = None) -> DraftStream:
+        self.active_streams()
+        stream = DraftStream(self, campaign_id, dm_id, kind, label)
+        self._streams[stream.id] = stream
+        self.publish(stream._event("start"))
+        return stream
+
+    def close(self, stream: DraftStream):
+        self._streams.pop(stream.id, None)
+
+    def active_streams(self):
+        # A stream whose owner died without finishing it is dropped after DRAFT_STREAM_MAX_SECONDS
+        cutoff = time.monotonic() - settings.DRAFT_STREAM_MAX_SECONDS
+        for stream in [s for s in self._streams.values() if s.started < cutoff]:
+            stream.fail("Draft stream timed out")
+        return list(self._streams.values())
+
+    def subscribe(self, campaign_id: str = None, dm_id: str = None, stream_id: str = None) -> Subscription:
+        subscription = Subscription(self, campaign_id, dm_id, stream_id)
+        # Late joiners first get what is already drafted
+        for stream in self.active_streams():
+            snapshot = stream.snapshot()
+            if subscription.matches(snapshot):
+                subscription.push(snapshot)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: dict):
+        for subscription in list(self._subscribers):
+            if subscription.matches(event):
+                subscription.push(event)
+
+
+async def stream_completion(chain, inputs: dict, stream: Optional[DraftStream], json_body: bool = False) -> str:
+    """
+    Runs `chain` and returns the full completion text, as ainvoke would. With a
+    stream, tokens are relayed as they arrive (for JSON drafts only the body).
+    """
+    if stream is None:
+        return (await chain.ainvoke(inputs)).content
+    raw = ""
+    async for chunk in chain.astream(inputs):
+        raw += chunk.content or ""
+        stream.update(json_body_so_far(raw) if json_body else raw)
+    return raw
+
+
+draft_streams = DraftStreamBroker()
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+from backend.config.settings import settings
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Set per request to attribute metrics; stripped before the request leaves the process
+CALLER_HEADER = "x-http-caller"
+
+BROWSER_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36")
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (optional: pip install httpx[http2])
+        return True
+    except ImportError:
+        return False
+
+
+class ReleasingStream(httpx.AsyncByteStream):
+    """Response body that gives back its host slot once the caller has closed it."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, release):
+        self.inner = inner
+        self.release = release
+
+    async def __aiter__(self):
+        async for chunk in self.inner:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.inner.aclose()
+        finally:
+            if self.release is not None:
+                self.release()
+                self.release = None
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Caps in-flight requests per host (httpx only caps the pool as a whole) and
+    records per-caller latency to response headers.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, per_host: int):
+        self.inner = inner
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        caller = request.headers.pop(CALLER_HEADER, "unknown")
+        slot = self._hosts[request.url.host]
+        queued = time.monotonic()
+        await slot.acquire()
+        started = time.monotonic()
+        metrics.observe("http_queue_wait", caller, started - queued)
+        try:
+            response = await self.inner.handle_async_request(request)
+        except Exception:
+            slot.release()
+            metrics.observe("http", caller, time.monotonic() - started, ok=False)
+            raise
+        metrics.observe("http", caller, time.monotonic() - started, ok=response.status_code < 400)
+        if response.is_closed:
+            slot.release()  # body already read in full (e.g. a stand-in transport)
+        else:
+            response.stream = ReleasingStream(response.stream, slot.release)
+        return response
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class HttpClient:
+    """
+    Process-wide pooled HTTP clients for everything that is not an LLM call
+    (those go through llm_gateway): domain checks, page fetches for scraping
+    and API enrichment. One keep-alive pool per certificate policy, opened on
+    first use and closed in the app lifespan.
+    """
+
+    def __init__(self):
+        self._clients = {}
+
+    def client(self, verify: bool = True) -> httpx.AsyncClient:
+        if verify not in self._clients:
+            http2 = settings.HTTP2_ENABLED and http2_available()
+            if settings.HTTP2_ENABLED and not http2:
+                logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed. Using HTTP/1.1.")
+            inner = httpx.AsyncHTTPTransport(
+                verify=verify,
+                http2=http2,
+                retries=1,  # connection failures only
+                limits=httpx.Limits(max_connections=settings.HTTP_MAX_CONNECTIONS,
+                                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                                    keepalive_expiry=settings.HTTP_KEEPALIVE_SECONDS)
+            )
+            self._clients[verify] = httpx.AsyncClient(
+                transport=HostLimitedTransport(inner, settings.HTTP_PER_HOST_CONNECTIONS),
+                timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS),
+                follow_redirects=True
+            )
+        return self._clients[verify]
+
+    async def request(self, method: str, url: str, caller: str, verify: bool = True, **kwargs) -> httpx.Response:
+        """client().request with the caller tagged for metrics; `verify=False` for arbitrary prospect sites."""
+        headers = {CALLER_HEADER: caller, **(kwargs.pop("headers", None) or {})}
+        return await self.client(verify).request(method, url, headers=headers, **kwargs)
+
+    async def fetch_html(self, url: str, caller: str) -> Optional[str]:
+        """
+        Page source for trafilatura.extract (replaces trafilatura.fetch_url): browser
+        User-Agent, no certificate check, at most HTTP_MAX_PAGE_BYTES. None on any
+        failure, non-200 status or non-text content.
+        """
+        headers = {CALLER_HEADER: caller, "User-Agent": BROWSER_USER_AGENT}
+        try:
+            async with self.client(verify=False).stream("GET", url, headers=headers) as response:
+                content_type = response.headers.get("content-type", "text/html")
+                if response.status_code != 200 or not any(t in content_type for t in ("html", "text", "xml")):
+                    return None
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) > settings.HTTP_MAX_PAGE_BYTES:
+                        metrics.incr("http", f"{caller}.oversized")
+                        return None
+                return body.decode(response.encoding or "utf-8", errors="replace")
+        except httpx.HTTPError as e:
+            logger.warning(f"Fetching {url} failed: {e!r}")
+            return None
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_client = HttpClient()
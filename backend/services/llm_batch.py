@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from backend.config.settings import settings
+from backend.services.http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Normalized job states shared by every backend
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+FAILED = "failed"
+
+_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def messages_to_openai(messages) -> List[dict]:
+    """Converts formatted LangChain messages (prompt.format_messages) to chat completion dicts."""
+    return [{"role": _ROLES.get(m.type, m.type), "content": m.content} for m in messages]
+
+
+def build_batch_request(custom_id: str, messages: List[dict], model: str = "gpt-4o-mini",
+                        temperature: float = 0.7, max_tokens: int = None) -> dict:
+    """One line of an OpenAI Batch input file."""
+    body = {"model": model, "messages": messages, "temperature": temperature}
+    if max_tokens:
+        body["max_tokens"] = max_tokens
+    return {"custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS_URL, "body": body}
+
+
+def to_jsonl(requests: List[dict]) -> bytes:
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in requests).encode()
+
+
+def parse_batch_output(text: str) -> Dict[str, dict]:
+    """
+    Reads an OpenAI Batch output (or error) file. Returns
+    {custom_id: {"content": str | None, "error": str | None, "model": str | None, "usage": dict}}.
+    """
+    results = {}
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        response = row.get("response") or {}
+        body = response.get("body") or {}
+        error = row.get("error")
+        content = None
+        if not error and response.get("status_code") == 200:
+            try:
+                content = body["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                error = {"message": "Malformed completion body"}
+        elif not error:
+            error = body.get("error") or {"message": f"HTTP {response.get('status_code')}"}
+        results[row["custom_id"]] = {
+            "content": content,
+            "error": (error.get("message") if isinstance(error, dict) else str(error)) if error else None,
+            "model": body.get("model"),
+            "usage": body.get("usage") or {}
+        }
+    return results
+
+
+class OpenAIBatchBackend:
+    """Submits JSONL input files to the OpenAI Batch API (24h completion window)."""
+
+    name = "openai"
+    base_url = "https://api.openai.com"
+
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        return await http_client.request(method, f"{self.base_url}{path}", "LLMBatch",
+                                         headers=self._headers(), timeout=120.0, **kwargs)
+
+    async def submit(self, requests: List[dict], metadata: dict = None) -> str:
+        upload = await self._request(
+            "POST", "/v1/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch_input.jsonl", to_jsonl(requests), "application/jsonl")}
+        )
+        upload.raise_for_status()
+        batch = await self._request("POST", "/v1/batches", json={
+            "input_file_id": upload.json()["id"],
+            "endpoint": CHAT_COMPLETIONS_URL,
+            "completion_window": "24h",
+            "metadata": {k: str(v) for k, v in (metadata or {}).items()}
+        })
+        batch.raise_for_status()
+        return batch.json()["id"]
+
+    async def poll(self, batch_id: str) -> dict:
+        """{"status": IN_PROGRESS | COMPLETED | FAILED, "output": jsonl text | None, "error": str | None}"""
+        response = await self._request("GET", f"/v1/batches/{batch_id}")
+        response.raise_for_status()
+        batch = response.json()
+        status = batch.get("status")
+
+        if status in ("failed", "expired", "cancelled"):
+            errors = (batch.get("errors") or {}).get("data") or []
+            message = errors[0].get("message") if errors else status
+            # An expired batch may still have partial output worth keeping
+            if status != "expired" or not batch.get("output_file_id"):
+                return {"status": FAILED, "output": None, "error": message}
+        elif status != "completed":
+            return {"status": IN_PROGRESS, "output": None, "error": None}
+
+        # Successful lines and per-request failures live in separate files
+        chunks = []
+        for file_key in ("output_file_id", "error_file_id"):
+            if batch.get(file_key):
+                content = await self._request("GET", f"/v1/files/{batch[file_key]}/content")
+                content.raise_for_status()
+                chunks.append(content.text.strip("\n"))
+        return {"status": COMPLETED, "output": "\n".join(c for c in chunks if c), "error": None}
+
+
+def offline_draft_responder(body: dict) -> str:
+    """Deterministic stand-in completion built from the drafting prompt's fields."""
+    user = next((m["content"] for m in reversed(body.get("messages", [])) if m["role"] == "user"), "")
+    fields = dict(line.split(":", 1) for line in user.splitlines() if ":" in line)
+    person = fields.get("Target Person", "there").split(",")[0].strip()
+    company = fields.get("Target Company", "your team").strip()
+    sender = fields.get("My Company", "Our").strip()
+    return (f"Subject: A quick idea for {company}\n"
+            f"Hi {person},\n\n"
+            f"This is an offline stand-in draft for {company}.\n\n"
+            f"Best,\nThe {sender} Team")
+
+
+class LocalBatchBackend:
+    """
+    File-based stand-in for the Batch API so bulk drafting runs offline.
+    Each job is a directory with input.jsonl and status.json; output.jsonl
+    appears on the first poll after `delay_seconds`, produced by `responder`.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str = None, responder: Callable[[dict], str] = None,
+                 delay_seconds: float = None):
+        self.directory = directory or settings.LLM_BATCH_LOCAL_DIR
+        self.responder = responder or offline_draft_responder
+        self.delay_seconds = settings.LLM_BATCH_LOCAL_DELAY_SECONDS if delay_seconds is None else delay_seconds
+
+    def _path(self, batch_id: str, name: str) -> str:
+        return os.path.join(self.directory, batch_id, name)
+
+    async def submit(self, requests: List[dict], metadata: dict = None) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex}"
+        os.makedirs(os.path.join(self.directory, batch_id))
+        with open(self._path(batch_id, "input.jsonl"), "wb") as f:
+            f.write(to_jsonl(requests))
+        with open(self._path(batch_id, "status.json"), "w") as f:
+            json.dump({"submitted_at": time.time(), "metadata": metadata or {}}, f)
+        return batch_id
+
+    async def poll(self, batch_id: str) -> dict:
+        try:
+            with open(self._path(batch_id, "status.json")) as f:
+                status = json.load(f)
+        except FileNotFoundError:
+            return {"status": FAILED, "output": None, "error": f"Unknown local batch {batch_id}"}
+
+        output_path = self._path(batch_id, "output.jsonl")
+        if not os.path.exists(output_path):
+            if time.time() - status["submitted_at"] < self.delay_seconds:
+                return {"status": IN_PROGRESS, "output": None, "error": None}
+            self._complete(batch_id, output_path)
+        with open(output_path) as f:
+            return {"status": COMPLETED, "output": f.read(), "error": None}
+
+    def _complete(self, batch_id: str, output_path: str):
+        lines = []
+        with open(self._path(batch_id, "input.jsonl")) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                row = {"id": f"batch_req_{uuid.uuid4().hex}", "custom_id": request["custom_id"], "error": None}
+                try:
+                    content = self.responder(request["body"])
+                    row["response"] = {"status_code": 200, "body": {
+                        "object": "chat.completion",
+                        "model": request["body"].get("model"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                     "finish_reason": "stop"}]
+                    }}
+                except Exception as e:
+                    row["response"] = None
+                    row["error"] = {"code": "stand_in_error", "message": str(e)}
+                lines.append(json.dumps(row))
+        with open(output_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def get_batch_backend(name: Optional[str] = None):
+    name = name or settings.LLM_BATCH_BACKEND
+    if name == "local":
+        return LocalBatchBackend()
+    return OpenAIBatchBackend()
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from backend.config.settings import settings
+from backend.services.neon_db import get_db_connection
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Deterministic (temperature=0) chains that may be served from cache, with their TTL in hours
+CHAIN_TTL_HOURS = {
+    "context_planning.extract": 24 * 7,
+    "user_intelligence.profile": 24 * 3,
+    "user_intelligence.map": 24 * 3,
+    "target_discovery.candidates": 24,
+    "target_discovery.research": 24 * 3,
+    "target_discovery.map": 24 * 3,
+    "decision_maker_finder.identity": 24 * 3,
+    "intent_analyzer.classify": 24 * 30,
+}
+
+_bypass = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Forces fresh LLM calls for everything awaited inside the block (e.g. a campaign relaunch)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class LLMResponseCache:
+    """
+    Postgres-backed cache of raw chat completion responses, shared by every
+    process that talks to the same database. Entries expire per chain and
+    the table is trimmed by least-recent use to LLM_CACHE_MAX_MB.
+
+    Like the rest of neon_db, every lookup opens its own connection, so each
+    cacheable call pays one connection setup plus a round trip before it
+    reaches the provider (recorded as llm_cache lookup latency). That is
+    small next to a completion, which a hit saves outright.
+    """
+
+    def __init__(self):
+        self._writes = 0
+        self._pending = set()
+
+    def cacheable(self, chain: Optional[str], payload: dict) -> bool:
+        if not settings.LLM_CACHE_ENABLED or _bypass.get():
+            return False
+        if chain not in CHAIN_TTL_HOURS or payload.get("stream"):
+            return False
+        return payload.get("temperature") in (0, 0.0)
+
+    def key(self, payload: dict) -> str:
+        # The request body carries model, prompt messages, tools/schema and params
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return f"{payload.get('model', '')}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    async def get(self, chain: str, cache_key: str) -> Optional[bytes]:
+        started = time.monotonic()
+        try:
+            conn = await get_db_connection()
+            try:
+                async with conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute("""
+                            UPDATE llm_cache SET hits = hits + 1, last_hit_at = NOW()
+                            WHERE cache_key = %s AND expires_at > NOW()
+                            RETURNING response
+                        """, (cache_key,))
+                        row = await cur.fetchone()
+            finally:
+                await conn.close()
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed ({chain}): {e}")
+            return None
+        metrics.observe("llm_cache", "lookup", time.monotonic() - started)
+        metrics.incr("llm_cache", f"{chain}.hits" if row else f"{chain}.misses")
+        return row['response'].encode() if row else None
+
+    def put(self, chain: str, cache_key: str, model: str, content: bytes):
+        """Stores a response in the background; callers never wait on the write."""
+        task = asyncio.create_task(self._put(chain, cache_key, model, content))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _put(self, chain: str, cache_key: str, model: str, content: bytes):
+        try:
+            conn = await get_db_connection()
+            try:
+                async with conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute("""
+                            INSERT INTO llm_cache (cache_key, chain, model, response, size_bytes, expires_at)
+                            VALUES (%s, %s, %s, %s, %s, NOW() + make_interval(hours => %s))
+                            ON CONFLICT (cache_key) DO UPDATE SET
+                                response = EXCLUDED.response,
+                                size_bytes = EXCLUDED.size_bytes,
+                                created_at = NOW(),
+                                last_hit_at = NOW(),
+                                expires_at = EXCLUDED.expires_at
+                        """, (cache_key, chain, model, content.decode(), len(content), CHAIN_TTL_HOURS[chain]))
+
+                        self._writes += 1
+                        if self._writes % 100 == 0:
+                            await self._evict(cur)
+            finally:
+                await conn.close()
+        except Exception as e:
+            logger.warning(f"LLM cache write failed ({chain}): {e}")
+
+    async def _evict(self, cur):
+        await cur.execute("DELETE FROM llm_cache WHERE expires_at <= NOW()")
+        expired = cur.rowcount
+        await cur.execute("""
+            DELETE FROM llm_cache WHERE cache_key IN (
+                SELECT cache_key FROM (
+                    SELECT cache_key, SUM(size_bytes) OVER (ORDER BY last_hit_at DESC, cache_key) AS retained
+                    FROM llm_cache
+                ) ranked
+                WHERE retained > %s
+            )
+        """, (settings.LLM_CACHE_MAX_MB * 1024 * 1024,))
+        metrics.incr("llm_cache", "evicted", expired + cur.rowcount)
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from backend.config.settings import settings
+from backend.services.metrics import metrics
+from backend.services.llm_cache import llm_cache
+from backend.services.usage_ledger import usage_ledger
+
+logger = logging.getLogger(__name__)
+
+# Gateway-only headers set on each ChatOpenAI instance; stripped before the request leaves the process
+CALLER_HEADER = "x-gateway-caller"
+PRIORITY_HEADER = "x-gateway-priority"
+CHAIN_HEADER = "x-gateway-chain"
+PROMPT_VERSION_HEADER = "x-gateway-prompt-version"
+
+INTERACTIVE = "interactive"  # a prospect or reviewer is waiting on the result
+BACKGROUND = "background"    # campaign pipeline / bulk work
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, up to one minute of burst."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        """Consumes units; a negative amount refunds an over-estimate."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - min(amount, self.capacity))
+
+    def pause(self, seconds: float):
+        """Empties the bucket and holds refills for `seconds` (provider said slow down)."""
+        self.tokens = 0.0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Reads OpenAI's retry hints: retry-after-ms, retry-after (seconds or HTTP date)."""
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        pass
+    return None
+
+
+def estimate_request_tokens(payload: dict) -> int:
+    """Rough prompt + completion size of a chat completion request (~4 chars per token)."""
+    if "input" in payload:
+        # Embeddings request: input only, no completion
+        return len(json.dumps(payload["input"])) // 4
+    prompt_chars = sum(len(json.dumps(m.get("content") or "")) for m in payload.get("messages", []))
+    prompt_chars += len(json.dumps(payload.get("tools") or payload.get("response_format") or ""))
+    completion = payload.get("max_completion_tokens") or payload.get("max_tokens") or 512
+    return prompt_chars // 4 + completion
+
+
+def stream_tail_usage(tail: bytes) -> dict:
+    """`usage` of a streamed completion: the last SSE chunk carries it when stream_options.include_usage is set."""
+    for line in reversed(tail.decode("utf-8", "ignore").splitlines()):
+        if line.startswith("data: {") and '"usage"' in line:
+            try:
+                return json.loads(line[6:]).get("usage") or {}
+            except ValueError:
+                return {}
+    return {}
+
+
+class UsageRecordingStream(httpx.AsyncByteStream):
+    """Passes a streamed completion through and records its usage once the caller has read it."""
+
+    TAIL_BYTES = 4096
+
+    def __init__(self, inner: httpx.AsyncByteStream, on_close):
+        self.inner = inner
+        self.on_close = on_close
+        self.tail = b""
+
+    async def __aiter__(self):
+        async for chunk in self.inner:
+            self.tail = (self.tail + chunk)[-self.TAIL_BYTES:]
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.inner.aclose()
+        finally:
+            if self.on_close is not None:
+                self.on_close(stream_tail_usage(self.tail))
+                self.on_close = None
+
+
+class GatewayTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport behind every ChatOpenAI client: admission control against
+    the shared buckets, retry-after-aware retries and per-caller metrics.
+    """
+
+    def __init__(self, gateway: "LLMGateway", inner: httpx.AsyncBaseTransport):
+        self.gateway = gateway
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        caller = request.headers.pop(CALLER_HEADER, "unknown")
+        priority = request.headers.pop(PRIORITY_HEADER, BACKGROUND)
+        try:
+            payload = json.loads(await request.aread() or b"{}")
+        except ValueError:
+            payload = {}
+        estimated = estimate_request_tokens(payload)
+        streaming = payload.get("stream") is True
+
+        chain = request.headers.pop(CHAIN_HEADER, None)
+        prompt_version = request.headers.pop(PROMPT_VERSION_HEADER, None)
+        prompt_tag = f"{chain}@v{prompt_version}" if chain and prompt_version else chain
+        model = payload.get("model")
+        cache_key = None
+        cache_status = None
+        if llm_cache.cacheable(chain, payload):
+            lookup_started = time.monotonic()
+            cache_key = llm_cache.key(payload)
+            cached = await llm_cache.get(chain, cache_key)
+            if cached is not None:
+                usage_ledger.record_llm(caller, prompt_tag, model, {}, time.monotonic() - lookup_started, cache_status="hit")
+                return httpx.Response(200, headers={"content-type": "application/json"},
+                                      content=cached, request=request)
+            cache_status = "miss"
+
+        attempt = 0
+        while True:
+            waited = await self.gateway.acquire(estimated, priority)
+            metrics.observe("llm_queue_wait", caller, waited)
+            started = time.monotonic()
+            error = None
+            # A streamed body keeps its concurrency slot until the caller closes it
+            held_by_stream = False
+            try:
+                try:
+                    response = await self.inner.handle_async_request(request)
+                    content = None if streaming else await response.aread()
+                except httpx.TransportError as e:
+                    error = e
+                elapsed = time.monotonic() - started
+
+                if error is not None:
+                    metrics.observe("llm", caller, elapsed, ok=False)
+                    if attempt >= self.gateway.max_retries:
+                        usage_ledger.record_llm(caller, prompt_tag, model, {}, elapsed, ok=False, cache_status=cache_status)
+                        raise error
+                    delay = self.gateway.backoff(attempt)
+                    logger.warning(f"LLM transport error for {caller} ({error!r}). Retrying in {delay:.1f}s")
+                elif response.status_code in RETRYABLE_STATUSES and attempt < self.gateway.max_retries:
+                    if streaming:
+                        await response.aclose()
+                    delay = retry_after_seconds(response) or self.gateway.backoff(attempt)
+                    if response.status_code == 429:
+                        # Everyone backs off, not just this caller
+                        self.gateway.pause(delay)
+                        metrics.incr("llm", f"{caller}.rate_limited")
+                    logger.warning(f"LLM {response.status_code} for {caller}. Retrying in {delay:.1f}s (attempt {attempt + 1})")
+                else:
+                    ok = response.status_code < 400
+                    metrics.observe("llm", caller, elapsed, ok=ok)
+                    if streaming:
+                        if not ok:
+                            usage_ledger.record_llm(caller, prompt_tag, model, {}, elapsed, ok=False, cache_status=cache_status)
+
+                        # Usage arrives in the last chunk; settle and record it when the stream is closed
+                        def on_close(usage, started=started, ok=ok):
+                            try:
+                                if ok:
+                                    self.gateway.settle_usage(caller, usage, estimated, prompt_tag)
+                                    usage_ledger.record_llm(caller, prompt_tag, model, usage, time.monotonic() - started,
+                                                            cache_status=cache_status)
+                            finally:
+                                self.gateway.release()
+
+                        held_by_stream = True
+                        if response.is_closed:
+                            on_close(stream_tail_usage(response.content))  # body already read in full (e.g. a stand-in transport)
+                        else:
+                            response.stream = UsageRecordingStream(response.stream, on_close)
+                        return response
+                    usage = self.gateway.record_usage(caller, content, estimated, prompt_tag)
+                    usage_ledger.record_llm(caller, prompt_tag, model, usage, elapsed, ok=ok, cache_status=cache_status)
+                    if cache_key and response.status_code == 200:
+                        llm_cache.put(chain, cache_key, payload.get("model"), content)
+                    headers = [(k, v) for k, v in response.headers.items()
+                               if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+                    return httpx.Response(response.status_code, headers=headers, content=content,
+                                          request=request, extensions=response.extensions)
+            finally:
+                if not held_by_stream:
+                    self.gateway.release()
+
+            metrics.incr("llm", f"{caller}.retries")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class LLMGateway:
+    """
+    Process-wide entry point for OpenAI chat models. Every agent gets its
+    ChatOpenAI from chat_model(), so all calls share one connection pool,
+    one requests/tokens-per-minute budget and one global concurrency cap.
+    """
+
+    def __init__(self):
+        self.requests = TokenBucket(settings.LLM_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(settings.LLM_TOKENS_PER_MINUTE)
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self._interactive_waiting = 0
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def backoff(self, attempt: int) -> float:
+        return min(2 ** attempt, 30) + random.uniform(0, 0.5)
+
+    def pause(self, seconds: float):
+        self.requests.pause(seconds)
+        self.tokens.pause(seconds)
+
+    async def acquire(self, estimated_tokens: int, priority: str = BACKGROUND) -> float:
+        """Waits for budget and a concurrency slot; returns the seconds spent queued."""
+        started = time.monotonic()
+        interactive = priority == INTERACTIVE
+        if interactive:
+            self._interactive_waiting += 1
+        try:
+            while True:
+                async with self._lock:
+                    if interactive or self._interactive_waiting == 0:
+                        wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(estimated_tokens)
+                            break
+                    else:
+                        # Background work yields while interactive callers are queued
+                        wait = 0.05
+                await asyncio.sleep(min(wait, 1.0))
+        finally:
+            if interactive:
+                self._interactive_waiting -= 1
+        await self._slots.acquire()
+        return time.monotonic() - started
+
+    def release(self):
+        self._slots.release()
+
+    def record_usage(self, caller: str, content: bytes, estimated: int, prompt_tag: str = None) -> dict:
+        """Settles the token budget from a completed response body; returns its `usage`."""
+        try:
+            usage = json.loads(content).get("usage") or {}
+        except (ValueError, AttributeError):
+            return {}
+        self.settle_usage(caller, usage, estimated, prompt_tag)
+        return usage
+
+    def settle_usage(self, caller: str, usage: dict, estimated: int, prompt_tag: str = None):
+        total = usage.get("total_tokens")
+        if total is None:
+            return
+        # Settle the estimate against what the provider actually counted
+        self.tokens.take(total - estimated)
+        metrics.incr("llm_tokens", f"{caller}.prompt", usage.get("prompt_tokens", 0))
+        metrics.incr("llm_tokens", f"{caller}.completion", usage.get("completion_tokens", 0))
+        if prompt_tag:
+            # Prompt tokens the provider served from its prefix cache, per chain and prompt version
+            cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+            metrics.incr("prompt_cache", f"{prompt_tag}.requests")
+            metrics.incr("prompt_cache", f"{prompt_tag}.prompt_tokens", usage.get("prompt_tokens", 0))
+            metrics.incr("prompt_cache", f"{prompt_tag}.cached_tokens", cached)
+
+    def prompt_cache_report(self) -> dict:
+        """Per chain@version: requests, prompt tokens, cached tokens and the cached share."""
+        counters = metrics.snapshot("prompt_cache")["prompt_cache"]["counters"]
+        report = {}
+        for key, value in counters.items():
+            tag, field = key.rsplit(".", 1)
+            report.setdefault(tag, {})[field] = int(value)
+        for row in report.values():
+            prompt_tokens = row.get("prompt_tokens", 0)
+            row["hit_rate"] = round(row.get("cached_tokens", 0) / prompt_tokens, 3) if prompt_tokens else None
+        return report
+
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            inner = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=settings.LLM_MAX_CONCURRENCY * 2,
+                                    max_keepalive_connections=settings.LLM_MAX_CONCURRENCY)
+            )
+            self._http_client = httpx.AsyncClient(
+                transport=GatewayTransport(self, inner),
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=10.0)
+            )
+        return self._http_client
+
+    def chat_model(self, caller: str, temperature: float = 0, priority: str = BACKGROUND,
+                   chain: str = None, model: str = "gpt-4o-mini", prompt_version: int = None, **kwargs) -> ChatOpenAI:
+        """
+        `chain` names the prompt this model serves; deterministic chains are cached (see llm_cache).
+        It is also sent as the provider's prompt_cache_key, so requests sharing the chain's static
+        prefix are routed to the same prompt cache; `prompt_version` tags the cached-token metrics.
+        """
+        headers = {CALLER_HEADER: caller, PRIORITY_HEADER: priority}
+        if chain:
+            headers[CHAIN_HEADER] = chain
+            kwargs["model_kwargs"] = {"prompt_cache_key": chain, **kwargs.get("model_kwargs", {})}
+        if prompt_version is not None:
+            headers[PROMPT_VERSION_HEADER] = str(prompt_version)
+        # Streamed completions end with a usage chunk, so they are metered like any other call
+        kwargs.setdefault("stream_usage", True)
+        return ChatOpenAI(
+            model=model,
+            api_key=settings.OPENAI_API_KEY or None,
+            temperature=temperature,
+            max_retries=0,  # retries are owned by GatewayTransport
+            http_async_client=self.http_client(),
+            default_headers=headers,
+            **kwargs
+        )
+
+    def embeddings(self, caller: str, model: str = "text-embedding-3-small", priority: str = BACKGROUND) -> OpenAIEmbeddings:
+        return OpenAIEmbeddings(
+            model=model,
+            api_key=settings.OPENAI_API_KEY or None,
+            max_retries=0,
+            check_embedding_ctx_length=False,  # inputs are short; send text, not pre-tokenized chunks
+            http_async_client=self.http_client(),
+            default_headers={CALLER_HEADER: caller, PRIORITY_HEADER: priority},
+        )
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+llm_gateway = LLMGateway()
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from backend.config.settings import settings
+from backend.services.context_builder import count_tokens, truncate_to_tokens
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_pages(pages: List[Tuple[str, str]], chunk_tokens: int = None) -> List[str]:
+    """
+    Packs page paragraphs into chunks of about chunk_tokens, never splitting a
+    paragraph unless it alone exceeds the chunk. Each chunk names its sources.
+    """
+    chunk_tokens = chunk_tokens or settings.MAP_CHUNK_TOKENS
+    chunks = []
+    current, current_tokens, current_label = [], 0, None
+
+    def flush():
+        nonlocal current, current_tokens, current_label
+        if current:
+            chunks.append("\n".join(current))
+        current, current_tokens, current_label = [], 0, None
+
+    for label, text in pages:
+        for para in (p.strip() for p in text.split("\n")):
+            if not para:
+                continue
+            para = truncate_to_tokens(para, chunk_tokens)
+            tokens = count_tokens(para)
+            if current_tokens + tokens > chunk_tokens:
+                flush()
+            if current_label != label:
+                current.append(f"--- CONTENT FROM {label} ---")
+                current_label = label
+            current.append(para)
+            current_tokens += tokens
+    flush()
+    return chunks
+
+
+async def map_chunks(chunks: List[str], map_fn: Callable[[str], Awaitable[str]], name: str) -> List[str]:
+    """
+    Runs map_fn over chunks with MAP_REDUCE_CONCURRENCY in flight (the LLM gateway
+    still applies the shared rate limit). Failed chunks are logged and skipped.
+    """
+    if len(chunks) > settings.MAP_MAX_CHUNKS:
+        logger.warning(f"{name}: {len(chunks)} chunks, mapping the first {settings.MAP_MAX_CHUNKS}")
+        chunks = chunks[:settings.MAP_MAX_CHUNKS]
+
+    slots = asyncio.Semaphore(settings.MAP_REDUCE_CONCURRENCY)
+
+    async def run(chunk):
+        async with slots:
+            started = time.monotonic()
+            try:
+                result = await map_fn(chunk)
+                metrics.observe("map_reduce", f"{name}.chunk", time.monotonic() - started)
+                return result
+            except Exception as e:
+                metrics.observe("map_reduce", f"{name}.chunk", time.monotonic() - started, ok=False)
+                logger.warning(f"{name}: chunk extraction failed: {e}")
+                return None
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(run(c) for c in chunks))
+    elapsed = time.monotonic() - started
+    metrics.observe("map_reduce", f"{name}.map", elapsed)
+    logger.info(f"{name}: mapped {len(chunks)} chunks in {elapsed:.1f}s")
+    return [r for r in results if r]
+
+
+async def map_pages(pages: List[Tuple[str, str]], map_fn: Callable[[str], Awaitable[str]], name: str) -> List[Tuple[str, str]]:
+    """
+    Map step for content too large for one prompt: each chunk is condensed by
+    map_fn into notes, which replace the pages as input to the reduce prompt.
+    Falls back to the original pages if no chunk produced anything.
+    """
+    chunks = chunk_pages(pages)
+    notes = [n.strip() for n in await map_chunks(chunks, map_fn, name)]
+    notes = [n for n in notes if n and n.upper() != "NONE"]
+    metrics.incr("map_reduce", f"{name}.chunks", len(chunks))
+    return [(f"extract {i} of {len(notes)}", n) for i, n in enumerate(notes, 1)] or pages
@@ -0,0 +1,85 @@
+import time
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+
+class LatencyStats:
+    """Rolling latency/throughput stats for one named operation."""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=window)
+        self.started_at = time.monotonic()
+
+    def observe(self, seconds: float, ok: bool = True):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+
+    def _percentile(self, ordered, pct: float) -> float:
+        if not ordered:
+            return 0.0
+        idx = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.samples)
+        elapsed_min = max((time.monotonic() - self.started_at) / 60, 1e-9)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "per_minute": round(self.count / elapsed_min, 2),
+            "avg_ms": round(self.total_seconds / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 1),
+            "p95_ms": round(self._percentile(ordered, 0.95) * 1000, 1),
+            "max_ms": round(self.max_seconds * 1000, 1),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide in-memory metrics, grouped by component
+    (e.g. 'orchestrator').
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Dict[str, LatencyStats]] = defaultdict(dict)
+        self._counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def observe(self, group: str, name: str, seconds: float, ok: bool = True):
+        with self._lock:
+            stats = self._latencies[group].get(name)
+            if stats is None:
+                stats = self._latencies[group][name] = LatencyStats()
+            stats.observe(seconds, ok)
+
+    def incr(self, group: str, name: str, value: float = 1):
+        with self._lock:
+            self._counters[group][name] += value
+
+    def snapshot(self, group: Optional[str] = None) -> dict:
+        with self._lock:
+            groups = [group] if group else sorted(set(self._latencies) | set(self._counters))
+            return {
+                g: {
+                    "latency": {name: s.snapshot() for name, s in self._latencies.get(g, {}).items()},
+                    "counters": dict(self._counters.get(g, {})),
+                }
+                for g in groups
+            }
+
+    def reset(self):
+        with self._lock:
+            self._latencies.clear()
+            self._counters.clear()
+
+
+metrics = MetricsRegistry()
@@ -81,112 +81,239 @@ async def update_campaign_profile(campaign_id: str, profile_data: dict) -> bool:
     finally:
         await conn.close()
 
+async def _save_target_company(cur, campaign_id: str, company_data: dict) -> str:
+    # Check if already exists for this campaign
+    await cur.execute("SELECT id FROM target_companies WHERE campaign_id = %s AND name = %s", (campaign_id, company_data.get("name")))
+    existing = await cur.fetchone()
+    if existing:
+        return str(existing['id'])
+
+    company_id = str(uuid.uuid4())
+    await cur.execute(
+        """INSERT INTO target_companies 
+        (id, campaign_id, name, website, description, relevance_score, recent_news, key_challenges, strategic_priorities, intel_domain) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id""",
+        (
+            company_id, 
+            campaign_id, 
+            company_data.get("name"), 
+            company_data.get("website"), 
+            company_data.get("description"),
+            company_data.get("relevance_score"),
+            company_data.get("recent_news", []),
+            company_data.get("key_challenges", []),
+            company_data.get("strategic_priorities", []),
+            company_data.get("intel_domain")
+        )
+    )
+    return company_id
+
 async def save_target_company(campaign_id: str, company_data: dict) -> str:
     conn = await get_db_connection()
     try:
         async with conn:
             async with conn.cursor() as cur:
-                # Check if already exists for this campaign
-                await cur.execute("SELECT id FROM target_companies WHERE campaign_id = %s AND name = %s", (campaign_id, company_data.get("name")))
-                existing = await cur.fetchone()
-                if existing:
-                    return str(existing['id'])
-
-                company_id = str(uuid.uuid4())
-                await cur.execute(
-                    """INSERT INTO target_companies 
-                    (id, campaign_id, name, website, description, relevance_score, recent_news, key_challenges, strategic_priorities) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id""",
-                    (
-                        company_id, 
-                        campaign_id, 
-                        company_data.get("name"), 
-                        company_data.get("website"), 
-                        company_data.get("description"),
-                        company_data.get("relevance_score"),
-                        company_data.get("recent_news", []),
-                        company_data.get("key_challenges", []),
-                        company_data.get("strategic_priorities", [])
-                    )
-                )
-                return company_id
+                return await _save_target_company(cur, campaign_id, company_data)
     except Exception as e:
         logger.error(f"Error saving company {company_data.get('name')}: {e}")
         return None
     finally:
         await conn.close()
 
-async def save_decision_maker(campaign_id: str, company_id: str, person_data: dict) -> str:
+async def get_company_intel(domain: str, recheck_hours: int, max_age_hours: int):
+    """
+    Shared research for a domain, with `checked_recently` (site re-verified within
+    recheck_hours) and `within_max_age` (researched within max_age_hours).
+    """
     conn = await get_db_connection()
     try:
         async with conn:
             async with conn.cursor() as cur:
-                # Check duplicate by email
-                email = person_data.get("email")
-                if email:
-                    await cur.execute("SELECT id FROM decision_makers WHERE email = %s AND campaign_id = %s", (email, campaign_id))
-                    existing = await cur.fetchone()
-                    if existing:
-                        return str(existing['id'])
+                await cur.execute("""
+                    SELECT *,
+                           checked_at > NOW() - make_interval(hours => %s) AS checked_recently,
+                           researched_at > NOW() - make_interval(hours => %s) AS within_max_age
+                    FROM company_intel WHERE domain = %s
+                """, (recheck_hours, max_age_hours, domain))
+                return await cur.fetchone()
+    except Exception as e:
+        logger.error(f"Error fetching company intel for {domain}: {e}")
+        return None
+    finally:
+        await conn.close()
 
-                dm_id = str(uuid.uuid4())
-                await cur.execute(
-                    """INSERT INTO decision_makers 
-                    (id, campaign_id, company_id, name, role, role_category, email, linkedin, status, turn_count) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 0) RETURNING id""",
-                    (
-                        dm_id,
-                        campaign_id,
-                        company_id,
-                        person_data.get("name"),
-                        person_data.get("role"),
-                        person_data.get("role_category"),
-                        email,
-                        person_data.get("linkedin"),
-                        "new"
-                    )
-                )
-                return dm_id
+async def save_company_intel(domain: str, name: str, site_hash: str, research_version: str, research: dict) -> bool:
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("""
+                    INSERT INTO company_intel (domain, name, site_hash, research_version,
+                        recent_news, key_challenges, strategic_priorities, researched_at, checked_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                    ON CONFLICT (domain) DO UPDATE SET
+                        name = EXCLUDED.name,
+                        site_hash = EXCLUDED.site_hash,
+                        research_version = EXCLUDED.research_version,
+                        recent_news = EXCLUDED.recent_news,
+                        key_challenges = EXCLUDED.key_challenges,
+                        strategic_priorities = EXCLUDED.strategic_priorities,
+                        researched_at = NOW(),
+                        checked_at = NOW()
+                """, (domain, name, site_hash, research_version, research.get("recent_news", []),
+                      research.get("key_challenges", []), research.get("strategic_priorities", [])))
+                return True
+    except Exception as e:
+        logger.error(f"Error saving company intel for {domain}: {e}")
+        return False
+    finally:
+        await conn.close()
+
+async def touch_company_intel(domain: str) -> bool:
+    """Marks the site as re-scraped with an unchanged hash."""
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("UPDATE company_intel SET checked_at = NOW() WHERE domain = %s", (domain,))
+                return True
+    except Exception as e:
+        logger.error(f"Error updating company intel for {domain}: {e}")
+        return False
+    finally:
+        await conn.close()
+
+async def _save_decision_maker(cur, campaign_id: str, company_id: str, person_data: dict) -> str:
+    # Check duplicate by email
+    email = person_data.get("email")
+    if email:
+        await cur.execute("SELECT id FROM decision_makers WHERE email = %s AND campaign_id = %s", (email, campaign_id))
+        existing = await cur.fetchone()
+        if existing:
+            return str(existing['id'])
+
+    dm_id = str(uuid.uuid4())
+    await cur.execute(
+        """INSERT INTO decision_makers 
+        (id, campaign_id, company_id, name, role, role_category, email, linkedin, status, turn_count) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 0) RETURNING id""",
+        (
+            dm_id,
+            campaign_id,
+            company_id,
+            person_data.get("name"),
+            person_data.get("role"),
+            person_data.get("role_category"),
+            email,
+            person_data.get("linkedin"),
+            "new"
+        )
+    )
+    return dm_id
+
+async def save_decision_maker(campaign_id: str, company_id: str, person_data: dict) -> str:
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                return await _save_decision_maker(cur, campaign_id, company_id, person_data)
     except Exception as e:
         logger.error(f"Error saving decision maker {person_data.get('name')}: {e}")
         return None
     finally:
         await conn.close()
 
+async def _save_email_draft(cur, decision_maker_id: str, subject: str, body: str, recipient: str = None, sender: str = "System") -> str:
+    # Idempotency check: Don't create duplicate 'initial' drafts for the same DM
+    await cur.execute(
+        "SELECT id FROM emails WHERE decision_maker_id = %s AND type = 'initial' AND direction = 'outbound'",
+        (decision_maker_id,)
+    )
+    existing = await cur.fetchone()
+    if existing:
+        # Update existing draft body instead of creating new one
+        await cur.execute(
+            "UPDATE emails SET subject = %s, body = %s, recipient = %s WHERE id = %s",
+            (subject, body, recipient, existing['id'])
+        )
+        return str(existing['id'])
+
+    email_id = str(uuid.uuid4())
+    await cur.execute(
+        """INSERT INTO emails 
+        (id, decision_maker_id, subject, body, recipient, sent_at, status, type, sender, direction) 
+        VALUES (%s, %s, %s, %s, %s, NULL, 'PENDING_APPROVAL', 'initial', %s, 'outbound') RETURNING id""",
+        (email_id, decision_maker_id, subject, body, recipient, sender)
+    )
+    await log_event(cur, 'EMAIL_DRAFTED', email_id, 'EMAIL', {"dm_id": decision_maker_id})
+    return email_id
+
 async def save_email_draft(decision_maker_id: str, subject: str, body: str, recipient: str = None, sender: str = "System") -> str:
     conn = await get_db_connection()
     try:
         async with conn:
             async with conn.cursor() as cur:
-                # Idempotency check: Don't create duplicate 'initial' drafts for the same DM
-                await cur.execute(
-                    "SELECT id FROM emails WHERE decision_maker_id = %s AND type = 'initial' AND direction = 'outbound'",
-                    (decision_maker_id,)
-                )
-                existing = await cur.fetchone()
-                if existing:
-                    # Update existing draft body instead of creating new one
-                    await cur.execute(
-                        "UPDATE emails SET subject = %s, body = %s, recipient = %s WHERE id = %s",
-                        (subject, body, recipient, existing['id'])
-                    )
-                    return str(existing['id'])
-
-                email_id = str(uuid.uuid4())
-                await cur.execute(
-                    """INSERT INTO emails 
-                    (id, decision_maker_id, subject, body, recipient, sent_at, status, type, sender, direction) 
-                    VALUES (%s, %s, %s, %s, %s, NULL, 'PENDING_APPROVAL', 'initial', %s, 'outbound') RETURNING id""",
-                    (email_id, decision_maker_id, subject, body, recipient, sender)
-                )
-                await log_event(cur, 'EMAIL_DRAFTED', email_id, 'EMAIL', {"dm_id": decision_maker_id})
-                return email_id
+                return await _save_email_draft(cur, decision_maker_id, subject, body, recipient, sender)
     except Exception as e:
         logger.error(f"Error saving email draft: {e}")
         return None
     finally:
         await conn.close()
 
+async def save_email_drafts_batch(campaign_id: str, drafts: list) -> list:
+    """
+    Persists company, decision maker and initial draft for many leads over one
+    connection. Each lead gets its own savepoint, so one bad row does not sink
+    the batch. Items: {"company_name", "person" (dict), "subject", "body"}.
+    Returns the email ids in input order (None where a lead failed).
+    """
+    email_ids = [None] * len(drafts)
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                for i, draft in enumerate(drafts):
+                    person = draft["person"]
+                    try:
+                        async with conn.transaction():
+                            company_id = await _save_target_company(cur, campaign_id, {"name": draft["company_name"]})
+                            dm_id = await _save_decision_maker(cur, campaign_id, company_id, person)
+                            email_ids[i] = await _save_email_draft(cur, dm_id, draft["subject"], draft["body"], person.get("email"))
+                    except Exception as e:
+                        logger.error(f"Error saving draft for {person.get('name')}: {e}")
+        return email_ids
+    except Exception as e:
+        logger.error(f"Error saving email draft batch: {e}")
+        return email_ids
+    finally:
+        await conn.close()
+
+async def save_leads_batch(campaign_id: str, leads: list) -> list:
+    """
+    Persists companies and decision makers for leads whose drafts arrive later
+    (bulk drafting). Items: {"company_name", "person" (dict)}. Returns the
+    decision maker ids in input order (None where a lead failed).
+    """
+    dm_ids = [None] * len(leads)
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                for i, lead in enumerate(leads):
+                    person = lead["person"]
+                    try:
+                        async with conn.transaction():
+                            company_id = await _save_target_company(cur, campaign_id, {"name": lead["company_name"]})
+                            dm_ids[i] = await _save_decision_maker(cur, campaign_id, company_id, person)
+                    except Exception as e:
+                        logger.error(f"Error saving lead {person.get('name')}: {e}")
+        return dm_ids
+    except Exception as e:
+        logger.error(f"Error saving lead batch: {e}")
+        return dm_ids
+    finally:
+        await conn.close()
+
 async def save_email(decision_maker_id: str, email_data: dict) -> str:
     conn = await get_db_connection()
     try:
@@ -352,6 +479,54 @@ async def update_email_draft(email_id: str, subject: str, body: str, recipient:
     finally:
         await conn.close()
 
+async def get_draft_context(email_id: str):
+    """
+    Everything needed to redraft an outbound email: the email, its DM, company
+    and campaign, the conversation summary, the outbound message it follows up
+    and (for replies) the latest inbound message before it.
+    """
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT * FROM emails WHERE id = %s AND direction = 'outbound'", (email_id,))
+                email = await cur.fetchone()
+                if not email:
+                    return None
+                await cur.execute("SELECT * FROM decision_makers WHERE id = %s", (email['decision_maker_id'],))
+                dm = await cur.fetchone()
+                if not dm:
+                    return None
+                await cur.execute("SELECT * FROM target_companies WHERE id = %s", (dm['company_id'],))
+                company = await cur.fetchone()
+                await cur.execute("SELECT * FROM campaigns WHERE id = %s", (dm['campaign_id'],))
+                campaign = await cur.fetchone()
+                await cur.execute("SELECT summary FROM conversation_summaries WHERE decision_maker_id = %s", (dm['id'],))
+                summary = await cur.fetchone()
+                await cur.execute("""
+                    SELECT * FROM emails
+                    WHERE decision_maker_id = %s AND direction = 'outbound' AND id <> %s
+                    AND type IN ('initial', 'pitch', 'reply', 'reminder_1', 'reminder_2') AND created_at <= %s
+                    ORDER BY created_at DESC LIMIT 1
+                """, (dm['id'], email_id, email['created_at']))
+                original = await cur.fetchone()
+                await cur.execute("""
+                    SELECT * FROM emails
+                    WHERE decision_maker_id = %s AND direction = 'inbound' AND created_at <= %s
+                    ORDER BY created_at DESC LIMIT 1
+                """, (dm['id'], email['created_at']))
+                inbound = await cur.fetchone()
+                return {
+                    "email": email, "dm": dm, "company": company, "campaign": campaign,
+                    "summary": summary['summary'] if summary else "",
+                    "original": original, "inbound": inbound
+                }
+    except Exception as e:
+        logger.error(f"Error fetching draft context for {email_id}: {e}")
+        return None
+    finally:
+        await conn.close()
+
 async def mark_email_sent(email_id: str) -> bool:
     conn = await get_db_connection()
     try:
@@ -448,17 +623,134 @@ async def mark_email_sent(email_id: str) -> bool:
     finally:
         await conn.close()
 
-async def log_event(cursor, event_type: str, entity_id: str, entity_type: str, payload: dict = None):
+# Orchestrator claim priority (lower runs first). Inbound replies and their
+# intent cascade jump the queue; reminder drafting yields to everything else.
+EVENT_PRIORITIES = {
+    'EMAIL_RECEIVED': 0,
+    'INTENT_CLASSIFIED': 0,
+    'TIMER_FIRED': 80,
+}
+DEFAULT_EVENT_PRIORITY = 50
+
+async def log_event(cursor, event_type: str, entity_id: str, entity_type: str, payload: dict = None, claim_seconds: int = None):
     """
     Internal helper to log events within an existing transaction cursor.
+    With claim_seconds the event is inserted already leased, so the caller can
+    run it in-process while other workers skip it until the lease expires.
+    Returns the inserted event row (None on failure).
     """
     try:
         await cursor.execute(
-            "INSERT INTO event_log (event_type, entity_id, entity_type, payload) VALUES (%s, %s, %s, %s)",
-            (event_type, entity_id, entity_type, json.dumps(payload) if payload else None)
+            """INSERT INTO event_log (event_type, entity_id, entity_type, payload, priority, claimed_until)
+            VALUES (%s, %s, %s, %s, %s, NOW() + make_interval(secs => %s))
+            RETURNING id, event_type, entity_id, entity_type, payload, priority, retry_count, created_at""",
+            (event_type, entity_id, entity_type, json.dumps(payload) if payload else None,
+             EVENT_PRIORITIES.get(event_type, DEFAULT_EVENT_PRIORITY), claim_seconds)
         )
+        return await cursor.fetchone()
     except Exception as e:
         logger.error(f"Failed to log event {event_type}: {e}")
+        return None
+
+async def move_exhausted_events(cursor, max_retries: int) -> int:
+    """
+    Moves unprocessed events that used up their retries from event_log
+    into event_dead_letters (set-based, within the caller's transaction).
+    """
+    await cursor.execute("""
+        WITH moved AS (
+            DELETE FROM event_log
+            WHERE processed = FALSE AND retry_count >= %s
+            RETURNING *
+        )
+        INSERT INTO event_dead_letters
+        (event_id, event_type, entity_id, entity_type, payload, priority, retry_count, last_error, error_class, stack, event_created_at)
+        SELECT id, event_type, entity_id, entity_type, payload, priority, retry_count, last_error, error_class, last_stack, created_at
+        FROM moved
+    """, (max_retries,))
+    return cursor.rowcount
+
+def _dead_letter_filters(ids: list = None, event_type: str = None, error_class: str = None, include_replayed: bool = False):
+    clauses, params = [], []
+    if not include_replayed:
+        clauses.append("replayed_at IS NULL")
+    if ids:
+        clauses.append("id = ANY(%s::uuid[])")
+        params.append(ids)
+    if event_type:
+        clauses.append("event_type = %s")
+        params.append(event_type)
+    if error_class:
+        clauses.append("error_class = %s")
+        params.append(error_class)
+    where = " AND ".join(clauses) if clauses else "TRUE"
+    return where, params
+
+async def get_dead_letters(event_type: str = None, error_class: str = None, include_replayed: bool = False, limit: int = 100):
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                where, params = _dead_letter_filters(event_type=event_type, error_class=error_class, include_replayed=include_replayed)
+                await cur.execute(f"""
+                    SELECT id, event_id, event_type, entity_id, entity_type, retry_count, last_error, error_class,
+                           event_created_at, dead_at, replayed_at
+                    FROM event_dead_letters
+                    WHERE {where}
+                    ORDER BY dead_at DESC
+                    LIMIT %s
+                """, (*params, limit))
+                return await cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error fetching dead letters: {e}")
+        return []
+    finally:
+        await conn.close()
+
+async def get_dead_letter(dead_letter_id: str):
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT * FROM event_dead_letters WHERE id = %s", (dead_letter_id,))
+                return await cur.fetchone()
+    except Exception as e:
+        logger.error(f"Error fetching dead letter {dead_letter_id}: {e}")
+        return None
+    finally:
+        await conn.close()
+
+async def replay_dead_letters(ids: list = None, event_type: str = None, error_class: str = None) -> int:
+    """
+    Re-queues matching dead letters into event_log with a fresh retry budget.
+    Returns the number of events replayed (-1 on failure).
+    """
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                where, params = _dead_letter_filters(ids=ids, event_type=event_type, error_class=error_class)
+                await cur.execute(f"""
+                    WITH picked AS (
+                        UPDATE event_dead_letters SET replayed_at = NOW()
+                        WHERE {where}
+                        RETURNING *
+                    )
+                    INSERT INTO event_log (id, event_type, entity_id, entity_type, payload, priority, created_at)
+                    SELECT event_id, event_type, entity_id, entity_type, payload, COALESCE(priority, %s), event_created_at
+                    FROM picked
+                """, (*params, DEFAULT_EVENT_PRIORITY))
+                replayed = cur.rowcount
+                if replayed:
+                    await log_event(cur, 'DEAD_LETTERS_REPLAYED', None, 'SYSTEM', {
+                        "count": replayed, "event_type": event_type, "error_class": error_class
+                    })
+                return replayed
+    except Exception as e:
+        logger.error(f"Error replaying dead letters: {e}")
+        return -1
+    finally:
+        await conn.close()
 
 async def update_company_status(company_id: str, status: str):
     conn = await get_db_connection()
@@ -519,11 +811,16 @@ async def delete_campaign(campaign_id: str) -> bool:
                     (campaign_id,)
                 )
                 
-                # 3. Delete decision makers
+                # 3. Delete conversation summaries and decision makers
+                await cur.execute(
+                    "DELETE FROM conversation_summaries WHERE decision_maker_id IN (SELECT id FROM decision_makers WHERE campaign_id = %s)",
+                    (campaign_id,)
+                )
                 await cur.execute("DELETE FROM decision_makers WHERE campaign_id = %s", (campaign_id,))
                 
-                # 4. Delete target companies
+                # 4. Delete target companies and bulk drafting jobs
                 await cur.execute("DELETE FROM target_companies WHERE campaign_id = %s", (campaign_id,))
+                await cur.execute("DELETE FROM llm_batch_jobs WHERE campaign_id = %s", (campaign_id,))
                 
                 # 5. Finally delete the campaign
                 await cur.execute("DELETE FROM campaigns WHERE id = %s", (campaign_id,))
@@ -535,6 +832,60 @@ async def delete_campaign(campaign_id: str) -> bool:
     finally:
         await conn.close()
 
+async def create_batch_job(campaign_id: str, kind: str, backend: str, provider_batch_id: str, items: dict) -> str:
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("""
+                    INSERT INTO llm_batch_jobs (campaign_id, kind, backend, provider_batch_id, request_count, items)
+                    VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
+                """, (campaign_id, kind, backend, provider_batch_id, len(items), json.dumps(items)))
+                row = await cur.fetchone()
+                await log_event(cur, 'BATCH_JOB_SUBMITTED', campaign_id, 'CAMPAIGN',
+                                {"job_id": str(row['id']), "kind": kind, "requests": len(items)})
+                return str(row['id'])
+    except Exception as e:
+        logger.error(f"Error creating batch job for campaign {campaign_id}: {e}")
+        return None
+    finally:
+        await conn.close()
+
+async def get_open_batch_jobs():
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT * FROM llm_batch_jobs WHERE status = 'SUBMITTED' ORDER BY created_at ASC")
+                return await cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error fetching open batch jobs: {e}")
+        return []
+    finally:
+        await conn.close()
+
+async def complete_batch_job(job_id: str, status: str, succeeded: int = 0, failed: int = 0, error: str = None) -> bool:
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("""
+                    UPDATE llm_batch_jobs SET
+                        status = %s, succeeded_count = %s, failed_count = %s, error = %s, completed_at = NOW()
+                    WHERE id = %s AND status = 'SUBMITTED'
+                    RETURNING campaign_id, kind
+                """, (status, succeeded, failed, error, job_id))
+                row = await cur.fetchone()
+                if row:
+                    await log_event(cur, 'BATCH_JOB_' + status, row['campaign_id'], 'CAMPAIGN',
+                                    {"job_id": job_id, "kind": row['kind'], "succeeded": succeeded, "failed": failed})
+                return row is not None
+    except Exception as e:
+        logger.error(f"Error completing batch job {job_id}: {e}")
+        return False
+    finally:
+        await conn.close()
+
 async def get_event_logs(entity_id: str):
     conn = await get_db_connection()
     try:
@@ -553,6 +904,100 @@ async def get_event_logs(entity_id: str):
     finally:
         await conn.close()
 
+async def get_labeled_replies(min_confidence: float = 0.6, limit: int = 5000):
+    """Recent inbound replies with LLM-assigned intents (training data for the intent fast path)."""
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("""
+                    SELECT body, intent FROM emails
+                    WHERE direction = 'inbound' AND intent IS NOT NULL AND body IS NOT NULL
+                      AND COALESCE(intent_source, 'llm') = 'llm'
+                      AND intent_confidence >= %s
+                    ORDER BY created_at DESC
+                    LIMIT %s
+                """, (min_confidence, limit))
+                return await cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error fetching labeled replies: {e}")
+        return []
+    finally:
+        await conn.close()
+
+async def get_approved_reply_pairs(since=None, limit: int = 500, after_id: str = None):
+    """
+    Human-approved replies that were sent, each with the inbound message it
+    answered (the DM's latest inbound before the reply), oldest first. Pages
+    on (sent_at, reply id), so replies sharing the boundary timestamp of the
+    previous page are not skipped.
+    """
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute("""
+                    SELECT r.id AS reply_id, r.subject, r.body AS reply_body, r.sent_at,
+                           q.id AS inbound_id, q.body AS question, dm.campaign_id
+                    FROM emails r
+                    JOIN decision_makers dm ON dm.id = r.decision_maker_id
+                    JOIN LATERAL (
+                        SELECT id, body FROM emails q
+                        WHERE q.decision_maker_id = r.decision_maker_id
+                          AND q.direction = 'inbound' AND q.created_at < r.created_at
+                        ORDER BY q.created_at DESC LIMIT 1
+                    ) q ON TRUE
+                    WHERE r.direction = 'outbound' AND r.type = 'reply' AND r.status = 'SENT'
+                      AND (r.sent_at, r.id) > (COALESCE(%s::timestamptz, '-infinity'::timestamptz),
+                                               COALESCE(%s::uuid, '00000000-0000-0000-0000-000000000000'::uuid))
+                    ORDER BY r.sent_at ASC, r.id ASC
+                    LIMIT %s
+                """, (since, after_id, limit))
+                return await cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error fetching approved reply pairs: {e}")
+        return []
+    finally:
+        await conn.close()
+
+USAGE_GROUP_COLUMNS = ("campaign_id", "stage", "agent", "provider", "chain", "model")
+
+async def get_usage_summary(group_by=("agent",), campaign_id: str = None, since_hours: int = None):
+    """
+    Cost, tokens, credits and p50/p95 latency from usage_events, grouped by
+    any of USAGE_GROUP_COLUMNS, most expensive first.
+    """
+    columns = [c for c in group_by if c in USAGE_GROUP_COLUMNS] or ["agent"]
+    group = ", ".join(columns)
+    conn = await get_db_connection()
+    try:
+        async with conn:
+            async with conn.cursor() as cur:
+                await cur.execute(f"""
+                    SELECT {group},
+                           COUNT(*) AS calls,
+                           COUNT(*) FILTER (WHERE NOT ok) AS errors,
+                           COUNT(*) FILTER (WHERE cache_status = 'hit') AS cache_hits,
+                           SUM(prompt_tokens) AS prompt_tokens,
+                           SUM(cached_tokens) AS cached_tokens,
+                           SUM(completion_tokens) AS completion_tokens,
+                           SUM(units) AS units,
+                           ROUND(SUM(cost_usd), 6) AS cost_usd,
+                           percentile_cont(0.5) WITHIN GROUP (ORDER BY latency_ms) AS p50_ms,
+                           percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_ms) AS p95_ms
+                    FROM usage_events
+                    WHERE (%s::uuid IS NULL OR campaign_id = %s::uuid)
+                      AND (%s::int IS NULL OR created_at > NOW() - make_interval(hours => %s::int))
+                    GROUP BY {group}
+                    ORDER BY cost_usd DESC NULLS LAST
+                """, (campaign_id, campaign_id, since_hours, since_hours))
+                return await cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error fetching usage summary: {e}")
+        return []
+    finally:
+        await conn.close()
+
 async def save_sent_discovery_email(dm_id: str, subject: str, body: str, recipient: str):
     conn = await get_db_connection()
     try:
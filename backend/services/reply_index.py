@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from backend.config.settings import settings
+from backend.services.metrics import metrics
+from backend.services.neon_db import get_approved_reply_pairs
+from backend.agents.intent_analyzer import trim_reply, BURST_SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+
+def question_text(text: str) -> str:
+    """
+    What is embedded on both the index and the query side: the prospect's own
+    words, with quoted history trimmed from each message of a coalesced burst
+    and the burst separators dropped.
+    """
+    messages = (trim_reply(m) for m in (text or "").split(BURST_SEPARATOR.strip()))
+    return "\n\n".join(m for m in messages if m)
+
+
+class ReplyIndex:
+    """
+    In-memory nearest-neighbour index of inbound questions paired with the
+    human-approved (SENT) replies that answered them, tagged with their campaign.
+    Vectors are unit-normalized float32 rows, so a lookup is one matrix-vector
+    product. The index is saved to REPLY_INDEX_DIR and extended incrementally
+    from the newest (sent_at, reply id) seen.
+    """
+
+    def __init__(self, embeddings, directory: str = None):
+        self.embeddings = embeddings
+        self.directory = directory or settings.REPLY_INDEX_DIR
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.entries: List[dict] = []
+        self.watermark: Optional[str] = None  # ISO sent_at of the newest indexed reply
+        self.watermark_id: Optional[str] = None  # its id, to page past replies sent at the same instant
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def load(self):
+        self._loaded = True
+        vectors_path = os.path.join(self.directory, "vectors.npy")
+        meta_path = os.path.join(self.directory, "entries.json")
+        if not (os.path.exists(vectors_path) and os.path.exists(meta_path)):
+            return
+        try:
+            vectors = np.load(vectors_path)
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if len(meta["entries"]) != len(vectors):
+                raise ValueError("vectors and entries are out of sync")
+            self.vectors, self.entries, self.watermark = vectors.astype(np.float32), meta["entries"], meta.get("watermark")
+            self.watermark_id = meta.get("watermark_id")
+            logger.info(f"Loaded reply index with {len(self.entries)} approved replies")
+        except Exception as e:
+            logger.warning(f"Reply index on disk is unreadable, rebuilding: {e}")
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so a crash never leaves half an index behind
+        tmp_vectors = os.path.join(self.directory, "vectors.tmp.npy")
+        tmp_meta = os.path.join(self.directory, "entries.json.tmp")
+        np.save(tmp_vectors, self.vectors)
+        with open(tmp_meta, "w") as f:
+            json.dump({"watermark": self.watermark, "watermark_id": self.watermark_id, "entries": self.entries}, f)
+        os.replace(tmp_vectors, os.path.join(self.directory, "vectors.npy"))
+        os.replace(tmp_meta, os.path.join(self.directory, "entries.json"))
+
+    def add(self, vectors: np.ndarray, entries: List[dict]):
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32))
+        self.vectors = vectors if not len(self.entries) else np.vstack([self.vectors, vectors])
+        self.entries.extend(entries)
+
+    async def refresh(self) -> int:
+        """Indexes replies approved and sent since the last refresh; returns how many were added."""
+        async with self._lock:
+            if not self._loaded:
+                await asyncio.to_thread(self.load)
+            since = datetime.fromisoformat(self.watermark) if self.watermark else None
+            fetched = await get_approved_reply_pairs(since, settings.REPLY_INDEX_REFRESH_LIMIT, self.watermark_id)
+            if not fetched:
+                return 0
+            pairs = [p for p in fetched if (p['question'] or "").strip() and (p['reply_body'] or "").strip()]
+            if not pairs:
+                self._advance(fetched[-1])
+                return 0
+
+            questions = [question_text(p['question']) or p['question'] for p in pairs]
+            vectors = await self.embeddings.aembed_documents(questions)
+            self.add(np.array(vectors, dtype=np.float32), [{
+                "inbound_id": str(p['inbound_id']),
+                "reply_id": str(p['reply_id']),
+                "campaign_id": str(p['campaign_id']) if p.get('campaign_id') else None,
+                "question": q,
+                "subject": p['subject'],
+                "body": p['reply_body'],
+            } for p, q in zip(pairs, questions)])
+            self._advance(fetched[-1])
+            await asyncio.to_thread(self.save)
+            metrics.incr("reply_reuse", "indexed", len(pairs))
+            logger.info(f"Reply index: added {len(pairs)} approved replies ({len(self.entries)} total)")
+            return len(pairs)
+
+    def _advance(self, newest: dict):
+        """Moves the watermark to the last fetched reply (rows come ordered by sent_at, id)."""
+        self.watermark, self.watermark_id = newest['sent_at'].isoformat(), str(newest['reply_id'])
+
+    def nearest(self, query_vector) -> Tuple[Optional[dict], float]:
+        if not len(self.entries):
+            return None, 0.0
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.vectors @ query
+        best = int(np.argmax(scores))
+        return self.entries[best], float(scores[best])
+
+    def hit_rate(self) -> Optional[float]:
+        """Share of drafted NEUTRAL replies served from the index (template or adapted)."""
+        counters = metrics.snapshot("reply_reuse")["reply_reuse"]["counters"]
+        hits = counters.get("template_hits", 0) + counters.get("adapt_hits", 0)
+        total = hits + counters.get("misses", 0)
+        return round(hits / total, 3) if total else None
+
+    async def search(self, text: str) -> Tuple[Optional[dict], float]:
+        """Most similar previously answered question and its cosine similarity."""
+        query = question_text(text)
+        if not len(self.entries) or not query:
+            return None, 0.0
+        started = time.monotonic()
+        vector = await self.embeddings.aembed_query(query)
+        match = self.nearest(vector)
+        metrics.observe("reply_reuse", "lookup", time.monotonic() - started)
+        return match
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from backend.config.settings import settings
+from backend.services.neon_db import get_db_connection
+from backend.services.metrics import metrics
+from backend.services.usage_ledger import usage_ledger, TAVILY
+
+logger = logging.getLogger(__name__)
+
+# Query classes: (hours served as fresh, further hours served stale while a refresh runs in the background)
+QUERY_CLASS_TTL_HOURS = {
+    "company_profile": (24 * 7, 24 * 7),    # UserIntelligenceAgent: a company's site and offerings
+    "prospect_list": (24, 24 * 2),          # TargetDiscoveryAgent: companies matching campaign filters
+    "leadership": (24 * 3, 24 * 4),         # DecisionMakerFinderAgent: who runs a company
+}
+
+# TavilySearch settings that change what a query returns
+KEY_PARAMS = ("max_results", "topic", "search_depth", "time_range", "include_domains", "exclude_domains",
+              "include_answer", "include_raw_content", "include_images", "country", "exact_match")
+
+_bypass = ContextVar("search_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_search_cache():
+    """Forces live searches for everything awaited inside the block; the fresh results are stored."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+class SearchResultCache:
+    """
+    Postgres-backed cache of Tavily responses, shared across agents, campaigns
+    and worker processes. Entries are fresh for their query class's TTL, then
+    served stale (and refreshed in the background) for its stale window. The
+    table is trimmed by least-recent use to SEARCH_CACHE_MAX_MB.
+    """
+
+    def __init__(self):
+        self._writes = 0
+        self._inflight = {}  # cache_key -> task fetching it, so concurrent misses share one API call
+        self._pending = set()
+
+    def key(self, query_class: str, query: str, params: dict) -> str:
+        canonical = json.dumps({"query": normalize_query(query), "params": params}, sort_keys=True, default=str)
+        return f"{query_class}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    async def get(self, query_class: str, cache_key: str) -> Tuple[Optional[dict], bool]:
+        """(response, fresh) for an entry within its stale window, else (None, False)."""
+        try:
+            conn = await get_db_connection()
+            try:
+                async with conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute("""
+                            UPDATE search_cache SET hits = hits + 1, last_hit_at = NOW()
+                            WHERE cache_key = %s AND stale_until > NOW()
+                            RETURNING response, fresh_until > NOW() AS fresh
+                        """, (cache_key,))
+                        row = await cur.fetchone()
+            finally:
+                await conn.close()
+        except Exception as e:
+            logger.warning(f"Search cache lookup failed ({query_class}): {e}")
+            return None, False
+        if not row:
+            return None, False
+        return json.loads(row['response']), row['fresh']
+
+    async def _put(self, query_class: str, cache_key: str, query: str, response: dict):
+        fresh_hours, stale_hours = QUERY_CLASS_TTL_HOURS[query_class]
+        content = json.dumps(response, default=str)
+        try:
+            conn = await get_db_connection()
+            try:
+                async with conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute("""
+                            INSERT INTO search_cache (cache_key, query_class, query, response, size_bytes, fresh_until, stale_until)
+                            VALUES (%s, %s, %s, %s, %s, NOW() + make_interval(hours => %s), NOW() + make_interval(hours => %s))
+                            ON CONFLICT (cache_key) DO UPDATE SET
+                                response = EXCLUDED.response,
+                                size_bytes = EXCLUDED.size_bytes,
+                                created_at = NOW(),
+                                last_hit_at = NOW(),
+                                fresh_until = EXCLUDED.fresh_until,
+                                stale_until = EXCLUDED.stale_until
+                        """, (cache_key, query_class, normalize_query(query), content, len(content),
+                              fresh_hours, fresh_hours + stale_hours))
+
+                        self._writes += 1
+                        if self._writes % 100 == 0:
+                            await self._evict(cur)
+            finally:
+                await conn.close()
+        except Exception as e:
+            logger.warning(f"Search cache write failed ({query_class}): {e}")
+
+    async def _evict(self, cur):
+        await cur.execute("DELETE FROM search_cache WHERE stale_until <= NOW()")
+        expired = cur.rowcount
+        await cur.execute("""
+            DELETE FROM search_cache WHERE cache_key IN (
+                SELECT cache_key FROM (
+                    SELECT cache_key, SUM(size_bytes) OVER (ORDER BY last_hit_at DESC, cache_key) AS retained
+                    FROM search_cache
+                ) ranked
+                WHERE retained > %s
+            )
+        """, (settings.SEARCH_CACHE_MAX_MB * 1024 * 1024,))
+        metrics.incr("search_cache", "evicted", expired + cur.rowcount)
+
+    def _fetch(self, search, query_class: str, cache_key: str, query: str, request) -> asyncio.Task:
+        """Live search for `cache_key`, shared by every caller waiting on it; stored when it succeeds."""
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(search, query_class, cache_key, query, request))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return task
+
+    async def _fetch_and_store(self, search, query_class: str, cache_key: str, query: str, request):
+        response = await search.ainvoke(request)
+        if isinstance(response, dict) and response.get("results") and not response.get("error"):
+            await self._put(query_class, cache_key, query, response)
+        return response
+
+    def _refresh(self, search, query_class: str, cache_key: str, query: str, request):
+        if cache_key in self._inflight:
+            return
+        metrics.incr("search_cache", f"{query_class}.refreshes")
+        task = self._fetch(search, query_class, cache_key, query, request)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+        def log_failure(t: asyncio.Task):
+            # A failed refresh keeps serving the stale entry until its stale window ends
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"Search cache refresh failed ({query_class}): {t.exception()}")
+        task.add_done_callback(log_failure)
+
+    async def search(self, search, query_class: str, request, agent: str = "unknown"):
+        query = request.get("query", "") if isinstance(request, dict) else str(request)
+        if not settings.SEARCH_CACHE_ENABLED or query_class not in QUERY_CLASS_TTL_HOURS:
+            return await search.ainvoke(request)
+
+        params = {p: getattr(search, p, None) for p in KEY_PARAMS}
+        if isinstance(request, dict):
+            params.update({k: v for k, v in request.items() if k != "query"})
+        cache_key = self.key(query_class, query, params)
+
+        if not _bypass.get():
+            started = time.monotonic()
+            cached, fresh = await self.get(query_class, cache_key)
+            if cached is not None:
+                metrics.incr("search_cache", f"{query_class}.hits" if fresh else f"{query_class}.stale_hits")
+                usage_ledger.record(TAVILY, agent, time.monotonic() - started, cache_status="hit" if fresh else "stale")
+                if not fresh:
+                    self._refresh(search, query_class, cache_key, query, request)
+                return cached
+            metrics.incr("search_cache", f"{query_class}.misses")
+
+        # Shielded so a cancelled caller does not cancel the search other callers share
+        return await asyncio.shield(self._fetch(search, query_class, cache_key, query, request))
+
+    def report(self) -> dict:
+        """Per query class: hits, stale hits, misses, refreshes and the hit rate (stale hits count as hits)."""
+        counters = metrics.snapshot("search_cache")["search_cache"]["counters"]
+        report = {}
+        for key, value in counters.items():
+            if "." in key:
+                query_class, field = key.rsplit(".", 1)
+                report.setdefault(query_class, {})[field] = int(value)
+        for row in report.values():
+            served = row.get("hits", 0) + row.get("stale_hits", 0)
+            total = served + row.get("misses", 0)
+            row["hit_rate"] = round(served / total, 3) if total else None
+        return report
+
+
+class CachedSearch:
+    """Search tool wrapper serving `ainvoke` through the shared search cache under one query class."""
+
+    def __init__(self, search, query_class: str):
+        self.search = search
+        self.query_class = query_class
+
+    def __getattr__(self, name):
+        return getattr(self.search, name)
+
+    async def ainvoke(self, request):
+        return await search_cache.search(self.search, self.query_class, request,
+                                         agent=getattr(self.search, "agent", "unknown"))
+
+
+search_cache = SearchResultCache()
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from backend.config.settings import settings
+from backend.services.neon_db import get_db_connection
+from backend.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+OPENAI = "openai"
+TAVILY = "tavily"
+APOLLO = "apollo"
+
+# USD per 1M tokens: (input, cached input, output)
+LLM_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "text-embedding-3-small": (0.02, 0.02, 0.0),
+}
+
+# OpenAI bills Batch API requests at half the synchronous price; their rows carry this cache_status
+BATCH_PRICE_FACTOR = 0.5
+BATCH = "batch"
+
+# Campaign and pipeline stage (workflow node / orchestrator event) the current call is made for
+_context: ContextVar[dict] = ContextVar("usage_context", default={})
+
+
+@contextmanager
+def usage_context(campaign_id: str = None, stage: str = None):
+    """Attributes every LLM, search and enrichment call awaited inside the block."""
+    current = _context.get()
+    token = _context.set({
+        "campaign_id": str(campaign_id) if campaign_id else current.get("campaign_id"),
+        "stage": stage or current.get("stage"),
+    })
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def llm_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    # Dated snapshots ("gpt-4o-mini-2024-07-18") are priced as their base model
+    prices = LLM_PRICES.get(model) or next((p for m, p in LLM_PRICES.items() if (model or "").startswith(m + "-")), None)
+    if not prices:
+        return 0.0
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * prices[0] + cached_tokens * prices[1] + completion_tokens * prices[2]) / 1_000_000
+
+
+class UsageLedger:
+    """
+    Append-only record of every external call (usage_events). record() only
+    buffers; a background task writes the buffer in one multi-row insert every
+    USAGE_FLUSH_SECONDS, or sooner once USAGE_FLUSH_BATCH_SIZE rows are queued.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def record(self, provider: str, agent: str, latency: float, ok: bool = True, chain: str = None,
+               model: str = None, prompt_tokens: int = 0, cached_tokens: int = 0, completion_tokens: int = 0,
+               units: float = 0, cost_usd: float = 0.0, cache_status: str = None):
+        if not settings.USAGE_LEDGER_ENABLED:
+            return
+        context = _context.get()
+        self._buffer.append((
+            context.get("campaign_id"), context.get("stage"), agent, provider, chain, model,
+            prompt_tokens, cached_tokens, completion_tokens, units,
+            int(latency * 1000), cache_status, ok, round(cost_usd, 6)
+        ))
+        metrics.incr("usage", f"{provider}.cost_usd", cost_usd)
+        self._ensure_flusher()
+        if len(self._buffer) >= settings.USAGE_FLUSH_BATCH_SIZE:
+            self._wake.set()
+
+    def record_llm(self, agent: str, chain: str, model: str, usage: dict, latency: float,
+                   ok: bool = True, cache_status: str = None, price_factor: float = 1.0):
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+        self.record(OPENAI, agent, latency, ok, chain=chain, model=model,
+                    prompt_tokens=prompt_tokens, cached_tokens=cached, completion_tokens=completion_tokens,
+                    cost_usd=llm_cost(model, prompt_tokens, cached, completion_tokens) * price_factor,
+                    cache_status=cache_status)
+
+    def _ensure_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            try:
+                self._wake = asyncio.Event()
+                self._flusher = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass  # no loop (sync caller); the next async record starts the flusher
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.USAGE_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        try:
+            conn = await get_db_connection()
+            try:
+                async with conn:
+                    async with conn.cursor() as cur:
+                        await cur.executemany("""
+                            INSERT INTO usage_events (campaign_id, stage, agent, provider, chain, model,
+                                prompt_tokens, cached_tokens, completion_tokens, units,
+                                latency_ms, cache_status, ok, cost_usd)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """, rows)
+            finally:
+                await conn.close()
+            metrics.incr("usage", "rows_written", len(rows))
+            return len(rows)
+        except Exception as e:
+            # Accounting must never break the pipeline; keep a bounded backlog for the next attempt
+            logger.warning(f"Usage ledger write of {len(rows)} rows failed: {e}")
+            self._buffer = (rows + self._buffer)[-settings.USAGE_MAX_BACKLOG:]
+            return 0
+
+    async def aclose(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+
+class MeteredSearch:
+    """Wraps a Tavily search tool so each call is recorded under the owning agent."""
+
+    def __init__(self, search, agent: str):
+        self.search = search
+        self.agent = agent
+
+    def __getattr__(self, name):
+        return getattr(self.search, name)
+
+    async def ainvoke(self, *args, **kwargs):
+        started = time.monotonic()
+        ok = False
+        try:
+            result = await self.search.ainvoke(*args, **kwargs)
+            ok = not (isinstance(result, dict) and result.get("error"))
+            return result
+        finally:
+            # Tavily bills 1 credit per basic search and 2 per advanced search
+            credits = 2 if getattr(self.search, "search_depth", None) == "advanced" else 1
+            usage_ledger.record(TAVILY, self.agent, time.monotonic() - started, ok, units=credits,
+                                cost_usd=credits * settings.USAGE_TAVILY_CREDIT_USD)
+
+
+usage_ledger = UsageLedger()
@@ -106,6 +106,7 @@ async def run_tests():
             await conn.commit()
             
             # Run Orchestrator - Pass 1: Handle EMAIL_RECEIVED -> Emit INTENT_CLASSIFIED
+            settings.REPLY_DEBOUNCE_SECONDS = 0 # No burst coalescing wait in this test
             orch = MonitoringOrchestrator()
             await orch.process_events()
             
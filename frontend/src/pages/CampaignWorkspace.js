@@ -52,6 +52,8 @@ const CampaignWorkspace = () => {
     const [isDispatching, setIsDispatching] = useState(false);
     const [isPolling, setIsPolling] = useState(false);
     const [hasUserNavigated, setHasUserNavigated] = useState(false);
+    const [liveDrafts, setLiveDrafts] = useState({});
+    const [isRegenerating, setIsRegenerating] = useState(false);
     
     const fetchCampaignData = useCallback(async () => {
         try {
@@ -92,6 +94,35 @@ const CampaignWorkspace = () => {
         return () => clearInterval(interval);
     }, [isLaunching, isPolling, fetchCampaignData, data.campaign?.status, data.campaign?.value_proposition, data.emails.length]);
 
+    // Drafts being generated right now, token by token (Server-Sent Events)
+    useEffect(() => {
+        const source = new EventSource(`${API_BASE_URL}campaigns/${campaign_id}/drafts/stream`);
+        const upsert = (event, text) => setLiveDrafts(prev => ({ ...prev, [event.stream_id]: { ...event, text } }));
+        const remove = (event) => setLiveDrafts(prev => {
+            const next = { ...prev };
+            delete next[event.stream_id];
+            return next;
+        });
+        const handlers = {
+            start: (event) => upsert(event, ''),
+            snapshot: (event) => upsert(event, event.text),
+            reset: (event) => upsert(event, event.text),
+            delta: (event) => setLiveDrafts(prev => ({
+                ...prev,
+                [event.stream_id]: { ...event, text: (prev[event.stream_id]?.text || '') + event.text }
+            })),
+            done: (event) => { remove(event); fetchCampaignData(); },
+            error: (event) => remove(event)
+        };
+        Object.entries(handlers).forEach(([type, handle]) => {
+            source.addEventListener(type, (message) => {
+                // EventSource also fires 'error' itself (no data) while reconnecting
+                if (message.data) handle(JSON.parse(message.data));
+            });
+        });
+        return () => source.close();
+    }, [campaign_id, fetchCampaignData]);
+
     const handleLaunch = async () => {
         if (!query.trim()) return;
         setIsLaunching(true);
@@ -166,6 +197,49 @@ const CampaignWorkspace = () => {
         }
     };
 
+    const handleRegenerateEmail = async () => {
+        if (!modalContent || modalContent.type !== 'email') return;
+        setIsRegenerating(true);
+        setModalContent(prev => ({ ...prev, body: '' }));
+        try {
+            const response = await fetch(`${API_BASE_URL}emails/${modalContent.id}/regenerate`, { method: 'POST' });
+            if (!(response.headers.get('content-type') || '').includes('text/event-stream')) {
+                const result = await response.json();
+                throw new Error(result.error || 'Regeneration failed');
+            }
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const messages = buffer.split('\n\n');
+                buffer = messages.pop();
+                for (const message of messages) {
+                    const dataLine = message.split('\n').find(line => line.startsWith('data: '));
+                    if (!dataLine) continue;
+                    const event = JSON.parse(dataLine.slice(6));
+                    if (event.type === 'delta') {
+                        setModalContent(prev => ({ ...prev, body: (prev.body || '') + event.text }));
+                    } else if (event.type === 'snapshot' || event.type === 'reset') {
+                        setModalContent(prev => ({ ...prev, body: event.text }));
+                    } else if (event.type === 'done') {
+                        setModalContent(prev => ({ ...prev, subtitle: event.subject, body: event.body }));
+                    } else if (event.type === 'error') {
+                        throw new Error(event.error);
+                    }
+                }
+            }
+            await fetchCampaignData();
+        } catch (error) {
+            console.error('Failed to regenerate draft:', error);
+            alert("Failed to regenerate draft. Please try again.");
+        } finally {
+            setIsRegenerating(false);
+        }
+    };
+
     const handleSaveDM = async () => {
         if (!modalContent || modalContent.type !== 'person') return;
         setIsSaving(true);
@@ -452,6 +526,16 @@ const CampaignWorkspace = () => {
                                 >
                                     {modalContent.type === 'discovery' ? 'Back' : 'Dismiss'}
                                 </Button>
+                                {modalContent.type === 'email' && (
+                                    <Button 
+                                        onClick={handleRegenerateEmail} 
+                                        isLoading={isRegenerating}
+                                        className="rounded-xl px-8 font-bold bg-white text-emerald-700 border border-emerald-200 hover:bg-emerald-50 flex items-center gap-2"
+                                    >
+                                        <Sparkles className="w-4 h-4" />
+                                        Regenerate
+                                    </Button>
+                                )}
                                 {modalContent.type === 'email' && (
                                     <Button 
                                         onClick={handleSaveEmail} 
@@ -794,7 +878,16 @@ const CampaignWorkspace = () => {
                                 <SectionHeader icon={Sparkles} color="emerald" label="Personalized Narratives" count="04" badge={`${data.emails.length} SEQUENCES BUILT`} />
                                 
                                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                                    {data.emails.length === 0 ? (
+                                    {Object.values(liveDrafts).filter(draft => draft.kind === 'initial').map(draft => (
+                                        <div key={draft.stream_id} className="bg-white border border-emerald-200 rounded-2xl p-6 shadow-sm flex flex-col">
+                                            <div className="flex items-center gap-3 mb-4">
+                                                <Loader2 className="w-4 h-4 text-emerald-600 animate-spin" />
+                                                <span className="text-xs font-bold text-slate-900">{draft.recipient_name || 'Lead'}</span>
+                                            </div>
+                                            <p className="text-sm text-slate-500 leading-relaxed whitespace-pre-wrap line-clamp-6">{draft.text}</p>
+                                        </div>
+                                    ))}
+                                    {data.emails.length === 0 && Object.keys(liveDrafts).length === 0 ? (
                                         <LoadingState label="Synthesizing personalized outreach sequences..." className="md:col-span-2 lg:col-span-3 py-24" />
                                     ) : (
                                         data.emails.map((email, i) => {
@@ -883,6 +976,19 @@ const CampaignWorkspace = () => {
                                         </Button>
                                     )}
                                 </div>
+
+                                {Object.values(liveDrafts).filter(draft => draft.kind === 'reply').map(draft => {
+                                    const dm = data.decision_makers.find(d => d.id === draft.dm_id);
+                                    return (
+                                        <div key={draft.stream_id} className="bg-white border border-blue-200 rounded-[2rem] p-8 shadow-sm">
+                                            <div className="flex items-center gap-3 mb-4">
+                                                <Loader2 className="w-4 h-4 text-blue-600 animate-spin" />
+                                                <span className="text-xs font-black text-slate-400 uppercase tracking-widest">Drafting reply to {dm?.name || 'prospect'}</span>
+                                            </div>
+                                            <p className="text-sm text-slate-600 leading-relaxed whitespace-pre-wrap">{draft.text}</p>
+                                        </div>
+                                    );
+                                })}
                                 
                                     {data.emails.filter(e => e.status === 'PENDING_APPROVAL').length === 0 ? (
                                         <div className="bg-slate-50 border-2 border-dashed border-slate-200 rounded-[2rem] py-16 text-center">
@@ -32,12 +32,12 @@ if not exist ".env" (
 :: 2. Choose Execution Mode
 echo EXECUTION MODES:
 echo  [1] UNIFIED ENGINE (Recommended)
-echo      - Runs Backend + 3 Workers inside a SINGLE process.
+echo      - Runs Backend + 4 Workers inside a SINGLE process.
 echo      - Mimics Render Free Tier environment.
 echo      - Low RAM usage (~80MB total).
 echo.
 echo  [2] CLUSTER MODE (Advanced)
-echo      - Launches 5 separate windows (Frontend, Backend, 3 Workers).
+echo      - Launches 6 separate windows (Frontend, Backend, 4 Workers).
 echo      - Best for deep debugging of specific services.
 echo      - High RAM usage (~300MB total).
 echo.
@@ -66,20 +66,23 @@ goto :COMPLETE
 echo.
 echo [MODE] Initializing CLUSTER MODE...
 echo.
-echo [1/5] Launching FastAPI Backend...
+echo [1/6] Launching FastAPI Backend...
 start "BACKEND - %APP_NAME%" cmd /k "call %VENV_ACTIVATE% && uvicorn backend.main:app --reload --port %BACKEND_PORT%"
 
-echo [2/5] Launching React Frontend...
+echo [2/6] Launching React Frontend...
 start "FRONTEND - %APP_NAME%" cmd /k "cd frontend && npm start"
 
-echo [3/5] Starting IMAP Ingestion Worker...
+echo [3/6] Starting IMAP Ingestion Worker...
 start "WORKER: IMAP Ingestion" cmd /k "call %VENV_ACTIVATE% && python -m backend.background_workers.email_ingestion"
 
-echo [4/5] Starting Orchestrator Worker...
+echo [4/6] Starting Orchestrator Worker...
 start "WORKER: Orchestrator" cmd /k "call %VENV_ACTIVATE% && python -m backend.background_workers.orchestrator_worker"
 
-echo [5/5] Starting Timer Engine Worker...
+echo [5/6] Starting Timer Engine Worker...
 start "WORKER: Timer Engine" cmd /k "call %VENV_ACTIVATE% && python -m backend.background_workers.timer_engine"
+
+echo [6/6] Starting Batch Job Poller...
+start "WORKER: Batch Poller" cmd /k "call %VENV_ACTIVATE% && python -m backend.background_workers.batch_poller"
 goto :COMPLETE
 
 :COMPLETE
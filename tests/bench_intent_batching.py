@@ -0,0 +1,115 @@
+"""
+Benchmark: one-request-per-reply IntentAnalyzer.analyze vs batched analyze_many.
+
+Runs against a fake chat model stand-in (no OpenAI calls) that charges
+latency per request and per token, so the numbers show what batching saves
+in requests, prompt tokens and wall-clock for a burst of replies.
+
+Run it as a module from the repository root, like the other scripts under
+tests/, so the backend package is importable (running the file by path
+fails with ModuleNotFoundError: No module named 'backend'):
+
+    python -m tests.bench_intent_batching [replies]
+"""
+import asyncio
+import json
+import sys
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from backend.agents.intent_analyzer import IntentAnalyzer
+
+SAMPLE_REPLIES = [
+    "Thanks for reaching out. Could you send over pricing and a case study?",
+    "Not interested, please remove me from your list.",
+    "Sounds interesting - do you have time for a call next Tuesday?",
+    "I'm not the right person for this, try our ops team.",
+    "What integrations do you support today?\n\nOn Mon, Jan 6, Sales wrote:\n> Hi there,\n> quick question...",
+    "Let's set up a demo for the team this week.",
+]
+
+
+class FakeChatModel:
+    """Counts requests/tokens and sleeps like a hosted model would (~4 chars per token)."""
+
+    def __init__(self, base_latency=0.35, seconds_per_token=0.0004):
+        self.base_latency = base_latency
+        self.seconds_per_token = seconds_per_token
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def as_runnable(self):
+        return RunnableLambda(self._invoke)
+
+    def _classify(self, text: str) -> dict:
+        lowered = text.lower()
+        if "not interested" in lowered or "remove me" in lowered or "not the right person" in lowered:
+            intent = "NEGATIVE"
+        elif "call" in lowered or "demo" in lowered:
+            intent = "POSITIVE"
+        else:
+            intent = "NEUTRAL"
+        return {"intent": intent, "confidence": 0.9, "reasoning": "stand-in"}
+
+    async def _invoke(self, prompt_value):
+        messages = prompt_value.to_messages()
+        human = messages[-1].content
+        if human.startswith("Prospect Replies (JSON):"):
+            items = json.loads(human.split("\n\n", 1)[1])
+            body = {"results": [{"id": item["id"], **self._classify(item["reply"])} for item in items]}
+        else:
+            body = self._classify(human)
+
+        content = json.dumps(body)
+        prompt = sum(len(m.content) for m in messages) // 4
+        completion = len(content) // 4
+        self.requests += 1
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        await asyncio.sleep(self.base_latency + (prompt + completion) * self.seconds_per_token)
+        return AIMessage(content=content)
+
+
+async def run_single(replies, concurrency=4):
+    fake = FakeChatModel()
+    analyzer = IntentAnalyzer(llm=fake.as_runnable())
+    # Mirrors the orchestrator's EMAIL_RECEIVED route concurrency
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with slots:
+            return await analyzer.analyze(text)
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(one(t) for t in replies.values()))
+    return fake, time.monotonic() - started, dict(zip(replies, results))
+
+
+async def run_batched(replies):
+    fake = FakeChatModel()
+    analyzer = IntentAnalyzer(llm=fake.as_runnable())
+    started = time.monotonic()
+    results = await analyzer.analyze_many(replies)
+    return fake, time.monotonic() - started, results
+
+
+async def main(count: int):
+    replies = {f"dm-{i}": SAMPLE_REPLIES[i % len(SAMPLE_REPLIES)] for i in range(count)}
+    single, single_secs, single_results = await run_single(replies)
+    batched, batched_secs, batched_results = await run_batched(replies)
+
+    agree = sum(single_results[k]["intent"] == batched_results[k]["intent"] for k in replies)
+    print(f"{count} replies")
+    print(f"{'':10}{'requests':>10}{'prompt tok':>12}{'compl tok':>11}{'wall s':>9}")
+    for name, fake, secs in (("single", single, single_secs), ("batched", batched, batched_secs)):
+        print(f"{name:10}{fake.requests:>10}{fake.prompt_tokens:>12}{fake.completion_tokens:>11}{secs:>9.2f}")
+    print(f"saved: {single.requests - batched.requests} requests, "
+          f"{1 - batched.prompt_tokens / single.prompt_tokens:.0%} prompt tokens, "
+          f"{1 - batched_secs / single_secs:.0%} wall-clock; intent agreement {agree}/{count}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 48))
@@ -0,0 +1,134 @@
+"""
+Benchmark: TargetDiscoveryAgent candidate evaluation, one candidate at a time
+(DISCOVERY_CONCURRENCY=1, the old loop) vs the bounded concurrent pipeline.
+
+Candidate websites are served by local HTTP stand-ins on distinct loopback
+addresses (one per "host", so the http_client per-host cap applies) that add
+latency per request; domain checks and scrapes go over real sockets. Search, candidate
+extraction and the research LLM are fakes that sleep like hosted calls. Half
+of the sites are too thin to research, so the target count is only reached
+after most candidates were evaluated.
+
+Run it as a module from the repository root so the backend package is
+importable:
+
+    python -m tests.bench_target_discovery [max_candidates]
+"""
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-local-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-local-bench")
+
+from backend.agents.target_discovery import TargetDiscoveryAgent, CandidateCompany
+from backend.services.http_client import http_client
+from tests.unit.conftest import stub_discovery_agent
+
+SITE_LATENCY = 0.15      # per HTTP request to a candidate site
+SEARCH_LATENCY = 0.8     # Tavily search + candidate extraction LLM call
+RESEARCH_LATENCY = 0.6   # research LLM call
+QUERIES = ["q1", "q2", "q3"]
+HOSTS = 8
+
+PARAGRAPH = ("Acme Analytics helps mid-market lenders automate underwriting. This quarter the team "
+             "launched a real-time fraud screening product and opened an office in Manchester. ")
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def _respond(self, body: bool):
+        time.sleep(SITE_LATENCY)
+        thin = self.path.rstrip("/").endswith("thin")
+        text = "Coming soon." if thin else PARAGRAPH * 8
+        page = f"<html><head><title>Site</title></head><body><article><h1>About</h1><p>{text}</p></article></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        if body:
+            self.wfile.write(page)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_servers():
+    servers = []
+    for i in range(HOSTS):
+        server = ThreadingHTTPServer((f"127.0.0.{i + 2}", 0), SiteHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def make_agent(base_urls, count: int) -> TargetDiscoveryAgent:
+    per_query = -(-count // len(QUERIES))
+    candidates = [
+        CandidateCompany(name=f"Company {i}", website=f"{base_urls[i % len(base_urls)]}/site-{i}" + ("/thin" if i % 2 else ""),
+                         description="", relevance_reason="")
+        for i in range(count)
+    ]
+
+    async def find_candidates(query, filters, offerings):
+        await asyncio.sleep(SEARCH_LATENCY)
+        i = QUERIES.index(query)
+        return candidates[i * per_query:(i + 1) * per_query]
+
+    async def research_site(name, url, content):
+        await asyncio.sleep(RESEARCH_LATENCY)
+        return {"recent_news": ["Launched fraud screening"], "key_challenges": [], "strategic_priorities": []}
+
+    return stub_discovery_agent(find_candidates=find_candidates, research_site=research_site)
+
+
+async def no_intel(*args):
+    return None
+
+
+async def stored(*args):
+    return True
+
+
+async def run(base_urls, count: int, concurrency: int):
+    agent = make_agent(base_urls, count)
+    settings = {"DISCOVERY_TARGET_COUNT": max(2, count // 2 - 1), "DISCOVERY_CONCURRENCY": concurrency}
+    with patch.multiple("backend.agents.target_discovery.settings", **settings), \
+         patch("backend.agents.target_discovery.get_company_intel", no_intel), \
+         patch("backend.agents.target_discovery.save_company_intel", stored), \
+         redirect_stdout(io.StringIO()):
+        started = time.monotonic()
+        targets = await agent.discover(QUERIES, None, "", "Fintech")
+        return time.monotonic() - started, len(targets)
+
+
+async def main(max_candidates: int):
+    servers = start_servers()
+    base_urls = [f"http://{s.server_address[0]}:{s.server_address[1]}" for s in servers]
+    print(f"{'candidates':>10}{'targets':>9}{'sequential s':>14}{'concurrent s':>14}{'speedup':>9}")
+    count = 6
+    while count <= max_candidates:
+        sequential, found = await run(base_urls, count, concurrency=1)
+        concurrent, found_concurrent = await run(base_urls, count, concurrency=6)
+        assert found == found_concurrent
+        print(f"{count:>10}{found:>9}{sequential:>14.2f}{concurrent:>14.2f}{sequential / concurrent:>8.1f}x")
+        count *= 2
+    await http_client.aclose()
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 24))
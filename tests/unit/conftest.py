@@ -0,0 +1,17 @@
+import pytest
+
+from backend.agents.target_discovery import TargetDiscoveryAgent
+
+def stub_discovery_agent(**steps) -> TargetDiscoveryAgent:
+    """
+    TargetDiscoveryAgent without its LLM and search clients. `steps` replace
+    its coroutines by name (find_candidates, research_site, deep_scrape, ...).
+    """
+    agent = TargetDiscoveryAgent.__new__(TargetDiscoveryAgent)
+    for name, step in steps.items():
+        setattr(agent, name, step)
+    return agent
+
+@pytest.fixture
+def discovery_agent():
+    return stub_discovery_agent
@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from backend.agents.prompts import get_prompt
+from backend.agents.target_discovery import CandidateCompany, site_hash
+from backend.services.context_builder import normalize_domain
+
+SITE = "Acme builds payment rails for UK lenders. " * 10
+RESEARCH = {"recent_news": ["Raised Series B"], "key_challenges": ["Scaling"], "strategic_priorities": ["EU expansion"]}
+
+class IntelStore:
+    def __init__(self, row=None):
+        self.row = row
+        self.saved = []
+        self.touched = []
+
+    async def get(self, domain, recheck_hours, max_age_hours):
+        return self.row
+
+    async def save(self, domain, name, fingerprint, version, research):
+        self.saved.append((domain, fingerprint, version))
+        return True
+
+    async def touch(self, domain):
+        self.touched.append(domain)
+        return True
+
+@pytest.fixture
+def make_agent(discovery_agent):
+    def make(site=SITE):
+        async def deep_scrape(url):
+            agent.scrapes += 1
+            return site
+
+        async def research_site(name, url, content):
+            agent.researched += 1
+            return dict(RESEARCH)
+
+        agent = discovery_agent(deep_scrape=deep_scrape, research_site=research_site)
+        agent.scrapes, agent.researched = 0, 0
+        return agent
+    return make
+
+def run(agent, store):
+    candidate = CandidateCompany(name="Acme", website="https://www.acme.com/", description="", relevance_reason="")
+    with patch("backend.agents.target_discovery.get_company_intel", store.get), \
+         patch("backend.agents.target_discovery.save_company_intel", store.save), \
+         patch("backend.agents.target_discovery.touch_company_intel", store.touch):
+        return asyncio.run(agent.company_research(candidate))
+
+def intel_row(**overrides):
+    row = {"domain": "acme.com", "site_hash": site_hash(SITE), "research_version": get_prompt("target_discovery.research").tag,
+           "checked_recently": False, "within_max_age": True, **RESEARCH, "recent_news": ["Old news"]}
+    row.update(overrides)
+    return row
+
+def test_new_domain_is_researched_and_stored(make_agent):
+    agent, store = make_agent(), IntelStore()
+    research = run(agent, store)
+    assert research["domain"] == "acme.com" and research["recent_news"] == ["Raised Series B"]
+    assert agent.researched == 1 and store.saved[0][:2] == ("acme.com", site_hash(SITE))
+
+def test_recently_checked_intel_skips_scrape_and_llm(make_agent):
+    agent, store = make_agent(), IntelStore(intel_row(checked_recently=True))
+    assert run(agent, store)["recent_news"] == ["Old news"]
+    assert agent.scrapes == 0 and agent.researched == 0
+
+def test_unchanged_site_reuses_research_changed_site_recomputes(make_agent):
+    agent, store = make_agent(site="  " + SITE.upper() + "\n"), IntelStore(intel_row())
+    assert run(agent, store)["recent_news"] == ["Old news"]
+    assert agent.scrapes == 1 and agent.researched == 0 and store.touched == ["acme.com"]
+
+    agent, store = make_agent(site=SITE + " Now hiring."), IntelStore(intel_row())
+    assert run(agent, store)["recent_news"] == ["Raised Series B"] and agent.researched == 1
+
+def test_expired_or_older_prompt_version_recomputes(make_agent):
+    for row in (intel_row(within_max_age=False), intel_row(research_version="target_discovery.research@v0")):
+        agent = make_agent()
+        run(agent, IntelStore(row))
+        assert agent.researched == 1
+
+def test_normalize_domain():
+    assert normalize_domain("https://www.Acme.com/about") == "acme.com"
+    assert normalize_domain("acme.co.uk") == "acme.co.uk"
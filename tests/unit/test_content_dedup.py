@@ -0,0 +1,29 @@
+from backend.services.content_dedup import ParagraphDeduper, dedupe_pages
+
+NAV = "Home Products Solutions Pricing About Us Careers Contact Blog Login Sign up for free today"
+COOKIES = "We use cookies to improve your experience on our website. By continuing to browse you agree to our use of cookies."
+
+def test_boilerplate_kept_once_across_pages():
+    pages = [
+        ("https://acme.com", f"{NAV}\nAcme builds warehouse robots that pick and pack orders.\n{COOKIES}"),
+        ("https://acme.com/about", f"{NAV}\nFounded in 2015, Acme is based in Leeds with 120 staff.\n{COOKIES}"),
+        ("https://acme.com/products", f"{NAV}\nPickBot 3 handles 600 items per hour with 99.9% accuracy.\n{COOKIES}"),
+    ]
+    deduped = dedupe_pages(pages, "test")
+    joined = "\n".join(text for _, text in deduped)
+    assert joined.count("Home Products Solutions") == 1
+    assert joined.count("We use cookies") == 1
+    for fact in ("warehouse robots", "Founded in 2015", "PickBot 3"):
+        assert fact in joined
+
+def test_near_duplicates_are_dropped():
+    deduper = ParagraphDeduper()
+    original = "We use cookies to improve your experience on our website. By continuing to browse you agree to our use of cookies and our privacy policy."
+    variant = "We use cookies to improve your experience on our website. By continuing to browse you agree to our use of cookies and our privacy notice."
+    assert deduper.is_new(original)
+    assert not deduper.is_new(variant)
+    assert deduper.is_new("PickBot 3 handles 600 items per hour with 99.9% accuracy in cold storage.")
+
+def test_pages_emptied_by_dedup_are_removed():
+    deduped = dedupe_pages([("a", NAV), ("b", NAV)], "test")
+    assert [label for label, _ in deduped] == ["a"]
@@ -0,0 +1,42 @@
+from backend.services.context_builder import (
+    search_results_context, pages_context, count_tokens, truncate_to_tokens
+)
+
+def test_search_context_dedupes_and_drops_raw_fields():
+    response = {
+        "query": "fintech companies in london",
+        "results": [
+            {"title": "Acme Pay", "url": "https://www.acmepay.com/", "content": "Acme Pay builds payment rails.", "score": 0.4,
+             "raw_content": "RAW " * 5000},
+            {"title": "Acme Pay (dup)", "url": "https://acmepay.com", "content": "Another snippet.", "score": 0.3},
+            {"title": "Ledgerly", "url": "https://ledgerly.io/about", "content": "Acme Pay builds payment rails.", "score": 0.2},
+            {"title": "Bankit", "url": "https://bankit.co.uk", "content": "Bankit is a challenger bank.", "score": 0.9},
+        ],
+    }
+    context = search_results_context(response, "target_discovery.candidates")
+    assert "RAW" not in context and "score" not in context
+    # Highest score first; duplicate URL and duplicate snippet dropped
+    assert context.index("Bankit") < context.index("Acme Pay")
+    assert "Acme Pay (dup)" not in context and "Ledgerly" not in context
+
+def test_search_context_respects_budget():
+    results = [{"title": f"Company {i}", "url": f"https://c{i}.com", "content": f"Company {i} " + "detail " * 400, "score": 1 - i / 100}
+               for i in range(10)]
+    context = search_results_context({"results": results}, "target_discovery.candidates", budget=800)
+    assert count_tokens(context) <= 800
+    assert "Company 0" in context and "Company 1" in context
+
+def test_pages_context_shares_budget_and_drops_repeated_boilerplate():
+    footer = "Copyright Acme Ltd. All rights reserved."
+    pages = [
+        ("https://acme.com", "Acme makes robots.\n" + footer),
+        ("https://acme.com/about", "About us. " + "We love robots. " * 800 + "\n" + footer),
+    ]
+    context = pages_context(pages, "user_intelligence.profile", budget=600)
+    assert context.count(footer) == 1
+    assert "Acme makes robots." in context
+    assert count_tokens(context) <= 600
+
+def test_truncate_keeps_short_text():
+    assert truncate_to_tokens("short text", 50) == "short text"
+    assert truncate_to_tokens("word " * 1000, 10).endswith("…")
@@ -0,0 +1,79 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from backend.services.draft_stream import DraftStreamBroker, json_body_so_far, stream_completion
+
+def parse(chunk: str) -> dict:
+    return json.loads(chunk.split("data: ", 1)[1])
+
+class FakeChain:
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    async def astream(self, inputs):
+        for piece in self.pieces:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(content=piece)
+
+    async def ainvoke(self, inputs):
+        return SimpleNamespace(content="".join(self.pieces))
+
+def test_json_body_is_relayed_as_deltas_and_full_text_returned():
+    pieces = ['```json\n{"subject": "Re: Intro", ', '"body": "Hi Ann', 'a,\\n\\nThanks for', ' asking."}\n```']
+
+    async def run():
+        broker = DraftStreamBroker()
+        stream = broker.open("c1", "dm1", kind="reply")
+        with broker.subscribe(dm_id="dm1") as subscription:
+            raw = await stream_completion(FakeChain(pieces), {}, stream, json_body=True)
+            stream.done("Re: Intro", "Hi Anna,\n\nThanks for asking.", "e1")
+            events = []
+            async for chunk in subscription.events():
+                events.append(parse(chunk))
+                if events[-1]["type"] == "done":
+                    return raw, events
+
+    raw, events = asyncio.run(run())
+    assert raw == "".join(pieces)
+    assert events[0]["type"] == "snapshot"
+    text = "".join(e["text"] for e in events if e["type"] == "delta")
+    assert text == "Hi Anna,\n\nThanks for asking."
+    assert events[-1]["email_id"] == "e1"
+
+def test_late_subscriber_gets_snapshot_and_campaign_filter():
+    broker = DraftStreamBroker()
+    stream = broker.open("c1", None, kind="initial", label={"recipient_name": "Ann"})
+    stream.update("Subject: Hello\nHi")
+    other = broker.open("c2", None, kind="initial")
+    other.update("unrelated")
+
+    subscription = broker.subscribe(campaign_id="c1")
+    first = subscription.queue.get_nowait()
+    assert first["type"] == "snapshot" and first["text"] == "Subject: Hello\nHi" and first["recipient_name"] == "Ann"
+    assert subscription.queue.empty()
+
+    stream.update("Subject: Hello\nHi Ann")
+    other.update("unrelated text")
+    assert subscription.queue.get_nowait()["text"] == " Ann"
+    assert subscription.queue.empty()
+
+def test_retry_sends_reset_and_unfinished_stream_fails():
+    async def run():
+        broker = DraftStreamBroker()
+        subscription = broker.subscribe(campaign_id="c1")
+        try:
+            async with broker.open("c1", "dm1") as stream:
+                stream.update("first attempt")
+                stream.update("second")
+                raise RuntimeError("LLM down")
+        except RuntimeError:
+            pass
+        return [subscription.queue.get_nowait()["type"] for _ in range(subscription.queue.qsize())], broker
+
+    types, broker = asyncio.run(run())
+    assert types == ["start", "delta", "reset", "error"]
+    assert broker.active_streams() == []
+
+def test_partial_json_body():
+    assert json_body_so_far('{"subject": "Re') == ""
+    assert json_body_so_far('{"subject": "Re: x", "body": "Hel') == "Hel"
@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+from backend.services.http_client import HttpClient, HostLimitedTransport, CALLER_HEADER
+
+def test_per_host_cap_and_caller_header_stripped():
+    active, peak, seen = {}, {}, []
+
+    async def handler(request: httpx.Request):
+        host = request.url.host
+        seen.append(request)
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, text="ok")
+
+    async def run():
+        client = httpx.AsyncClient(transport=HostLimitedTransport(httpx.MockTransport(handler), per_host=2))
+        urls = [f"https://a.com/{i}" for i in range(6)] + [f"https://b.com/{i}" for i in range(3)]
+        await asyncio.gather(*(client.get(u, headers={CALLER_HEADER: "TargetDiscoveryAgent"}) for u in urls))
+        await client.aclose()
+
+    asyncio.run(run())
+    assert peak == {"a.com": 2, "b.com": 2}
+    assert len(seen) == 9 and all(CALLER_HEADER not in r.headers for r in seen)
+
+def mock_pool(handler):
+    pool = HttpClient()
+    pool._clients[False] = httpx.AsyncClient(transport=HostLimitedTransport(httpx.MockTransport(handler), per_host=4),
+                                             follow_redirects=True)
+    return pool
+
+def test_fetch_html_returns_text_and_rejects_binary_oversized_and_errors():
+    def handler(request: httpx.Request):
+        if request.url.path == "/logo.png":
+            return httpx.Response(200, headers={"content-type": "image/png"}, content=b"\x89PNG")
+        if request.url.path == "/huge":
+            return httpx.Response(200, headers={"content-type": "text/html"}, content=b"x" * 2048)
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        assert request.headers["user-agent"].startswith("Mozilla/5.0")
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, text="<p>Hello</p>")
+
+    async def run():
+        pool = mock_pool(handler)
+        with patch("backend.services.http_client.settings.HTTP_MAX_PAGE_BYTES", 1024):
+            results = [await pool.fetch_html(f"https://acme.com{p}", "UserIntelligenceAgent")
+                       for p in ("/", "/logo.png", "/huge", "/missing")]
+        await pool.aclose()
+        return results
+
+    assert asyncio.run(run()) == ["<p>Hello</p>", None, None, None]
+
+def test_fetch_html_swallows_transport_errors():
+    def handler(request):
+        raise httpx.ConnectError("refused")
+
+    async def run():
+        pool = mock_pool(handler)
+        try:
+            return await pool.fetch_html("https://down.example", "TargetDiscoveryAgent")
+        finally:
+            await pool.aclose()
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,70 @@
+from backend.agents.intent_analyzer import trim_reply
+from backend.agents.intent_fast_path import IntentFastPath, NaiveBayesIntentModel
+
+TRAINING = [
+    ("Yes, let's find a time next week to talk", "POSITIVE"),
+    ("Sounds great, happy to see a demo", "POSITIVE"),
+    ("Interested, what does your availability look like", "POSITIVE"),
+    ("What does pricing look like for a team of ten", "NEUTRAL"),
+    ("Can you share more details on the integrations", "NEUTRAL"),
+    ("How is this different from what we use today", "NEUTRAL"),
+    ("We already have a vendor and are not looking", "NEGATIVE"),
+    ("Please stop, we have no need for this", "NEGATIVE"),
+    ("Not looking to change anything this year", "NEGATIVE"),
+] * 5
+
+def test_phrase_rules_decide_clear_replies():
+    fast_path = IntentFastPath(threshold=0.99, shadow_rate=0)
+    assert fast_path.classify("Please unsubscribe me.")["intent"] == "NEGATIVE"
+    assert fast_path.classify("Not interested, thanks")["intent"] == "NEGATIVE"
+    decided = fast_path.classify("Sure - send me a calendar link")
+    assert decided["intent"] == "POSITIVE" and decided["source"] == "fast_path"
+
+def test_conflicting_or_untrained_replies_escalate():
+    fast_path = IntentFastPath(threshold=0.99, shadow_rate=0)
+    assert fast_path.classify("Not interested right now, but let's book a call in Q3") is None
+    assert fast_path.classify("Who else do you work with?") is None
+
+def test_model_decides_above_threshold_only():
+    model = NaiveBayesIntentModel()
+    model.train(TRAINING)
+    intent, probability = model.predict("can you share pricing details")
+    assert intent == "NEUTRAL" and probability > 0.5
+
+    strict = IntentFastPath(threshold=1.01, shadow_rate=0)
+    strict.model = model
+    assert strict.classify("can you share pricing details") is None
+
+    lenient = IntentFastPath(threshold=0.5, shadow_rate=0)
+    lenient.model = model
+    assert lenient.classify("can you share pricing details")["intent"] == "NEUTRAL"
+
+def test_negated_positive_phrases_and_referrals_escalate():
+    fast_path = IntentFastPath(threshold=0.99, shadow_rate=0)
+    for reply in ("Please don't book a meeting with me",
+                  "No need to schedule a call, we are set.",
+                  "I wouldn't want to schedule a demo",
+                  "I’d rather you didn’t schedule a call",
+                  "I'm not the right person - try jane@acme.com",
+                  "No budget this quarter, ping me in Q3"):
+        assert fast_path.classify(reply) is None, reply
+    assert fast_path.classify("Happy to schedule a demo next week")["intent"] == "POSITIVE"
+
+def test_opt_out_phrases_decide_only_when_they_are_the_whole_reply():
+    fast_path = IntentFastPath(threshold=0.99, shadow_rate=0)
+    for reply in ("Unsubscribe", "Please remove me from your mailing list, thanks.", "Take me off this list now"):
+        assert fast_path.classify(reply)["intent"] == "NEGATIVE", reply
+    for reply in ("Remove me from the CC, loop in Sarah",
+                  "Please remove me and contact jane@acme.com instead",
+                  "Don't unsubscribe me, I just changed roles",
+                  "Thanks, this looks useful. Could you send pricing? To unsubscribe from our newsletter click here"):
+        assert fast_path.classify(reply) is None, reply
+
+def test_empty_or_quoted_only_reply_is_not_decided_by_priors():
+    skewed = NaiveBayesIntentModel()
+    skewed.train([("Please stop, we have no need for this", "NEGATIVE")] * 20 + [("Sounds great", "POSITIVE")])
+    fast_path = IntentFastPath(threshold=0.5, shadow_rate=0)
+    fast_path.model = skewed
+    assert skewed.predict("")[0] == "NEGATIVE"
+    for reply in ("", "?", "On Mon, Jan 6, Sales wrote:\n> Hi there,\n> quick question"):
+        assert fast_path.classify(trim_reply(reply)) is None
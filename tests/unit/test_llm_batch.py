@@ -0,0 +1,93 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from backend.agents.prompts import get_prompt
+from backend.background_workers.batch_poller import BatchJobPoller
+from backend.services.llm_batch import (
+    LocalBatchBackend, build_batch_request, parse_batch_output, IN_PROGRESS, COMPLETED
+)
+from backend.services.usage_ledger import UsageLedger
+
+def _drafting_request(custom_id, person, company):
+    messages = [
+        {"role": "system", "content": "You are an expert sales copywriter."},
+        {"role": "user", "content": f"My Company: Acme\nTarget Person: {person}, CEO\nTarget Company: {company}"},
+    ]
+    return build_batch_request(custom_id, messages)
+
+def test_local_backend_round_trip(tmp_path):
+    backend = LocalBatchBackend(directory=str(tmp_path), delay_seconds=0)
+    requests = [_drafting_request("a", "Alex Wang", "Scale AI"), _drafting_request("b", "Sam Lee", "Initech")]
+
+    async def run():
+        batch_id = await backend.submit(requests, {"campaign_id": "c1"})
+        return batch_id, await backend.poll(batch_id)
+
+    batch_id, result = asyncio.run(run())
+    assert result["status"] == COMPLETED
+    # Input is the OpenAI Batch JSONL format
+    lines = (tmp_path / batch_id / "input.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["url"] == "/v1/chat/completions"
+
+    outputs = parse_batch_output(result["output"])
+    assert outputs["a"]["content"].startswith("Subject: A quick idea for Scale AI")
+    assert "Hi Sam Lee" in outputs["b"]["content"]
+
+def test_local_backend_waits_and_reports_item_errors(tmp_path):
+    def responder(body):
+        if "Initech" in body["messages"][-1]["content"]:
+            raise ValueError("boom")
+        return "Subject: Hi\nBody"
+
+    backend = LocalBatchBackend(directory=str(tmp_path), responder=responder, delay_seconds=3600)
+    requests = [_drafting_request("a", "Alex Wang", "Scale AI"), _drafting_request("b", "Sam Lee", "Initech")]
+
+    async def run():
+        batch_id = await backend.submit(requests)
+        pending = await backend.poll(batch_id)
+        backend.delay_seconds = 0
+        return pending, await backend.poll(batch_id)
+
+    pending, done = asyncio.run(run())
+    assert pending["status"] == IN_PROGRESS
+    outputs = parse_batch_output(done["output"])
+    assert outputs["a"]["content"] == "Subject: Hi\nBody" and outputs["a"]["error"] is None
+    assert outputs["b"]["content"] is None and outputs["b"]["error"] == "boom"
+
+def test_poller_records_usage_for_each_batch_result():
+    def line(custom_id, status, content=None):
+        body = {"model": "gpt-4o-mini", "usage": {"prompt_tokens": 1000, "completion_tokens": 200}}
+        if content:
+            body["choices"] = [{"message": {"content": content}}]
+        return json.dumps({"custom_id": custom_id, "response": {"status_code": status, "body": body}})
+
+    class Backend:
+        async def poll(self, batch_id):
+            return {"status": COMPLETED, "output": "\n".join([line("a", 200, "Subject: Hi\nBody"), line("b", 500)]),
+                    "error": None}
+
+    async def saved(campaign_id, drafts):
+        return ["e1"] * len(drafts)
+
+    async def completed(*args, **kwargs):
+        return True
+
+    ledger = UsageLedger()
+    poller = BatchJobPoller()
+    poller._backends["openai"] = Backend()
+    job = {"id": "j1", "campaign_id": "c1", "kind": "initial_drafts", "backend": "openai", "provider_batch_id": "b1",
+           "created_at": datetime.now(timezone.utc) - timedelta(minutes=30),
+           "items": {"a": {"person": {"name": "Alex"}}, "b": {"person": {"name": "Sam"}}}}
+    with patch("backend.background_workers.batch_poller.usage_ledger", ledger), \
+         patch("backend.background_workers.batch_poller.save_email_drafts_batch", saved), \
+         patch("backend.background_workers.batch_poller.complete_batch_job", completed):
+        assert asyncio.run(poller.poll_job(job)) == 1
+
+    ok, failed = sorted(ledger._buffer, key=lambda row: not row[12])
+    assert ok[:5] == ("c1", "email_drafting", "EmailDraftingAgent", "openai", get_prompt("email_drafter.initial").tag)
+    assert ok[6:9] == (1000, 0, 200) and ok[10] >= 30 * 60 * 1000 and ok[11] == "batch"
+    # Billed at the Batch API's half price
+    assert ok[-1] == round((1000 * 0.15 + 200 * 0.60) / 1_000_000 / 2, 6)
+    assert failed[12] is False
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import httpx
+from backend.services.llm_gateway import (
+    LLMGateway, GatewayTransport, TokenBucket, retry_after_seconds,
+    CALLER_HEADER, PRIORITY_HEADER, INTERACTIVE
+)
+
+def test_token_bucket_waits_when_drained():
+    bucket = TokenBucket(per_minute=60)  # 1 unit per second
+    assert bucket.wait_time(60) == 0
+    bucket.take(60)
+    assert 0.9 < bucket.wait_time(1) <= 1.0
+    # Refund of an over-estimate makes budget available again
+    bucket.take(-30)
+    assert bucket.wait_time(10) == 0
+
+def test_retry_after_headers():
+    assert retry_after_seconds(httpx.Response(429, headers={"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(httpx.Response(429, headers={"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(httpx.Response(429)) is None
+
+def test_transport_retries_429_and_strips_gateway_headers():
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(request)
+        if len(seen) == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "10"}, json={"error": "rate limited"})
+        return httpx.Response(200, json={"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}})
+
+    async def run():
+        gateway = LLMGateway()
+        client = httpx.AsyncClient(transport=GatewayTransport(gateway, httpx.MockTransport(handler)))
+        resp = await client.post(
+            "https://api.openai.com/v1/chat/completions",
+            headers={CALLER_HEADER: "IntentAnalyzer", PRIORITY_HEADER: INTERACTIVE},
+            content=json.dumps({"messages": [{"role": "user", "content": "hi"}]})
+        )
+        await client.aclose()
+        return resp
+
+    resp = asyncio.run(run())
+    assert resp.status_code == 200
+    assert resp.json()["usage"]["total_tokens"] == 15
+    assert len(seen) == 2
+    assert all(CALLER_HEADER not in r.headers and PRIORITY_HEADER not in r.headers for r in seen)
+
+def test_cached_deterministic_chain_skips_provider(monkeypatch):
+    from backend.services import llm_gateway as gw
+    from backend.services.llm_cache import llm_cache
+
+    calls = []
+    cached_body = json.dumps({"choices": [], "usage": {"total_tokens": 1}}).encode()
+
+    async def fake_get(chain, key):
+        calls.append((chain, key))
+        return cached_body
+
+    monkeypatch.setattr(llm_cache, "get", fake_get)
+    monkeypatch.setattr(gw.settings, "LLM_CACHE_ENABLED", True)
+
+    def handler(request):
+        raise AssertionError("provider should not be called on a cache hit")
+
+    async def run():
+        client = httpx.AsyncClient(transport=GatewayTransport(LLMGateway(), httpx.MockTransport(handler)))
+        resp = await client.post(
+            "https://api.openai.com/v1/chat/completions",
+            headers={CALLER_HEADER: "IntentAnalyzer", gw.CHAIN_HEADER: "intent_analyzer.classify"},
+            content=json.dumps({"model": "gpt-4o-mini", "temperature": 0, "messages": [{"role": "user", "content": "hi"}]})
+        )
+        await client.aclose()
+        return resp
+
+    resp = asyncio.run(run())
+    assert resp.content == cached_body
+    assert calls and calls[0][1].startswith("gpt-4o-mini:")
+
+def test_cached_prompt_tokens_recorded_per_chain_version():
+    from backend.services.metrics import metrics
+    metrics.reset()
+    gateway = LLMGateway()
+    usage = {"prompt_tokens": 2000, "completion_tokens": 50, "total_tokens": 2050,
+             "prompt_tokens_details": {"cached_tokens": 1536}}
+    gateway.record_usage("ResponseDrafter", json.dumps({"usage": usage}).encode(), 2000, "response_drafter.reply@v2")
+    gateway.record_usage("ResponseDrafter", json.dumps({"usage": {**usage, "prompt_tokens_details": {}}}).encode(), 2000, "response_drafter.reply@v2")
+
+    report = gateway.prompt_cache_report()["response_drafter.reply@v2"]
+    assert report == {"requests": 2, "prompt_tokens": 4000, "cached_tokens": 1536, "hit_rate": 0.384}
+
+def test_streamed_call_holds_its_slot_until_closed():
+    from unittest.mock import patch
+
+    class ProviderStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b'data: {"choices": [{"delta": {"content": "Hi"}}]}\n\n'
+            yield b"data: [DONE]\n\n"
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=ProviderStream())
+
+    async def run():
+        with patch("backend.services.llm_gateway.settings.LLM_MAX_CONCURRENCY", 1):
+            gateway = LLMGateway()
+        client = httpx.AsyncClient(transport=GatewayTransport(gateway, httpx.MockTransport(handler)))
+        payload = json.dumps({"stream": True, "messages": [{"role": "user", "content": "hi"}]})
+        async with client.stream("POST", "https://api.openai.com/v1/chat/completions", content=payload,
+                                 headers={CALLER_HEADER: "ResponseDrafter"}) as resp:
+            held = gateway._slots.locked()
+            await resp.aread()
+        await client.aclose()
+        return held, gateway._slots.locked()
+
+    assert asyncio.run(run()) == (True, False)
+
+def test_cache_is_trimmed_by_stored_bytes():
+    from unittest.mock import patch
+    from backend.services.llm_cache import LLMResponseCache
+
+    class Cursor:
+        rowcount = 0
+
+        def __init__(self):
+            self.queries = []
+
+        async def execute(self, query, params=()):
+            self.queries.append((" ".join(query.split()), params))
+
+    cursor = Cursor()
+    with patch("backend.services.llm_cache.settings.LLM_CACHE_MAX_MB", 2):
+        asyncio.run(LLMResponseCache()._evict(cursor))
+    trim, params = cursor.queries[-1]
+    assert "SUM(size_bytes)" in trim and params == (2 * 1024 * 1024,)
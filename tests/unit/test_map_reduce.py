@@ -0,0 +1,34 @@
+import asyncio
+import time
+from backend.services.map_reduce import chunk_pages, map_pages
+from backend.services.context_builder import count_tokens
+
+PAGES = [
+    ("https://acme.com", "\n".join(f"Home paragraph {i}. " + "robots " * 150 for i in range(10))),
+    ("https://acme.com/about", "\n".join(f"About paragraph {i}. " + "founders " * 150 for i in range(10))),
+]
+
+def test_chunks_respect_size_and_keep_paragraphs_whole():
+    chunks = chunk_pages(PAGES, chunk_tokens=600)
+    assert len(chunks) > 1
+    assert all(count_tokens(c) <= 600 + 20 for c in chunks)
+    joined = "\n".join(chunks)
+    for i in range(10):
+        assert f"Home paragraph {i}." in joined and f"About paragraph {i}." in joined
+    assert "--- CONTENT FROM https://acme.com/about ---" in joined
+
+def test_map_runs_chunks_concurrently_and_drops_empty_notes():
+    calls = []
+
+    async def extract(chunk):
+        calls.append(chunk)
+        await asyncio.sleep(0.2)
+        return "NONE" if "founders" in chunk and "robots" not in chunk else "- Acme builds robots"
+
+    started = time.monotonic()
+    notes = asyncio.run(map_pages(PAGES, extract, "test"))
+    elapsed = time.monotonic() - started
+
+    assert len(calls) > 1
+    assert elapsed < 0.2 * len(calls)  # not serial
+    assert notes and all(text == "- Acme builds robots" for _, text in notes)
@@ -0,0 +1,377 @@
+import asyncio
+import json
+import re
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+from backend.agents.conversation_summarizer import ConversationSummarizer
+from backend.background_workers.orchestrator_worker import MonitoringOrchestrator, EVENT_ROUTES, PRIORITY_AGING_SECONDS
+from backend.background_workers.timer_engine import TimerEngine
+from backend.services.llm_gateway import BACKGROUND
+from backend.services.draft_stream import DraftStreamBroker
+from backend.services.metrics import MetricsRegistry
+from backend.services.neon_db import move_exhausted_events, replay_dead_letters, log_event, DEFAULT_EVENT_PRIORITY
+
+class FakeDB:
+    """
+    Stand-in for Neon: each query is answered by the first rule whose fragment
+    it contains, either a list of rows or a function of the params.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = rules or {}
+        self.queries = []
+        self.open = 0
+
+    def answer(self, query, params):
+        flat = " ".join(query.split())
+        self.queries.append((flat, params))
+        for fragment, rows in self.rules.items():
+            if fragment in flat:
+                return rows(params) if callable(rows) else rows
+        return []
+
+    def executed(self, fragment):
+        return [params for query, params in self.queries if fragment in query]
+
+    async def connect(self):
+        self.open += 1
+        return FakeConnection(self)
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+        self.rowcount = 0
+
+    async def execute(self, query, params=()):
+        self.rows = list(self.db.answer(query, params))
+        self.rowcount = len(self.rows)
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return self.rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            self.db.open -= 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+def make_orchestrator(**parts):
+    """MonitoringOrchestrator without its LLM-backed agents; pass the ones a test needs."""
+    orch = MonitoringOrchestrator.__new__(MonitoringOrchestrator)
+    orch.fast_path, orch.reply_index = None, None
+    orch.batch_size, orch.pre_draft_batch_size, orch.claim_lease_seconds = 10, 5, 300
+    orch._route_slots = {t: asyncio.Semaphore(r.concurrency) for t, r in EVENT_ROUTES.items()}
+    orch._ticks, orch._prefetched_intents = 0, {}
+    for name, part in parts.items():
+        setattr(orch, name, part)
+    return orch
+
+def run(db, coro):
+    with patch("backend.background_workers.orchestrator_worker.get_db_connection", db.connect):
+        return asyncio.run(coro)
+
+def test_pre_draft_releases_rows_and_connection_before_drafting():
+    db = FakeDB({
+        "SET draft_claimed_until = NOW() +": [{"id": "s1", "type": "REMINDER_1", "decision_maker_id": "dm1"},
+                                             {"id": "s2", "type": "REMINDER_2", "decision_maker_id": "dm2"}],
+        "FROM emails": lambda params: [{"id": "e1", "subject": "Pitch", "body": "..."}] if params == ("dm1",) else [],
+        "SET subject = %s": [{"updated": 1}],
+    })
+
+    class Drafter:
+        async def draft_reminder(self, timer_type, original, summary, priority):
+            assert db.open == 0, "a connection is held across the LLM call"
+            assert priority == BACKGROUND
+            return {"subject": "Re: Pitch", "body": "Following up"}
+
+    drafted = run(db, make_orchestrator(response_drafter=Drafter()).pre_draft_reminders())
+    assert drafted == 1 and db.open == 0
+    assert db.executed("SET subject = %s") == [("Re: Pitch", "Following up", "e1", "s1")]
+    # No outbound email to follow up on: marked drafted without a body, lease released
+    assert db.executed("SET drafted_at = NOW(), draft_claimed_until = NULL") == [("s2",)]
+
+def test_failed_draft_releases_its_lease():
+    db = FakeDB({
+        "SET draft_claimed_until = NOW() +": [{"id": "s1", "type": "REMINDER_1", "decision_maker_id": "dm1"}],
+        "FROM emails": [{"id": "e1", "subject": "Pitch", "body": "..."}],
+    })
+
+    class Drafter:
+        async def draft_reminder(self, timer_type, original, summary, priority):
+            return None
+
+    assert run(db, make_orchestrator(response_drafter=Drafter()).pre_draft_reminders()) == 0
+    assert db.executed("SET draft_claimed_until = NULL WHERE id") == [("s1",)]
+
+def test_pre_draft_is_promoted_only_if_no_newer_email_went_out():
+    def fire(latest_outbound_id):
+        db = FakeDB()
+        task = {"id": "s1", "type": "REMINDER_1", "decision_maker_id": "dm1", "step": 2, "name": "Dana",
+                "subject": "Re: Pitch", "body": "Following up", "drafted_from_email_id": "e1",
+                "latest_outbound_id": latest_outbound_id}
+        asyncio.run(TimerEngine.__new__(TimerEngine).fire_timer(FakeCursor(db), task))
+        timer_event = db.executed("INSERT INTO event_log")[0]
+        return db.executed("INSERT INTO emails"), json.loads(timer_event[3])
+
+    promoted, payload = fire("e1")
+    assert promoted and payload["draft_id"] == promoted[0][0]
+
+    promoted, payload = fire("e2")
+    assert promoted == [] and "draft_id" not in payload
+
+def test_each_event_type_reaches_its_handler():
+    calls = []
+    orch = make_orchestrator()
+    for route in EVENT_ROUTES.values():
+        async def handler(cursor, entity_id, payload, name=route.handler):
+            calls.append((name, entity_id, payload))
+            return []
+        setattr(orch, route.handler, handler)
+
+    async def route_all():
+        cursor = FakeCursor(FakeDB())
+        for i, event_type in enumerate(["EMAIL_RECEIVED", "INTENT_CLASSIFIED", "TIMER_FIRED", "EMAIL_SENT"]):
+            await orch.handle_event(cursor, {"event_type": event_type, "entity_id": f"id{i}", "payload": {"n": i}})
+
+    asyncio.run(route_all())
+    assert calls == [("handle_email_received", "id0", {"n": 0}),
+                     ("handle_intent_classified", "id1", {"n": 1}),
+                     ("handle_timer_fired", "id2", {"n": 2})]
+
+def test_unrouted_events_are_skipped_in_bulk_and_never_claimed():
+    db = FakeDB()
+    assert run(db, make_orchestrator().process_events()) == 0
+    (skip_types,) = db.executed("WHERE processed = FALSE AND event_type <> ALL(%s)")[0]
+    claim = db.executed("UPDATE event_log SET claimed_until")[0]
+    assert sorted(skip_types) == sorted(EVENT_ROUTES) and claim[1] == skip_types
+
+def copy_rows(query, row):
+    """Applies an INSERT ... SELECT the way Postgres would to one source row."""
+    targets, sources = re.search(r"INSERT INTO \w+ \(([^)]*)\) SELECT (.*?) FROM", query).groups()
+    sources = [re.sub(r"COALESCE\((\w+),.*", r"\1", s) for s in re.split(r",\s*(?![^()]*\))", sources)]
+    return {t.strip(): row[s.strip()] for t, s in zip(targets.split(","), sources)}
+
+def test_dead_letter_round_trip_keeps_event_identity():
+    event = {"id": "ev1", "event_type": "TIMER_FIRED", "entity_id": "dm1", "entity_type": "DECISION_MAKER",
+             "payload": {"timer_type": "REMINDER_1"}, "priority": 80, "retry_count": 5, "last_error": "boom",
+             "error_class": "RuntimeError", "last_stack": "Traceback ...", "created_at": "2026-10-01T09:00:00Z"}
+    db = FakeDB({"INSERT INTO event_dead_letters": [{}]})
+    assert asyncio.run(move_exhausted_events(FakeCursor(db), 5)) == 1
+    dead = copy_rows(db.queries[-1][0], event)
+    assert dead["event_id"] == "ev1" and dead["stack"] == "Traceback ..."
+
+    db = FakeDB({"INSERT INTO event_log (id,": [{}]})
+    with patch("backend.services.neon_db.get_db_connection", db.connect):
+        assert asyncio.run(replay_dead_letters(ids=["dl1"])) == 1
+    replay = next(q for q, _ in db.queries if "INSERT INTO event_log (id," in q)
+    requeued = copy_rows(replay, dead)
+    assert requeued["id"] == "ev1" and requeued["created_at"] == event["created_at"]
+    assert requeued["priority"] == 80 and "retry_count" not in requeued  # fresh retry budget
+    assert json.loads(db.executed("INSERT INTO event_log (event_type")[0][3])["count"] == 1
+
+def test_event_exhausting_its_retries_is_dead_lettered():
+    db = FakeDB({"INSERT INTO event_dead_letters": [{}]})
+
+    async def broken(cursor, event):
+        raise RuntimeError("provider down")
+
+    orch = make_orchestrator(handle_event=broken)
+    run(db, orch._run_event({"id": "ev1", "event_type": "TIMER_FIRED", "entity_id": "dm1", "retry_count": 4}))
+    retries, error, error_class = db.executed("SET retry_count = %s")[0][:3]
+    assert (retries, error, error_class) == (5, "provider down", "RuntimeError")
+    assert db.executed("INSERT INTO event_dead_letters") == [(5,)]
+
+def test_events_carry_priority_and_queue_latency_is_recorded_per_priority():
+    db = FakeDB()
+    for event_type in ("EMAIL_RECEIVED", "TIMER_FIRED", "CAMPAIGN_STARTED"):
+        asyncio.run(log_event(FakeCursor(db), event_type, "x", "EMAIL"))
+    assert [params[4] for params in db.executed("INSERT INTO event_log")] == [0, 80, DEFAULT_EVENT_PRIORITY]
+
+    claimed = [{"id": "ev1", "event_type": "TIMER_FIRED", "entity_id": "dm1", "priority": 80, "queue_seconds": 40.0,
+                "created_at": 1},
+               {"id": "ev2", "event_type": "EMAIL_RECEIVED", "entity_id": "e2", "priority": 0, "queue_seconds": 2.0,
+                "created_at": 2}]
+    db = FakeDB({"UPDATE event_log SET claimed_until": claimed})
+    registry = MetricsRegistry()
+
+    async def handled(cursor, event):
+        return []
+
+    with patch("backend.background_workers.orchestrator_worker.metrics", registry):
+        assert run(db, make_orchestrator(handle_event=handled).process_events()) == 2
+    assert db.executed("UPDATE event_log SET claimed_until")[0][3] == PRIORITY_AGING_SECONDS
+    latency = registry.snapshot("queue_latency")["queue_latency"]["latency"]
+    assert latency["priority_80"]["count"] == 1 and latency["priority_0"]["max_ms"] == 2000.0
+
+class Analyzer:
+    def __init__(self, intent="NEUTRAL"):
+        self.intent = intent
+        self.texts = []
+
+    async def analyze(self, text):
+        self.texts.append(text)
+        return {"intent": self.intent, "confidence": 0.9, "source": "llm"}
+
+def burst_db(ages):
+    burst = [{"id": f"e{i}", "body": f"Reply {i}", "age_seconds": age} for i, age in enumerate(ages, 1)]
+    return FakeDB({
+        "SELECT body, decision_maker_id, intent FROM emails": [{"body": "Reply 1", "decision_maker_id": "dm1", "intent": None}],
+        "direction = 'inbound' AND intent IS NULL": burst,
+        "INSERT INTO event_log": lambda params: [{"id": "ev2", "event_type": params[0], "entity_id": params[1]}],
+    })
+
+def test_reply_burst_is_deferred_then_classified_once():
+    analyzer = Analyzer()
+    orch = make_orchestrator(intent_analyzer=analyzer)
+    event = {"id": "ev1", "event_type": "EMAIL_RECEIVED", "entity_id": "e1", "payload": {"dm_id": "dm1"}, "retry_count": 0}
+
+    with patch("backend.background_workers.orchestrator_worker.settings.REPLY_DEBOUNCE_SECONDS", 60):
+        # The latest reply is 15s old: the event goes back in the queue without spending a retry
+        db = burst_db([300, 100, 15])
+        assert run(db, orch._run_event(event)) == []
+        assert db.executed("SET next_retry_at = NOW() + make_interval(secs") == [(45.0, "ev1")]
+        assert not db.executed("SET retry_count") and not db.executed("SET processed = TRUE")
+        assert analyzer.texts == []
+
+        # Quiet now: the three replies are classified together and tagged in one update
+        db = burst_db([300, 100, 61])
+        follow_ups = run(db, orch._run_event(event))
+
+    assert analyzer.texts == ["Reply 1\n\n--- Next message ---\n\nReply 2\n\n--- Next message ---\n\nReply 3"]
+    assert db.executed("UPDATE emails SET intent") == [("NEUTRAL", 0.9, "llm", ["e1", "e2", "e3"])]
+    intent_event = db.executed("INSERT INTO event_log")[0]
+    assert intent_event[:2] == ("INTENT_CLASSIFIED", "e3")
+    assert json.loads(intent_event[3])["coalesced_email_ids"] == ["e1", "e2", "e3"]
+    assert [f["event_type"] for f in follow_ups] == ["INTENT_CLASSIFIED"]
+
+def test_reply_already_covered_by_a_burst_is_skipped():
+    db = FakeDB({"SELECT body, decision_maker_id, intent FROM emails": [{"body": "Reply 2", "decision_maker_id": "dm1",
+                                                                          "intent": "NEUTRAL"}]})
+    analyzer = Analyzer()
+    assert asyncio.run(make_orchestrator(intent_analyzer=analyzer).handle_email_received(FakeCursor(db), "e2")) is None
+    assert analyzer.texts == [] and not db.executed("INSERT INTO event_log")
+
+def test_follow_up_runs_in_process_ahead_of_the_rest_of_the_lane():
+    handled = []
+
+    async def handle(cursor, event):
+        handled.append(event["id"])
+        if event["id"] == "ev1":
+            return [{"id": "ev1b", "event_type": "INTENT_CLASSIFIED", "entity_id": "e1"},
+                    {"id": "ev1c", "event_type": "DECISION_MAKER_DISCOVERY", "entity_id": "dm1"}]
+        return []
+
+    db = FakeDB()
+    lane = [{"id": "ev1", "event_type": "EMAIL_RECEIVED", "entity_id": "e1"},
+            {"id": "ev2", "event_type": "TIMER_FIRED", "entity_id": "dm1"}]
+    run(db, make_orchestrator(handle_event=handle)._run_lane(lane))
+    # Unrouted follow-ups stay in event_log for audit only
+    assert handled == ["ev1", "ev1b", "ev2"]
+    assert db.executed("SET processed = TRUE, claimed_until = NULL") == [("ev1",), ("ev1b",), ("ev2",)]
+
+def test_speculative_draft_greets_the_decision_maker():
+    class Drafter:
+        async def draft_response(self, intent_data, original, prospect_reply, summary=None, prospect_name=None, **kwargs):
+            self.prospect_name = prospect_name
+            return {"subject": "Re: Pitch", "body": f"Hi {prospect_name}"}
+
+    db = burst_db([120])
+    db.rules.update({"SELECT name, campaign_id FROM decision_makers": [{"name": "Dana Lee", "campaign_id": "c1"}],
+                     "type IN ('pitch'": [{"id": "p1", "subject": "Pitch", "body": "..."}]})
+    drafter = Drafter()
+    orch = make_orchestrator(intent_analyzer=Analyzer(), response_drafter=drafter)
+    with patch.multiple("backend.background_workers.orchestrator_worker.settings",
+                        REPLY_DEBOUNCE_SECONDS=0, SPECULATIVE_DRAFTING_CAMPAIGNS="c1"):
+        asyncio.run(orch.handle_email_received(FakeCursor(db), "e1"))
+    assert drafter.prospect_name == "Dana Lee"
+    assert json.loads(db.executed("INSERT INTO event_log")[0][3])["speculative_draft"]["body"] == "Hi Dana Lee"
+
+def test_batched_intents_skip_only_speculative_campaigns():
+    class BatchAnalyzer:
+        async def analyze_many(self, replies):
+            self.batched = sorted(replies)
+            return {dm_id: {"intent": "NEUTRAL", "confidence": 0.9} for dm_id in replies}
+
+    rows = [{"decision_maker_id": f"dm{i}", "campaign_id": campaign, "body": "Tell me more", "age_seconds": 120}
+            for i, campaign in enumerate(["c1", "c2", "c2"], 1)]
+    events = [{"event_type": "EMAIL_RECEIVED", "entity_id": f"e{i}"} for i in range(1, 4)]
+    analyzer = BatchAnalyzer()
+    orch = make_orchestrator(intent_analyzer=analyzer)
+    with patch.multiple("backend.background_workers.orchestrator_worker.settings",
+                        REPLY_DEBOUNCE_SECONDS=0, SPECULATIVE_DRAFTING_CAMPAIGNS="c1"):
+        run(FakeDB({"FROM emails e": rows}), orch._prefetch_intents(events))
+    assert analyzer.batched == ["dm2", "dm3"] and len(orch._prefetched_intents) == 2
+
+def test_summaries_are_written_after_the_llm_call_without_a_held_connection():
+    db = FakeDB({"FROM emails e": [
+        {"decision_maker_id": "dm1", "direction": "outbound", "subject": "Pitch", "body": "Hi Dana", "at": 1, "summary": None},
+        {"decision_maker_id": "dm1", "direction": "inbound", "subject": "Re: Pitch", "body": "Tell me more", "at": 2, "summary": None},
+    ]})
+
+    summarizer = ConversationSummarizer.__new__(ConversationSummarizer)
+
+    async def summarize(conversations):
+        assert db.open == 0, "a connection is held across the LLM call"
+        return {"dm1": "Dana asked for details."}
+    summarizer.summarize = summarize
+
+    with patch("backend.agents.conversation_summarizer.get_db_connection", db.connect):
+        assert asyncio.run(summarizer.refresh_pending()) == 1
+    assert db.open == 0
+    assert db.executed("INSERT INTO conversation_summaries") == [("dm1", "Dana asked for details.", 2, 2)]
+
+def test_reply_stream_gets_an_error_event_when_drafting_raises():
+    db = FakeDB({
+        "JOIN decision_makers dm ON e.decision_maker_id = dm.id": [
+            {"id": "r1", "decision_maker_id": "dm1", "intent": "NEUTRAL", "body": "Pricing?", "campaign_id": "c1"}],
+        "type IN ('pitch'": [{"id": "e1", "subject": "Pitch", "body": "..."}],
+        "SELECT name, campaign_id FROM decision_makers": [{"name": "Dana", "campaign_id": "c1"}],
+    })
+
+    class Drafter:
+        async def draft_response(self, *args, **kwargs):
+            raise RuntimeError("gateway timed out")
+
+    async def handle():
+        broker = DraftStreamBroker()
+        with broker.subscribe(dm_id="dm1") as subscription, \
+             patch("backend.background_workers.orchestrator_worker.draft_streams", broker), \
+             patch("backend.background_workers.orchestrator_worker.settings.DRAFT_STREAMING_ENABLED", True):
+            try:
+                await make_orchestrator(response_drafter=Drafter()).handle_intent_classified(FakeCursor(db), "r1", {})
+            except RuntimeError:
+                pass
+            events = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+            return events, broker.active_streams()
+
+    events, still_open = asyncio.run(handle())
+    assert [e["type"] for e in events] == ["start", "error"] and still_open == []
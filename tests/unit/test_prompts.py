@@ -0,0 +1,19 @@
+from backend.agents.prompts import PROMPTS, get_prompt
+
+def test_system_prefix_is_identical_across_requests():
+    spec = get_prompt("response_drafter.reply")
+    first = spec.template().format_messages(
+        intent="NEUTRAL", reasoning="question", original_subject="Intro", conversation_summary="None.",
+        original_pitch="Pitch A", prospect_reply="How much is it?")
+    second = spec.template().format_messages(
+        intent="POSITIVE", reasoning="demo", original_subject="Hello", conversation_summary="Asked pricing.",
+        original_pitch="Pitch B", prospect_reply="Let's talk Tuesday.")
+    assert first[0].content == second[0].content == spec.system
+    assert "Pitch A" in first[1].content and "Pitch B" in second[1].content
+
+def test_only_suffix_messages_carry_variables():
+    for chain, spec in PROMPTS.items():
+        variables = set(spec.template().input_variables)
+        assert variables, chain
+        # Every variable is consumed by the suffix; the system text is never formatted
+        assert all(f"{{{v}}}" not in spec.system for v in variables), chain
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+from langchain_core.runnables import RunnableLambda
+from backend.services.reply_index import ReplyIndex
+from backend.agents.response_drafter import ResponseDrafter, readdress
+
+WORDS = ["price", "pricing", "cost", "integrate", "salesforce", "security", "soc2", "demo", "trial"]
+
+class FakeEmbeddings:
+    """Bag-of-words vectors over a tiny vocabulary; enough to make similar questions close."""
+    def __init__(self):
+        self.calls = 0
+
+    def _vector(self, text):
+        text = text.lower()
+        return [float(text.count(w)) + 0.01 for w in WORDS]
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        return [self._vector(t) for t in texts]
+
+    async def aembed_query(self, text):
+        self.calls += 1
+        return self._vector(text)
+
+def pairs(start):
+    return [
+        {"inbound_id": 1, "reply_id": 11, "campaign_id": "c1", "question": "What is the pricing and cost per seat?",
+         "subject": "Re: Intro", "reply_body": "Hi Anna,\n\nPricing starts at $30 per seat.", "sent_at": start},
+        {"inbound_id": 2, "reply_id": 12, "question": "Do you integrate with Salesforce?",
+         "subject": "Re: Intro", "reply_body": "Hi Bob,\n\nYes, natively.", "sent_at": start + timedelta(minutes=1)},
+        {"inbound_id": 3, "reply_id": 13, "question": "   ",
+         "subject": "Re: Intro", "reply_body": "Hi", "sent_at": start + timedelta(minutes=2)},
+    ]
+
+def test_refresh_persists_and_search_finds_nearest(tmp_path):
+    start = datetime(2026, 1, 1)
+    index = ReplyIndex(FakeEmbeddings(), str(tmp_path))
+
+    async def fetch(since, limit, after_id=None):
+        return [p for p in pairs(start) if since is None or p["sent_at"] > since]
+
+    with patch("backend.services.reply_index.get_approved_reply_pairs", fetch):
+        assert asyncio.run(index.refresh()) == 2
+        # Watermark moved past the blank question too, so nothing is re-fetched
+        assert asyncio.run(index.refresh()) == 0
+
+    match, score = asyncio.run(index.search("what's the pricing, cost per seat?"))
+    assert match["reply_id"] == "11" and score > 0.95
+
+    reloaded = ReplyIndex(FakeEmbeddings(), str(tmp_path))
+    reloaded.load()
+    assert len(reloaded) == 2
+    assert reloaded.watermark == (start + timedelta(minutes=2)).isoformat()
+    np.testing.assert_allclose(reloaded.vectors, index.vectors)
+
+def test_refresh_pages_past_replies_sent_at_the_same_instant(tmp_path):
+    start = datetime(2026, 1, 1)
+    same_instant = [{**p, "sent_at": start} for p in pairs(start)[:2]]
+    index = ReplyIndex(FakeEmbeddings(), str(tmp_path))
+
+    async def fetch(since, limit, after_id=None):
+        after = (since or datetime.min, int(after_id or 0))
+        return [p for p in same_instant if (p["sent_at"], p["reply_id"]) > after][:limit]
+
+    with patch("backend.services.reply_index.get_approved_reply_pairs", fetch), \
+         patch("backend.services.reply_index.settings.REPLY_INDEX_REFRESH_LIMIT", 1):
+        assert [asyncio.run(index.refresh()) for _ in range(3)] == [1, 1, 0]
+    assert [e["reply_id"] for e in index.entries] == ["11", "12"]
+    assert index.watermark_id == "12"
+
+def test_empty_index_skips_embedding_call(tmp_path):
+    embeddings = FakeEmbeddings()
+    assert asyncio.run(ReplyIndex(embeddings, str(tmp_path)).search("pricing?")) == (None, 0.0)
+    assert embeddings.calls == 0
+
+def test_readdress_swaps_greeting():
+    assert readdress("Hi Anna,\n\nPricing starts at $30.", "Carl Jones") == "Hi Carl,\n\nPricing starts at $30."
+    assert readdress("Pricing starts at $30.", None) == "Hi there,\n\nPricing starts at $30."
+
+def test_query_is_trimmed_like_the_indexed_questions(tmp_path):
+    index = ReplyIndex(FakeEmbeddings(), str(tmp_path))
+    index.add(np.array([index.embeddings._vector("What is the pricing and cost per seat?")]),
+              [{"reply_id": "11", "campaign_id": "c1", "body": "Hi Anna,\n\nPricing starts at $30 per seat."}])
+    burst = ("What is the pricing?\n\nOn Mon, Jan 6, Sales wrote:\n> Our demo and trial cover security and soc2"
+             "\n\n--- Next message ---\n\nAnd the cost per seat?")
+    assert asyncio.run(index.search(burst))[1] > 0.95
+    assert asyncio.run(index.search("> only quoted pricing text")) == (None, 0.0)
+
+def test_verbatim_reuse_only_within_the_same_campaign(tmp_path):
+    index = ReplyIndex(FakeEmbeddings(), str(tmp_path))
+    index.add(np.array([index.embeddings._vector("What is the pricing and cost per seat?")]),
+              [{"reply_id": "11", "campaign_id": "c1", "body": "Hi Anna,\n\nPricing starts at $30 per seat."}])
+    drafter = ResponseDrafter.__new__(ResponseDrafter)
+    drafter.reply_index = index
+    drafter.adapt_prompt = drafter.adapt_llm = RunnableLambda(lambda inputs: inputs)
+    adapted = []
+
+    async def adapt(chain, inputs, stream, json_body=False):
+        adapted.append(inputs["approved_answer"])
+        return '{"subject": "Re: Intro", "body": "Hi Carl,\\n\\nFor your team pricing is $30 per seat."}'
+
+    pitch = {"subject": "Intro"}
+    with patch("backend.agents.response_drafter.stream_completion", adapt):
+        same = asyncio.run(drafter.reuse_approved_reply(pitch, "What is the pricing, cost per seat?", "Carl Jones", campaign_id="c1"))
+        other = asyncio.run(drafter.reuse_approved_reply(pitch, "What is the pricing, cost per seat?", "Carl Jones", campaign_id="c2"))
+    assert same == {"subject": "Re: Intro", "body": "Hi Carl,\n\nPricing starts at $30 per seat."}
+    assert other["body"].startswith("Hi Carl,\n\nFor your team") and len(adapted) == 1
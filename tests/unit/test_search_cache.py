@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import patch
+
+from backend.services.search_cache import SearchResultCache, CachedSearch, bypass_search_cache, KEY_PARAMS
+
+class FakeSearch:
+    max_results = 10
+    agent = "DecisionMakerFinderAgent"
+
+    def __init__(self):
+        self.queries = []
+
+    async def ainvoke(self, request):
+        self.queries.append(request["query"])
+        await asyncio.sleep(0.01)
+        return {"query": request["query"], "results": [{"url": "https://acme.com/team"}]}
+
+class FakeStore:
+    """Stands in for the search_cache table: cache_key -> (response, fresh)."""
+    def __init__(self):
+        self.rows = {}
+
+    async def get(self, query_class, cache_key):
+        return self.rows.get(cache_key, (None, False))
+
+    async def put(self, query_class, cache_key, query, response):
+        self.rows[cache_key] = (response, True)
+
+def run_with(cache, store, coro):
+    with patch.object(cache, "get", store.get), patch.object(cache, "_put", store.put):
+        return asyncio.run(coro)
+
+def test_normalized_queries_share_one_entry_but_params_do_not():
+    cache = SearchResultCache()
+    params = {"max_results": 10}
+    assert cache.key("leadership", "Leadership team  Acme ", params) == cache.key("leadership", "leadership team acme", params)
+    assert cache.key("leadership", "leadership team acme", {"max_results": 5}) != cache.key("leadership", "leadership team acme", params)
+    assert cache.key("prospect_list", "acme", params) != cache.key("leadership", "acme", params)
+
+def test_miss_then_hit_and_concurrent_misses_coalesce():
+    cache, store, search = SearchResultCache(), FakeStore(), FakeSearch()
+
+    async def run():
+        with patch("backend.services.search_cache.search_cache", cache):
+            tool = CachedSearch(search, "leadership")
+            first = await asyncio.gather(*[tool.ainvoke({"query": "Leadership team Acme"}) for _ in range(3)])
+            second = await tool.ainvoke({"query": "leadership team acme"})
+            return first, second
+
+    first, second = run_with(cache, store, run())
+    assert search.queries == ["Leadership team Acme"]
+    assert all(r["results"] for r in first) and second == first[0]
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    cache, store, search = SearchResultCache(), FakeStore(), FakeSearch()
+    key = cache.key("prospect_list", "fintech startups", {p: getattr(search, p, None) for p in KEY_PARAMS})
+    store.rows[key] = ({"results": ["old"]}, False)
+
+    async def run():
+        served = await cache.search(search, "prospect_list", {"query": "fintech startups"})
+        await asyncio.gather(*cache._pending)
+        return served
+
+    served = run_with(cache, store, run())
+    assert served == {"results": ["old"]}
+    assert search.queries == ["fintech startups"]
+    assert store.rows[key][1] is True and store.rows[key][0]["results"] != ["old"]
+    assert cache.report()["prospect_list"]["stale_hits"] >= 1
+
+def test_bypass_searches_live_and_stores_result():
+    cache, store, search = SearchResultCache(), FakeStore(), FakeSearch()
+
+    async def run():
+        await cache.search(search, "company_profile", {"query": "acme official website"})
+        with bypass_search_cache():
+            await cache.search(search, "company_profile", {"query": "acme official website"})
+
+    run_with(cache, store, run())
+    assert len(search.queries) == 2 and len(store.rows) == 1
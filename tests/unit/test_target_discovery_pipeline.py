@@ -0,0 +1,61 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from backend.agents.target_discovery import CandidateCompany
+from backend.schemas.campaign import TargetCompany
+
+def candidate(name, host=None):
+    return CandidateCompany(name=name, website=f"https://{host or name.lower()}.com/", description="", relevance_reason="")
+
+@pytest.fixture
+def make_agent(discovery_agent):
+    def make(results, delays, per_query):
+        async def find_candidates(query, filters, offerings):
+            agent.searched.append(query)
+            if isinstance(per_query[query], Exception):
+                raise per_query[query]
+            return per_query[query]
+
+        async def evaluate_candidate(c, industries_str):
+            agent.started.append(c.name)
+            try:
+                await asyncio.sleep(delays.get(c.name, 0.01))
+            except asyncio.CancelledError:
+                agent.cancelled.append(c.name)
+                raise
+            return TargetCompany(name=c.name, website=c.website, relevance_score=10) if results.get(c.name) else None
+
+        agent = discovery_agent(find_candidates=find_candidates, evaluate_candidate=evaluate_candidate)
+        agent.searched, agent.started, agent.cancelled = [], [], []
+        return agent
+    return make
+
+def discover(agent, queries, **limits):
+    values = {"DISCOVERY_TARGET_COUNT": 2, "DISCOVERY_CONCURRENCY": 6, **limits}
+    with patch.multiple("backend.agents.target_discovery.settings", **values):
+        return asyncio.run(agent.discover(queries, None, "", ""))
+
+def test_stops_at_target_count_and_cancels_outstanding(make_agent):
+    per_query = {"q1": [candidate("Slow"), candidate("A"), candidate("B"), candidate("C")], "q2": [candidate("D")]}
+    agent = make_agent({"Slow": True, "A": True, "B": True, "C": True}, {"Slow": 5}, per_query)
+    targets = discover(agent, ["q1", "q2"])
+    assert len(targets) == 2 and "Slow" not in {t.name for t in targets}
+    assert "Slow" in agent.cancelled
+    # Enough candidates were in flight, so the second query was never searched
+    assert agent.searched == ["q1"]
+
+def test_next_query_when_candidates_fall_short_and_duplicates_skipped(make_agent):
+    per_query = {"q1": [candidate("Dead"), candidate("A")], "q2": [candidate("A"), candidate("B")]}
+    agent = make_agent({"A": True, "B": True}, {}, per_query)
+    targets = discover(agent, ["q1", "q2", "q3"])
+    assert sorted(t.name for t in targets) == ["A", "B"]
+    assert agent.searched == ["q1", "q2"] and agent.started.count("A") == 1
+
+def test_failed_search_moves_on_to_the_next_query(make_agent):
+    per_query = {"q1": [candidate("A")], "q2": RuntimeError("Tavily timed out"), "q3": [candidate("B")]}
+    agent = make_agent({"A": True, "B": True}, {}, per_query)
+    targets = discover(agent, ["q1", "q2", "q3"])
+    assert sorted(t.name for t in targets) == ["A", "B"]
+    assert agent.searched == ["q1", "q2", "q3"]
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+from backend.services.llm_gateway import LLMGateway, GatewayTransport, stream_tail_usage, CALLER_HEADER, CHAIN_HEADER
+from backend.services.usage_ledger import UsageLedger, MeteredSearch, usage_context, llm_cost, TAVILY
+
+class FakeCursor:
+    def __init__(self, writes):
+        self.writes = writes
+
+    async def executemany(self, query, rows):
+        self.writes.append(list(rows))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeConnection:
+    def __init__(self, writes):
+        self.writes = writes
+
+    def cursor(self):
+        return FakeCursor(self.writes)
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+def test_llm_cost_prices_cached_tokens_and_dated_models():
+    assert llm_cost("gpt-4o-mini", 1_000_000, 0, 0) == 0.15
+    assert round(llm_cost("gpt-4o-mini-2024-07-18", 1_000_000, 500_000, 1_000_000), 4) == 0.7125
+    assert llm_cost("unknown-model", 1000, 0, 1000) == 0.0
+
+def test_rows_carry_context_and_flush_in_one_batch():
+    writes = []
+    ledger = UsageLedger()
+
+    async def connect():
+        return FakeConnection(writes)
+
+    async def run():
+        with usage_context(campaign_id="c1", stage="target_discovery"):
+            ledger.record_llm("TargetDiscoveryAgent", "target_discovery.research@v1", "gpt-4o-mini",
+                              {"prompt_tokens": 1000, "completion_tokens": 100,
+                               "prompt_tokens_details": {"cached_tokens": 400}}, 1.25)
+            with usage_context(stage="decision_maker_finder"):
+                ledger.record(TAVILY, "DecisionMakerFinderAgent", 0.3, units=1, cost_usd=0.008)
+        ledger.record_llm("IntentAnalyzer", "intent_analyzer.classify@v1", "gpt-4o-mini", {}, 0.01, cache_status="hit")
+        with patch("backend.services.usage_ledger.get_db_connection", connect):
+            await ledger.aclose()
+
+    asyncio.run(run())
+    assert len(writes) == 1
+    llm, search, hit = writes[0]
+    assert llm[:4] == ("c1", "target_discovery", "TargetDiscoveryAgent", "openai")
+    assert llm[6:9] == (1000, 400, 100) and llm[10] == 1250
+    assert search[:2] == ("c1", "decision_maker_finder") and search[-1] == 0.008
+    assert hit[0] is None and hit[11] == "hit" and hit[-1] == 0.0
+
+def test_failed_flush_keeps_rows_for_next_attempt():
+    ledger = UsageLedger()
+
+    async def down():
+        raise ConnectionError("db down")
+
+    async def run():
+        ledger.record(TAVILY, "UserIntelligenceAgent", 0.2, units=1)
+        with patch("backend.services.usage_ledger.get_db_connection", down):
+            await ledger.aclose()
+
+    asyncio.run(run())
+    assert len(ledger._buffer) == 1
+
+def test_metered_search_records_failures():
+    class BrokenSearch:
+        search_depth = "advanced"
+
+        async def ainvoke(self, query):
+            raise RuntimeError("tavily down")
+
+    ledger = UsageLedger()
+    with patch("backend.services.usage_ledger.usage_ledger", ledger):
+        try:
+            asyncio.run(MeteredSearch(BrokenSearch(), "TargetDiscoveryAgent").ainvoke({"query": "x"}))
+        except RuntimeError:
+            pass
+    row = ledger._buffer[0]
+    assert row[2:4] == ("TargetDiscoveryAgent", "tavily") and row[9] == 2 and row[12] is False
+
+def test_streamed_completion_is_recorded_when_closed():
+    events = [{"choices": [{"delta": {"content": "Hi"}}]},
+              {"choices": [], "usage": {"prompt_tokens": 20, "completion_tokens": 3, "total_tokens": 23}}]
+    body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+    assert stream_tail_usage(body.encode())["total_tokens"] == 23
+
+    class ProviderStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for line in body.splitlines(keepends=True):
+                yield line.encode()
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=ProviderStream())
+
+    ledger = UsageLedger()
+
+    async def run():
+        client = httpx.AsyncClient(transport=GatewayTransport(LLMGateway(), httpx.MockTransport(handler)))
+        payload = {"model": "gpt-4o-mini", "stream": True, "temperature": 0.7, "messages": [{"role": "user", "content": "hi"}]}
+        async with client.stream("POST", "https://api.openai.com/v1/chat/completions", content=json.dumps(payload),
+                                 headers={CALLER_HEADER: "ResponseDrafter", CHAIN_HEADER: "response_drafter.reply"}) as resp:
+            assert ledger._buffer == []
+            await resp.aread()
+        await client.aclose()
+
+    with patch("backend.services.llm_gateway.usage_ledger", ledger):
+        asyncio.run(run())
+    row = ledger._buffer[0]
+    assert row[2] == "ResponseDrafter" and row[4] == "response_drafter.reply"
+    assert row[6:9] == (20, 0, 3)